@@ -1,84 +1,328 @@
+import asyncio
 import os
-from typing import List, Optional
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
 
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query
+from fastapi import APIRouter, UploadFile, File, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import TerraformLog
-from app.schemas import LogEntry, LogUploadResponse, LogWithSectionsResponse, DeleteResponse
+from app.database import get_db, get_read_db, ReadSession
+from app.json_codec import dumps_bytes
+from app.schemas import (
+    LogEntry,
+    LogSearchHit,
+    LogUploadResponse,
+    SectionsResponse,
+    DeleteResponse,
+    IngestJobResponse,
+    UploadResponse,
+    SentryJobResponse,
+    TailSessionResponse
+)
 from app.services import (
-    parse_terraform_log,
-    save_logs_to_db,
+    submit_ingest_jobs,
+    get_ingest_job,
     get_all_logs,
-    get_logs_by_level,
     delete_all_logs,
     get_gantt_data,
+    GANTT_MAX_BARS,
     get_sections_from_db,
-    send_error_logs_to_sentry
+    get_section_logs,
+    get_request_ids,
+    get_logs_by_request,
+    get_log_payload,
+    get_stats,
+    submit_sentry_job,
+    get_sentry_job,
+    encode_cursor,
+    search_logs,
+    parse_fields,
+    encode_log_rows,
+    iter_export,
+    export_filename,
+    EXPORT_FORMATS,
+    EXPORT_MEDIA_TYPES,
+    list_uploads,
+    delete_upload,
+    result_cache,
+    tail_broker,
+    resolve_tail_path,
+    start_tail,
+    stop_tail,
+    get_tail,
+    get_tail_backlog,
+    TAIL_BACKLOG_LIMIT,
+    detect_compression,
+    MAGIC_SIZE
 )
 
 router = APIRouter()
 
+# Seconds between SSE comments that keep idle connections and proxies open
+SSE_KEEPALIVE = 15
+
+
+async def cached_json(
+        request: Request,
+        endpoint: str,
+        params: dict,
+        compute: Callable[[], Awaitable[bytes]]
+) -> Response:
+    """
+    Serve an encoded JSON result from the result cache, computing it on a miss.
+
+    The cache key doubles as ETag, so a browser that already has the current
+    generation of the result gets 304 Not Modified.
+    """
+    key = result_cache.key(endpoint, params)
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+
+    content = result_cache.get(key)
+    if content is None:
+        content = await compute()
+        result_cache.set(key, content)
+    return Response(content=content, media_type="application/json", headers=headers)
+
 
-@router.post("/upload", response_model=LogUploadResponse)
-async def upload_log_file(
+@router.post("/upload", response_model=LogUploadResponse, status_code=202)
+def upload_log_file(
         file: UploadFile = File(...),
+        replaces_upload_id: Optional[int] = Query(None, description="Upload deleted once this one is ingested"),
         db: Session = Depends(get_db)
 ):
-    """Upload and parse Terraform JSON log file."""
-    if not file.filename.endswith(('.json', '.log')):
-        raise HTTPException(status_code=400, detail="Only JSON files are supported")
-
-    content = await file.read()
-    content_str = content.decode('utf-8')
+    """
+    Accept a Terraform JSON log file for background ingestion.
 
-    # Parse the log file
-    logs, fixed_count = parse_terraform_log(content_str)
+    gzip, zstd, bzip2 and xz compressed logs are recognised by their content
+    and decompressed while they are ingested; every log in a zip archive
+    becomes an upload of its own. Returns the ingest jobs right away;
+    progress is available at /jobs/{job_id}.
 
-    if not logs:
-        raise HTTPException(status_code=400, detail="No valid log entries found in the file")
+    A log that is already stored is not ingested again: its job ends with
+    status "duplicate" and points at the stored upload. A log that extends a
+    stored one gets a new upload that starts with a copy of the stored
+    entries, only the rest is parsed. The log is only read by its job, so
+    what did not have to be ingested again is reported in skipped_bytes and
+    skipped_entries of the job, not in this response.
+    """
+    compression = detect_compression(file.file.read(MAGIC_SIZE))
+    file.file.seek(0)
+    if compression is None and not file.filename.endswith(('.json', '.log')):
+        raise HTTPException(status_code=400, detail="Only JSON files are supported")
 
-    # Save to database
-    count = save_logs_to_db(db, logs, file.filename)
+    try:
+        jobs = submit_ingest_jobs(db, file.file, file.filename, replaces_upload_id)
+    except (ValueError, zipfile.BadZipFile) as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return LogUploadResponse(
-        message="File uploaded successfully",
-        entries_count=count,
+        message="File accepted for processing" if len(jobs) == 1 else f"Archive accepted: {len(jobs)} log files",
+        entries_count=0,
         filename=file.filename,
-        fixed_logs_count=fixed_count
+        job_id=jobs[0].id,
+        status=jobs[0].status,
+        upload_id=jobs[0].upload_id,
+        jobs=jobs
     )
 
 
-@router.post("/sentry/send-errors")
-def send_errors_to_sentry(db: Session = Depends(get_db)):
-    """Send all ERROR level logs to Sentry."""
+@router.get("/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_ingest_job_status(job_id: int, db: ReadSession = Depends(get_read_db)):
+    """Get status and progress of an ingest job."""
+    job = await db.run(get_ingest_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/uploads", response_model=List[UploadResponse])
+async def get_uploads(db: ReadSession = Depends(get_read_db)):
+    """List uploaded log files."""
+    return await db.run(list_uploads)
+
+
+@router.delete("/uploads/{upload_id}", response_model=DeleteResponse)
+def delete_upload_logs(upload_id: int, db: Session = Depends(get_db)):
+    """Delete one upload with all its logs."""
+    count = delete_upload(db, upload_id)
+    if count is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return DeleteResponse(
+        message="Upload deleted successfully",
+        deleted_count=count
+    )
+
+
+@router.post("/sentry/send-errors", response_model=SentryJobResponse, status_code=202)
+def send_errors_to_sentry(
+        upload_id: Optional[int] = Query(None, description="Only logs of this upload"),
+        db: Session = Depends(get_db)
+):
+    """
+    Forward ERROR level logs that were not sent yet to Sentry in the background.
+
+    Progress is available at /sentry/jobs/{job_id}.
+    """
     # Sentry DSN from the requirements
     sentry_dsn = os.getenv("SENTRY_DSN")
-    result = send_error_logs_to_sentry(db, sentry_dsn)
-    return result
+    if not sentry_dsn:
+        raise HTTPException(status_code=400, detail="SENTRY_DSN is not configured")
+    return submit_sentry_job(db, sentry_dsn, upload_id)
+
+
+@router.get("/sentry/jobs/{job_id}", response_model=SentryJobResponse)
+async def get_sentry_job_status(job_id: int, db: ReadSession = Depends(get_read_db)):
+    """Get status and progress of a Sentry forwarding job."""
+    job = await db.run(get_sentry_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/tail", response_model=TailSessionResponse, status_code=201)
+def start_tail_session(
+        path: Optional[str] = Query(None, description="Log file to follow, TF_LOG_PATH by default"),
+        db: Session = Depends(get_db)
+):
+    """
+    Follow a log file while Terraform writes it, ingesting new lines into a new upload.
+
+    Live updates are available at /tail/{tail_id}/events.
+    """
+    try:
+        real_path = resolve_tail_path(path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    if not os.path.isfile(real_path):
+        raise HTTPException(status_code=404, detail="Log file not found")
+    return start_tail(db, real_path)
+
+
+@router.get("/tail/{tail_id}", response_model=TailSessionResponse)
+async def get_tail_session(tail_id: int, db: ReadSession = Depends(get_read_db)):
+    """Get status and progress of a followed log file."""
+    tail = await db.run(get_tail, tail_id)
+    if tail is None:
+        raise HTTPException(status_code=404, detail="Tail session not found")
+    return tail
+
+
+@router.delete("/tail/{tail_id}", response_model=TailSessionResponse)
+def stop_tail_session(tail_id: int, db: Session = Depends(get_db)):
+    """Stop following a log file; the logs ingested so far are kept."""
+    tail = stop_tail(db, tail_id)
+    if tail is None:
+        raise HTTPException(status_code=404, detail="Tail session not found")
+    return tail
+
+
+def _sse(event: str, data, event_id: int | None = None) -> bytes:
+    lines = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{lines}event: {event}\n".encode('utf-8') + b"data: " + dumps_bytes(data) + b"\n\n"
+
+
+@router.get("/tail/{tail_id}/events")
+async def stream_tail_events(
+        tail_id: int,
+        request: Request,
+        after_id: int = Query(0, description="Only send logs with a larger id"),
+        last_event_id: Optional[int] = Header(None),
+        db: ReadSession = Depends(get_read_db)
+):
+    """
+    Server-sent events of a followed log file: logs, sections, requests and stopped.
+
+    Logs ingested after after_id (or the Last-Event-ID of a reconnecting
+    EventSource) are sent first, then new events as they are committed.
+    A reset event means the client fell behind and should reload.
+    """
+    tail = await db.run(get_tail, tail_id)
+    if tail is None:
+        raise HTTPException(status_code=404, detail="Tail session not found")
+    after_id = last_event_id or after_id
+    running = tail.status == "running"
+
+    # Subscribe before the backlog is read, so no committed rows fall in between
+    queue = tail_broker.subscribe(tail_id) if running else None
+    backlog = await db.run(get_tail_backlog, tail.upload_id, after_id)
+
+    async def events() -> AsyncIterator[bytes]:
+        last_id = after_id
+        try:
+            if backlog:
+                last_id = backlog[-1]['id']
+                yield _sse("logs", {"logs": backlog}, last_id)
+            if len(backlog) == TAIL_BACKLOG_LIMIT:
+                # More rows are missing; EventSource reconnects right away with the new Last-Event-ID
+                yield b"retry: 100\n\n"
+                return
+            if queue is None:
+                yield _sse("stopped", {"tail_id": tail_id})
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield b": keep-alive\n\n"
+                    continue
+                event_id = event.get("id")
+                data = event["data"]
+                if event["event"] == "logs":
+                    if event_id <= last_id:
+                        continue
+                    # Rows up to last_id were already sent with the backlog
+                    data = {"logs": [log for log in data["logs"] if log["id"] > last_id]}
+                    last_id = event_id
+                yield _sse(event["event"], data, event_id)
+                if event["event"] in ("stopped", "failed"):
+                    return
+        finally:
+            if queue is not None:
+                tail_broker.unsubscribe(tail_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/logs", response_model=List[LogEntry])
-def get_logs(
-        skip: int = Query(0, ge=0),
+async def get_logs(
+        skip: int = Query(0, ge=0, description="Deprecated, use cursor"),
         limit: int = Query(100, ge=1, le=2000),
+        cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
         level: Optional[str] = None,
         tf_resource_type: Optional[str] = None,
-        start_timestamp: Optional[str] = None,
-        end_timestamp: Optional[str] = None,
+        start_timestamp: Optional[datetime] = Query(None, description="ISO 8601, UTC if no offset is given"),
+        end_timestamp: Optional[datetime] = Query(None, description="ISO 8601, UTC if no offset is given"),
         tf_req_id: Optional[str] = None,
         tf_rpc: Optional[str] = None,
-        message_contains: Optional[str] = None,
+        message_contains: Optional[str] = Query(None, description="Case-insensitive, as in /logs/search"),
         group_by_request_id: bool = Query(True, description="Group logs by request_id"),
-        db: Session = Depends(get_db)
+        upload_id: Optional[int] = Query(None, description="Only logs of this upload"),
+        fields: Optional[str] = Query(None, description="Comma separated LogEntry fields, all by default"),
+        db: ReadSession = Depends(get_read_db)
 ):
-    """Get logs from database with optional filtering and grouping."""
-    if level:
-        logs = get_logs_by_level(db, level)
-    else:
-        logs = get_all_logs(
-            db,
+    """
+    Get logs from database with optional filtering and grouping.
+
+    If more logs match, the cursor of the next page is returned in the X-Next-Cursor header.
+    Only the requested fields are selected and rows are encoded without building LogEntry models.
+    """
+    try:
+        field_list = parse_fields(fields)
+        logs = await db.run(
+            get_all_logs,
             skip=skip,
             limit=limit,
             tf_resource_type=tf_resource_type,
@@ -87,85 +331,205 @@ def get_logs(
             tf_req_id=tf_req_id,
             tf_rpc=tf_rpc,
             message_contains=message_contains,
-            group_by_request_id=group_by_request_id
+            group_by_request_id=group_by_request_id,
+            level=level,
+            cursor=cursor,
+            upload_id=upload_id,
+            fields=field_list
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return logs
+    headers = {}
+    if len(logs) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(logs[-1], group_by_request_id)
+
+    return Response(content=encode_log_rows(logs, field_list), media_type="application/json", headers=headers)
+
+
+@router.get("/logs/export")
+def export_logs(
+        format: str = Query("ndjson", description="ndjson or csv"),
+        gzip: bool = Query(False, description="Compress the export with gzip"),
+        level: Optional[str] = None,
+        tf_resource_type: Optional[str] = None,
+        start_timestamp: Optional[datetime] = Query(None, description="ISO 8601, UTC if no offset is given"),
+        end_timestamp: Optional[datetime] = Query(None, description="ISO 8601, UTC if no offset is given"),
+        tf_req_id: Optional[str] = None,
+        tf_rpc: Optional[str] = None,
+        message_contains: Optional[str] = Query(None, description="Case-insensitive, as in /logs/search"),
+        group_by_request_id: bool = Query(True, description="Group logs by request_id"),
+        upload_id: Optional[int] = Query(None, description="Only logs of this upload")
+):
+    """
+    Stream every log matching the /logs filters as NDJSON or CSV.
+
+    The export is not paged and is read with a server-side cursor, so it may hold millions of rows.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown export format: {format}")
+
+    content = iter_export(
+        format,
+        compress=gzip,
+        group_by_request_id=group_by_request_id,
+        tf_resource_type=tf_resource_type,
+        start_timestamp=start_timestamp,
+        end_timestamp=end_timestamp,
+        tf_req_id=tf_req_id,
+        tf_rpc=tf_rpc,
+        message_contains=message_contains,
+        level=level,
+        upload_id=upload_id
+    )
+    return StreamingResponse(
+        content,
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(format, gzip)}"'}
+    )
+
+
+@router.get("/logs/search", response_model=List[LogSearchHit])
+async def search_log_messages(
+        q: str = Query(..., min_length=1, description="Search query"),
+        mode: str = Query("substring", description="substring, phrase, prefix or regex"),
+        limit: int = Query(100, ge=1, le=2000),
+        upload_id: Optional[int] = Query(None, description="Only logs of this upload"),
+        db: ReadSession = Depends(get_read_db)
+):
+    """Search log messages, best matches first."""
+    try:
+        hits = await db.run(search_logs, q, mode=mode, limit=limit, upload_id=upload_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return [
+        LogSearchHit(**LogEntry.model_validate(log).model_dump(), rank=rank)
+        for log, rank in hits
+    ]
 
 
 @router.get("/gantt")
-def get_gantt_chart_data(db: Session = Depends(get_db)):
-    """Get aggregated request data for Gantt chart visualization."""
-    data = get_gantt_data(db)
-    return data
+async def get_gantt_chart_data(
+        request: Request,
+        upload_id: Optional[int] = Query(None, description="Only logs of this upload"),
+        start_us: Optional[int] = Query(None, description="Start of the time window, epoch microseconds"),
+        end_us: Optional[int] = Query(None, description="End of the time window, epoch microseconds"),
+        max_bars: int = Query(GANTT_MAX_BARS, ge=1, le=10000, description="Bars and buckets returned at most"),
+        db: ReadSession = Depends(get_read_db)
+):
+    """
+    Get the requests of a time window for Gantt chart visualization.
 
+    Dense parts of the window are merged into buckets so that at most max_bars items are returned.
+    The window is clamped to the extent of the requests.
+    """
+    if start_us is not None and end_us is not None and start_us > end_us:
+        raise HTTPException(status_code=400, detail="start_us must not be after end_us")
+    params = {'upload_id': upload_id, 'start_us': start_us, 'end_us': end_us, 'max_bars': max_bars}
+    return await cached_json(
+        request, "gantt", params,
+        lambda: db.run(lambda session: dumps_bytes(get_gantt_data(session, **params)))
+    )
 
-@router.get("/sections", response_model=LogWithSectionsResponse)
-def get_sections_data(db: Session = Depends(get_db)):
-    """Get sections data from database logs."""
-    data = get_sections_from_db(db)
-    return data
 
+@router.get("/stats")
+async def get_log_stats(
+        request: Request,
+        upload_id: Optional[int] = Query(None, description="Only logs of this upload"),
+        db: ReadSession = Depends(get_read_db)
+):
+    """
+    Get entry counts by level, rpc, resource type, provider and section,
+    and tf_req_duration_ms percentiles by rpc.
 
-@router.get("/request-ids")
-def get_request_ids(db: Session = Depends(get_db)):
-    """Get list of unique request IDs with basic metadata."""
-    from sqlalchemy import func
-
-    # Get unique request IDs with count
-    result = (
-        db.query(
-            TerraformLog.tf_req_id,
-            func.count(TerraformLog.id).label('log_count'),
-            func.min(TerraformLog.timestamp).label('start_timestamp'),
-            func.max(TerraformLog.timestamp).label('end_timestamp')
-        )
-        .filter(TerraformLog.tf_req_id.isnot(None))
-        .group_by(TerraformLog.tf_req_id)
-        .order_by(func.min(TerraformLog.timestamp))
-        .all()
+    Read from rollups maintained during ingest, so the cost does not depend on the number of logs.
+    """
+    return await cached_json(
+        request, "stats", {'upload_id': upload_id},
+        lambda: db.run(lambda session: dumps_bytes(get_stats(session, upload_id)))
     )
 
-    # Also get logs without request_id
-    no_req_id_count = db.query(func.count(TerraformLog.id)).filter(
-        TerraformLog.tf_req_id.is_(None)
-    ).scalar()
-
-    request_ids = [
-        {
-            'tf_req_id': row.tf_req_id,
-            'log_count': row.log_count,
-            'start_timestamp': row.start_timestamp,
-            'end_timestamp': row.end_timestamp
-        }
-        for row in result
-    ]
 
-    # Add no-request-id group if exists
-    if no_req_id_count > 0:
-        request_ids.append({
-            'tf_req_id': 'no-request-id',
-            'log_count': no_req_id_count,
-            'start_timestamp': None,
-            'end_timestamp': None
-        })
+@router.get("/sections", response_model=SectionsResponse)
+async def get_sections_data(
+        request: Request,
+        upload_id: Optional[int] = Query(None, description="Only logs of this upload"),
+        db: ReadSession = Depends(get_read_db)
+):
+    """Get metadata of the sections detected in uploaded logs."""
+    def compute(session: Session) -> bytes:
+        data = SectionsResponse.model_validate(get_sections_from_db(session, upload_id))
+        return data.model_dump_json().encode('utf-8')
+
+    return await cached_json(request, "sections", {'upload_id': upload_id}, lambda: db.run(compute))
+
+
+@router.get("/sections/{section_id}/logs", response_model=List[LogEntry])
+async def get_section_logs_page(
+        section_id: int,
+        response: Response,
+        limit: int = Query(100, ge=1, le=2000),
+        cursor: Optional[int] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+        db: ReadSession = Depends(get_read_db)
+):
+    """
+    Get the logs of one section, page by page.
+
+    If more logs follow, the cursor of the next page is returned in the X-Next-Cursor header.
+    """
+    logs = await db.run(get_section_logs, section_id, limit=limit, after_id=cursor)
+    if logs is None:
+        raise HTTPException(status_code=404, detail="Section not found")
+
+    if len(logs) == limit:
+        response.headers["X-Next-Cursor"] = str(logs[-1].id)
+
+    return logs
+
 
-    return request_ids
+@router.get("/request-ids")
+async def get_request_id_list(
+        request: Request,
+        upload_id: Optional[int] = Query(None, description="Only logs of this upload"),
+        db: ReadSession = Depends(get_read_db)
+):
+    """Get list of unique request IDs with basic metadata."""
+    return await cached_json(
+        request, "request-ids", {'upload_id': upload_id},
+        lambda: db.run(lambda session: dumps_bytes(get_request_ids(session, upload_id)))
+    )
 
 
 @router.get("/logs/by-request/{request_id}", response_model=List[LogEntry])
-def get_logs_by_request_id(
+async def get_logs_by_request_id(
         request_id: str,
-        db: Session = Depends(get_db)
+        upload_id: Optional[int] = Query(None, description="Only logs of this upload"),
+        fields: Optional[str] = Query(None, description="Comma separated LogEntry fields, all by default"),
+        db: ReadSession = Depends(get_read_db)
 ):
     """Get all logs for a specific request ID."""
-    if request_id == 'no-request-id':
-        logs = db.query(TerraformLog).filter(TerraformLog.tf_req_id.is_(None)).order_by(TerraformLog.timestamp).all()
-    else:
-        logs = db.query(TerraformLog).filter(TerraformLog.tf_req_id == request_id).order_by(
-            TerraformLog.timestamp).all()
+    try:
+        field_list = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return logs
+    logs = await db.run(get_logs_by_request, request_id, field_list, upload_id)
+    return Response(content=encode_log_rows(logs, field_list), media_type="application/json")
+
+
+@router.get("/logs/{log_id}/payload")
+async def get_log_payload_by_id(log_id: int, db: ReadSession = Depends(get_read_db)):
+    """
+    Get the complete entry of one log.
+
+    Lists return raw_data without the large values that are stored out of
+    line; payload_size of a log tells that they exist.
+    """
+    record = await db.run(get_log_payload, log_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Log not found")
+    return Response(content=dumps_bytes(record), media_type="application/json")
 
 
 @router.delete("/sessions", response_model=DeleteResponse)
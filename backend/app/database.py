@@ -1,18 +1,80 @@
 import os
+from typing import Callable, TypeVar
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.json_codec import dumps_json
+
+T = TypeVar('T')
 
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
     "postgresql://postgres:postgres@db:5432/terraform_logs"
 )
 
-engine = create_engine(DATABASE_URL)
+# Connection pool of every engine; sqlite keeps the SQLAlchemy defaults
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# "sync" runs read endpoints on psycopg2 in the thread pool, "async" on asyncpg in the event loop
+DB_READ_MODE = os.getenv("DB_READ_MODE", "sync")
+ASYNC_DRIVERS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+
+def _async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+
+def _engine_options(url: str) -> dict:
+    options = {'json_serializer': dumps_json, 'pool_pre_ping': DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() != 'sqlite':
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE
+        )
+    return options
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+_async_engine = None
+_async_sessionmaker = None
+
+
+def run_migrations(db_engine=None, revision: str = "head"):
+    """
+    Bring the database schema up to date with Alembic.
+
+    Databases created by the former Base.metadata.create_all setup have the
+    tables but no alembic_version; they are stamped with the initial revision first.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic.ini"))
+    config.attributes['configure_logger'] = False
+
+    with (db_engine or engine).begin() as connection:
+        config.attributes['connection'] = connection
+        tables = inspect(connection).get_table_names()
+        if "terraform_logs" in tables and "alembic_version" not in tables:
+            command.stamp(config, "0001")
+        command.upgrade(config, revision)
+
 
 def get_db():
     db = SessionLocal()
@@ -20,3 +82,59 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_async_sessionmaker():
+    """Sessions of the asyncpg engine, created on first use; asyncpg is only needed in async mode."""
+    global _async_engine, _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL))
+        _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
+
+async def dispose_async_engine():
+    """
+    Close the pooled asyncpg connections, if async mode was used.
+
+    The connections belong to the event loop they were opened on, so this
+    runs on shutdown, before the loop is closed.
+    """
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = _async_sessionmaker = None
+
+
+class ReadSession:
+    """
+    Runs synchronous service functions for read endpoints without blocking the event loop.
+
+    In sync mode the function runs in the thread pool with a psycopg2 session.
+    In async mode it runs through AsyncSession.run_sync, so the same ORM code
+    awaits asyncpg I/O on the event loop and holds no thread while waiting.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        if DB_READ_MODE == "async":
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+async def get_read_db():
+    """Dependency of read-only endpoints, see ReadSession."""
+    if DB_READ_MODE == "async":
+        async with get_async_sessionmaker()() as session:
+            yield ReadSession(session)
+        return
+
+    db: Session = SessionLocal()
+    try:
+        yield ReadSession(db)
+    finally:
+        await run_in_threadpool(db.close)
@@ -0,0 +1,71 @@
+"""
+JSON encoding and decoding used for log ingest.
+
+orjson is used when it is installed, the standard json module otherwise.
+JSON_DECODER forces one of them ("orjson" or "json"). Every line is
+decoded exactly once: the row of an entry needs all of its keys (see
+split_entry), so keeping only some of them and decoding the line again
+later would cost a second decode per line.
+
+dumps_bytes encodes API responses.
+"""
+import json
+import os
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+JSON_DECODER = os.getenv("JSON_DECODER", "auto")
+
+if orjson is not None and JSON_DECODER in ("auto", "orjson"):
+    loads = orjson.loads
+    DecodeError = orjson.JSONDecodeError
+    decoder_name = "orjson"
+
+    def _dumps(value) -> str:
+        return orjson.dumps(value).decode('utf-8')
+
+    dumps_bytes = orjson.dumps
+else:
+    loads = json.loads
+    DecodeError = json.JSONDecodeError
+    decoder_name = "json"
+    _dumps = json.dumps
+
+    def _default(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    def dumps_bytes(value) -> bytes:
+        return json.dumps(value, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+class RawJSON:
+    """Already encoded JSON text that is written to the database as is."""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+def dumps_json(value) -> str:
+    """JSON serializer for the engine: passes RawJSON through without re-encoding."""
+    if isinstance(value, RawJSON):
+        return value.text
+    return _dumps(value)
+
+
+def decode_entry(line: bytes) -> dict | None:
+    """Decode one JSONL line; returns None for lines that are not JSON objects."""
+    try:
+        entry = loads(line)
+    except (DecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(entry, dict):
+        return None
+    return entry
@@ -4,15 +4,22 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import router
-from app.database import engine, Base
+from app.database import run_migrations, dispose_async_engine
+from app.services import shutdown_executor, shutdown_sentry_executor, resume_tails, shutdown_tails
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Create database tables on startup
-    Base.metadata.create_all(bind=engine)
+    # Apply database migrations on startup
+    run_migrations()
+    # Continue following the files that were followed before the restart
+    resume_tails()
     yield
-    # Cleanup on shutdown (if needed)
+    shutdown_tails()
+    # Let running ingest jobs finish before shutdown
+    shutdown_executor()
+    shutdown_sentry_executor()
+    await dispose_async_engine()
 
 
 app = FastAPI(title="Terraform LogViewer API", lifespan=lifespan)
@@ -24,6 +31,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
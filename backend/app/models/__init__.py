@@ -1,3 +1,26 @@
 from .terraform_log import TerraformLog
+from .ingest_job import IngestJob
+from .request_summary import RequestSummary
+from .log_section import LogSectionRecord
+from .upload import Upload
+from .sentry_forward import SentryForwardJob, SentryHighWater, SentryFingerprint
+from .tail_session import TailSession
+from .log_payload import LogPayload
+from .log_dictionary import LogDictionaryEntry
+from .log_stats import LogStat, RpcDurationStat
 
-__all__ = ['TerraformLog']
+__all__ = [
+    'TerraformLog',
+    'IngestJob',
+    'RequestSummary',
+    'LogSectionRecord',
+    'Upload',
+    'SentryForwardJob',
+    'SentryHighWater',
+    'SentryFingerprint',
+    'TailSession',
+    'LogPayload',
+    'LogDictionaryEntry',
+    'LogStat',
+    'RpcDurationStat'
+]
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text
+
+from app.database import Base
+
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String)
+    # Path of the log inside the uploaded zip archive, if it came from one
+    archive_member = Column(String, nullable=True)
+    upload_id = Column(Integer, nullable=True)
+    # Upload that is deleted once this job completes
+    replaces_upload_id = Column(Integer, nullable=True)
+    # Bytes at the start of the log that upload_id already holds; only the rest is ingested
+    skipped_bytes = Column(BigInteger, default=0)
+    # Entries of upload_id that were stored before this job
+    skipped_entries = Column(Integer, default=0)
+    status = Column(String, default="queued", index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    total_bytes = Column(BigInteger, default=0)
+    bytes_read = Column(BigInteger, default=0)
+    entries_parsed = Column(Integer, default=0)
+    fixed_logs_count = Column(Integer, default=0)
+    rows_inserted = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+
+from app.database import Base
+
+
+class LogDictionaryEntry(Base):
+    """Distinct value of a dictionary-encoded terraform_logs column; see app/services/log_dictionary.py."""
+
+    __tablename__ = "log_dictionary"
+    __table_args__ = (
+        UniqueConstraint('field', 'value', name='uq_log_dictionary_field_value'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    # Column of terraform_logs the value belongs to, e.g. tf_rpc
+    field = Column(String, nullable=False)
+    value = Column(String, nullable=False)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, LargeBinary
+
+from app.database import Base
+
+
+class LogPayload(Base):
+    """Large values of a log entry, stored out of line; see app/services/log_payloads.py."""
+
+    __tablename__ = "log_payloads"
+    # On PostgreSQL the table is list-partitioned by upload_id like terraform_logs,
+    # with primary key (log_id, upload_id), see migrations/versions/0020
+    __table_args__ = ({'postgresql_partition_by': 'LIST (upload_id)'},)
+
+    log_id = Column(Integer, primary_key=True, autoincrement=False)
+    # Other databases delete uploads through this index instead of partitions
+    upload_id = Column(Integer, nullable=False, index=True)
+    # zlib compressed JSON object of the values that were moved out of the row
+    data = Column(LargeBinary, nullable=False)
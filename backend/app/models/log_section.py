@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+
+from app.database import Base
+
+
+class LogSectionRecord(Base):
+    """A plan/apply/init section of one upload, detected during ingest."""
+
+    __tablename__ = "sections"
+    __table_args__ = (
+        Index('ix_sections_upload_id', 'upload_id'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    upload_id = Column(Integer)
+    filename = Column(String)
+    uploaded_at = Column(DateTime)
+    type = Column(String)
+    # Positions within the upload and ids of the first and last terraform_logs rows
+    start_index = Column(Integer)
+    end_index = Column(Integer)
+    start_id = Column(Integer)
+    end_id = Column(Integer)
+    log_count = Column(Integer, default=0)
+    start_timestamp = Column(String, nullable=True)
+    end_timestamp = Column(String, nullable=True)
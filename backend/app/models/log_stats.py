@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, BigInteger, String
+
+from app.database import Base
+
+
+class LogStat(Base):
+    """Per upload count of log entries by level, rpc, resource type or provider; see app/services/log_stats.py."""
+
+    __tablename__ = "log_stats"
+
+    upload_id = Column(Integer, primary_key=True)
+    # level, rpc, resource_type or provider
+    dimension = Column(String, primary_key=True)
+    # Empty for entries without a value
+    value = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+class RpcDurationStat(Base):
+    """Per upload histogram of tf_req_duration_ms by rpc, in logarithmic buckets; see app/services/log_stats.py."""
+
+    __tablename__ = "rpc_duration_stats"
+
+    upload_id = Column(Integer, primary_key=True)
+    # Empty for entries without an rpc
+    tf_rpc = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Index
+
+from app.database import Base
+
+
+class RequestSummary(Base):
+    """Per upload and tf_req_id aggregate of terraform_logs, maintained during ingest."""
+
+    __tablename__ = "request_summary"
+    # Time window queries of /gantt, see migrations/versions/0016; on PostgreSQL
+    # the GiST interval index of that revision serves the overlap condition
+    __table_args__ = (
+        Index('ix_request_summary_start_end', 'start_us', 'end_us'),
+        Index('ix_request_summary_end', 'end_us'),
+    )
+
+    upload_id = Column(Integer, primary_key=True)
+    tf_req_id = Column(String, primary_key=True)
+    tf_rpc = Column(String, nullable=True)
+    tf_resource_type = Column(String, nullable=True)
+    tf_provider_addr = Column(String, nullable=True)
+    # Bounds as epoch microseconds and as the original timestamp strings
+    start_us = Column(BigInteger, nullable=True)
+    end_us = Column(BigInteger, nullable=True)
+    start_timestamp = Column(String, nullable=True)
+    end_timestamp = Column(String, nullable=True)
+    log_count = Column(Integer, default=0)
+    tf_req_duration_ms = Column(BigInteger, nullable=True)
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text
+
+from app.database import Base
+
+
+class SentryForwardJob(Base):
+    """One run of forwarding new ERROR logs to Sentry."""
+
+    __tablename__ = "sentry_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # None forwards the errors of every upload
+    upload_id = Column(Integer, nullable=True)
+    status = Column(String, default="queued", index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    errors_read = Column(Integer, default=0)
+    sent_count = Column(Integer, default=0)
+    duplicate_count = Column(Integer, default=0)
+    failed_count = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+
+
+class SentryHighWater(Base):
+    """Id of the last ERROR log of an upload that was delivered to Sentry."""
+
+    __tablename__ = "sentry_high_water"
+
+    upload_id = Column(Integer, primary_key=True)
+    last_log_id = Column(BigInteger, nullable=False)
+
+
+class SentryFingerprint(Base):
+    """Error fingerprint delivered to Sentry; later errors with it are not sent again."""
+
+    __tablename__ = "sentry_fingerprints"
+
+    fingerprint = Column(String, primary_key=True)
+    # First log reported with this fingerprint
+    upload_id = Column(Integer, nullable=False)
+    log_id = Column(BigInteger, nullable=False)
+    sent_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text
+
+from app.database import Base
+
+
+class TailSession(Base):
+    """A log file followed while Terraform is still writing it, ingested into one upload."""
+
+    __tablename__ = "tail_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String, nullable=False)
+    upload_id = Column(Integer, nullable=False)
+    status = Column(String, default="running", index=True)
+    # Byte offset right after the last ingested line; saved with the rows it covers
+    byte_offset = Column(BigInteger, default=0)
+    entries_count = Column(BigInteger, default=0)
+    fixed_logs_count = Column(Integer, default=0)
+    # Last timestamp seen by the sequence fixer, so fixing continues after a restart
+    last_timestamp = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    error = Column(Text, nullable=True)
+    # Worker process following the file while the lease has not expired, see app/services/log_tail.py
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
@@ -1,23 +1,80 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, JSON, Index, text
 
 from app.database import Base
 
 
+def _dictionary_value(field: str) -> property:
+    def get(self):
+        from app.services.log_dictionary import value_of
+        return value_of(getattr(self, f"{field}_id"))
+    return property(get, doc=f"Value of {field}_id.")
+
+
 class TerraformLog(Base):
     __tablename__ = "terraform_logs"
+    # Indexes for the hot query shapes, see migrations/versions/0003, 0004 and 0014.
+    # On PostgreSQL the table is list-partitioned by upload_id with primary key
+    # (id, upload_id), see migrations/versions/0008; indexes are created per partition.
+    __table_args__ = (
+        Index('ix_terraform_logs_req_id_timestamp', 'tf_req_id', 'timestamp_us', 'id'),
+        Index(
+            'ix_terraform_logs_no_req_id_timestamp', 'timestamp_us', 'id',
+            postgresql_where=text('tf_req_id IS NULL'),
+            sqlite_where=text('tf_req_id IS NULL')
+        ),
+        Index(
+            'ix_terraform_logs_rpc_timestamp', 'tf_rpc_id', 'timestamp_us',
+            postgresql_where=text('tf_rpc_id IS NOT NULL'),
+            sqlite_where=text('tf_rpc_id IS NOT NULL')
+        ),
+        Index(
+            'ix_terraform_logs_resource_type_timestamp', 'tf_resource_type_id', 'timestamp_us',
+            postgresql_where=text('tf_resource_type_id IS NOT NULL'),
+            sqlite_where=text('tf_resource_type_id IS NOT NULL')
+        ),
+        Index('ix_terraform_logs_level_timestamp', 'log_level_id', 'timestamp_us', 'id'),
+        # PostgreSQL text search indexes on message are created by migration 0005
+        # Other databases filter and delete uploads through an index instead of partitions
+        Index('ix_terraform_logs_upload_id', 'upload_id'),
+        {'postgresql_partition_by': 'LIST (upload_id)'},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    filename = Column(String, index=True)
+    upload_id = Column(Integer, nullable=False)
+    # Columns ending in _id hold ids of log_dictionary, see app/services/log_dictionary.py;
+    # read the attribute without the suffix for the value
+    filename_id = Column(Integer)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
-    log_level = Column(String, index=True)
+    log_level_id = Column(Integer)
+    # Original timestamp string, kept for display
     timestamp = Column(String)
+    # Timestamp normalized to UTC, in microseconds since the epoch; used for filtering and ordering
+    timestamp_us = Column(BigInteger, index=True, nullable=True)
     message = Column(Text)
-    caller = Column(String, nullable=True)
-    module = Column(String, nullable=True)
-    tf_provider_addr = Column(String, nullable=True)
+    caller_id = Column(Integer, nullable=True)
+    module_id = Column(Integer, nullable=True)
+    tf_provider_addr_id = Column(Integer, nullable=True)
     tf_req_id = Column(String, nullable=True)
-    tf_resource_type = Column(String, nullable=True)
-    tf_rpc = Column(String, nullable=True)
-    raw_data = Column(JSON)
+    tf_resource_type_id = Column(Integer, nullable=True)
+    tf_rpc_id = Column(Integer, nullable=True)
+    # Keys of the entry that are not in the columns above, see app/services/log_payloads.py;
+    # read raw_data for the entry itself
+    residual_data = Column('raw_data', JSON)
+    # Uncompressed size of the values moved to log_payloads, NULL if there are none
+    payload_size = Column(Integer, nullable=True)
+
+    filename = _dictionary_value('filename')
+    log_level = _dictionary_value('log_level')
+    caller = _dictionary_value('caller')
+    module = _dictionary_value('module')
+    tf_provider_addr = _dictionary_value('tf_provider_addr')
+    tf_resource_type = _dictionary_value('tf_resource_type')
+    tf_rpc = _dictionary_value('tf_rpc')
+
+    @property
+    def raw_data(self) -> dict:
+        """The stored entry, without the values moved to log_payloads."""
+        from app.services.log_payloads import RECORD_COLUMNS, rebuild_record
+        return rebuild_record(self.residual_data, {column: getattr(self, column) for column in RECORD_COLUMNS})
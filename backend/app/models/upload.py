@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+
+from app.database import Base
+
+
+class Upload(Base):
+    """
+    One uploaded log file.
+
+    On PostgreSQL the terraform_logs rows of an upload live in their own
+    partition, terraform_logs_u<id>, see app/services/uploads.py.
+    """
+
+    __tablename__ = "uploads"
+
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String)
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
+    log_count = Column(BigInteger, default=0)
+    # Fingerprint of the decompressed log, see app/services/log_fingerprint.py;
+    # NULL for uploads that are still being ingested or were followed live
+    content_hash = Column(String(64), nullable=True, index=True)
+    content_size = Column(BigInteger, nullable=True)
+    head_hash = Column(String(64), nullable=True, index=True)
@@ -1,3 +1,27 @@
-from .log_schemas import LogEntry, LogUploadResponse, LogWithSectionsResponse, DeleteResponse, SectionInfo
+from .log_schemas import (
+    LogEntry,
+    LogSearchHit,
+    LogUploadResponse,
+    LogWithSectionsResponse,
+    SectionsResponse,
+    DeleteResponse,
+    SectionInfo,
+    IngestJobResponse,
+    UploadResponse,
+    SentryJobResponse,
+    TailSessionResponse
+)
 
-__all__ = ['LogEntry', 'LogUploadResponse', 'LogWithSectionsResponse', 'DeleteResponse', 'SectionInfo']
+__all__ = [
+    'LogEntry',
+    'LogSearchHit',
+    'LogUploadResponse',
+    'LogWithSectionsResponse',
+    'SectionsResponse',
+    'DeleteResponse',
+    'SectionInfo',
+    'IngestJobResponse',
+    'UploadResponse',
+    'SentryJobResponse',
+    'TailSessionResponse'
+]
@@ -6,10 +6,12 @@ from pydantic import BaseModel
 
 class LogEntry(BaseModel):
     id: int
+    upload_id: Optional[int] = None
     filename: str
     uploaded_at: datetime
     log_level: Optional[str] = None
     timestamp: Optional[str] = None
+    timestamp_us: Optional[int] = None
     message: Optional[str] = None
     caller: Optional[str] = None
     module: Optional[str] = None
@@ -17,17 +19,97 @@ class LogEntry(BaseModel):
     tf_req_id: Optional[str] = None
     tf_resource_type: Optional[str] = None
     tf_rpc: Optional[str] = None
+    # Set when large values are stored out of line, see /logs/{id}/payload
+    payload_size: Optional[int] = None
     raw_data: Optional[Any] = None
 
     class Config:
         from_attributes = True
 
 
+class LogSearchHit(LogEntry):
+    rank: float
+
+
+class IngestJobResponse(BaseModel):
+    id: int
+    filename: str
+    archive_member: Optional[str] = None
+    upload_id: Optional[int] = None
+    replaces_upload_id: Optional[int] = None
+    # Bytes and entries the upload already held; only the rest of the log is ingested
+    skipped_bytes: int = 0
+    skipped_entries: int = 0
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    total_bytes: int = 0
+    bytes_read: int = 0
+    entries_parsed: int = 0
+    fixed_logs_count: int = 0
+    rows_inserted: int = 0
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TailSessionResponse(BaseModel):
+    id: int
+    path: str
+    upload_id: int
+    status: str
+    byte_offset: int = 0
+    entries_count: int = 0
+    fixed_logs_count: int = 0
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 class LogUploadResponse(BaseModel):
     message: str
     entries_count: int
     filename: str
     fixed_logs_count: int = 0
+    job_id: Optional[int] = None
+    status: Optional[str] = None
+    upload_id: Optional[int] = None
+    # One job per log of an uploaded zip archive; job_id is the first of them.
+    # Logs are fingerprinted by their jobs after this response, so duplicates and
+    # skipped_bytes/skipped_entries are only known from /jobs/{job_id}
+    jobs: List[IngestJobResponse] = []
+
+
+class SentryJobResponse(BaseModel):
+    id: int
+    upload_id: Optional[int] = None
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    errors_read: int = 0
+    sent_count: int = 0
+    duplicate_count: int = 0
+    failed_count: int = 0
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class UploadResponse(BaseModel):
+    id: int
+    filename: str
+    uploaded_at: datetime
+    log_count: int = 0
+
+    class Config:
+        from_attributes = True
 
 
 class SectionInfo(BaseModel):
@@ -37,6 +119,14 @@ class SectionInfo(BaseModel):
     log_count: int
     start_timestamp: Optional[str] = None
     end_timestamp: Optional[str] = None
+    id: Optional[int] = None
+    upload_id: Optional[int] = None
+    filename: Optional[str] = None
+    start_id: Optional[int] = None
+    end_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
 
 
 class LogWithSectionsResponse(BaseModel):
@@ -47,6 +137,13 @@ class LogWithSectionsResponse(BaseModel):
     fixed_logs_count: int = 0
 
 
+class SectionsResponse(BaseModel):
+    sections: List[SectionInfo]
+    filename: str
+    total_logs: int
+    fixed_logs_count: int = 0
+
+
 class DeleteResponse(BaseModel):
     message: str
     deleted_count: int
@@ -2,22 +2,96 @@ from .log_service import (
     parse_terraform_log, 
     parse_terraform_log_with_sections,
     save_logs_to_db, 
+    ingest_log_stream,
+    ingest_log_file,
     get_all_logs, 
-    get_logs_by_level,
     delete_all_logs,
-    get_gantt_data,
-    get_sections_from_db
+    get_sections_from_db,
+    get_section_logs,
+    get_request_ids,
+    get_logs_by_request
+)
+from .log_stream import iter_file_chunks
+from .log_parallel import parse_terraform_log_parallel
+from .log_pagination import encode_cursor
+from .log_export import iter_export, export_filename, EXPORT_FORMATS, EXPORT_MEDIA_TYPES
+from .log_projection import parse_fields, encode_log_rows, projected_columns
+from .log_payloads import get_log_payload
+from .log_stats import get_stats
+from .log_gantt import get_gantt_data, GANTT_MAX_BARS
+from .log_search import search_logs, SEARCH_MODES
+from .log_timestamps import parse_timestamp_us, format_timestamp_us
+from .log_rules import get_rule_engine, classify_entry
+from .log_archive import detect_compression, MAGIC_SIZE
+from .uploads import create_upload, list_uploads, delete_upload, delete_all_uploads
+from .result_cache import result_cache, invalidate_results
+from .ingest_jobs import submit_ingest_jobs, get_ingest_job, shutdown_executor
+from .sentry_service import submit_sentry_job, get_sentry_job, shutdown_sentry_executor
+from .log_tail import (
+    tail_broker,
+    resolve_tail_path,
+    start_tail,
+    stop_tail,
+    get_tail,
+    get_tail_backlog,
+    TAIL_BACKLOG_LIMIT,
+    resume_tails,
+    shutdown_tails
 )
-from .sentry_service import send_error_logs_to_sentry
 
 __all__ = [
     'parse_terraform_log',
     'parse_terraform_log_with_sections', 
     'save_logs_to_db', 
+    'ingest_log_stream',
+    'ingest_log_file',
     'get_all_logs', 
-    'get_logs_by_level',
     'delete_all_logs',
     'get_gantt_data',
+    'GANTT_MAX_BARS',
     'get_sections_from_db',
-    'send_error_logs_to_sentry'
+    'get_section_logs',
+    'get_request_ids',
+    'get_logs_by_request',
+    'submit_sentry_job',
+    'get_sentry_job',
+    'shutdown_sentry_executor',
+    'tail_broker',
+    'resolve_tail_path',
+    'start_tail',
+    'stop_tail',
+    'get_tail',
+    'get_tail_backlog',
+    'TAIL_BACKLOG_LIMIT',
+    'resume_tails',
+    'shutdown_tails',
+    'iter_file_chunks',
+    'parse_terraform_log_parallel',
+    'encode_cursor',
+    'iter_export',
+    'export_filename',
+    'EXPORT_FORMATS',
+    'EXPORT_MEDIA_TYPES',
+    'parse_fields',
+    'encode_log_rows',
+    'projected_columns',
+    'get_log_payload',
+    'get_stats',
+    'search_logs',
+    'SEARCH_MODES',
+    'parse_timestamp_us',
+    'format_timestamp_us',
+    'get_rule_engine',
+    'classify_entry',
+    'detect_compression',
+    'MAGIC_SIZE',
+    'submit_ingest_jobs',
+    'get_ingest_job',
+    'shutdown_executor',
+    'create_upload',
+    'list_uploads',
+    'delete_upload',
+    'delete_all_uploads',
+    'result_cache',
+    'invalidate_results'
 ]
\ No newline at end of file
@@ -0,0 +1,260 @@
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+import zipfile
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+from typing import BinaryIO
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, engine
+from app.models import IngestJob, Upload
+from app.services.log_archive import detect_file_compression, list_archive_members
+from app.services.log_fingerprint import (
+    ContentFingerprint,
+    fingerprint_log,
+    find_duplicate_upload,
+    save_fingerprint
+)
+from app.services.log_parallel import shutdown_parse_executor
+from app.services.log_service import ingest_log_file, extend_log_file
+from app.services.log_stream import IngestProgress
+from app.services.result_cache import invalidate_results
+from app.services.uploads import create_upload, delete_upload, replace_upload
+
+logger = logging.getLogger(__name__)
+
+# Number of uploads processed in parallel
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 2)))
+# "thread" or "process"
+INGEST_WORKER_MODE = os.getenv("INGEST_WORKER_MODE", "thread")
+# Directory where accepted uploads wait for a worker
+INGEST_SPOOL_DIR = os.getenv(
+    "INGEST_SPOOL_DIR",
+    os.path.join(tempfile.gettempdir(), "terraform-logviewer")
+)
+
+_executor: Executor | None = None
+
+
+def get_executor() -> Executor:
+    """Return the ingestion worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        if INGEST_WORKER_MODE == "process":
+            _executor = ProcessPoolExecutor(
+                max_workers=INGEST_WORKERS,
+                initializer=_init_worker_process
+            )
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=INGEST_WORKERS,
+                thread_name_prefix="ingest"
+            )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the worker pool, waiting for running jobs to finish."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    shutdown_parse_executor()
+
+
+def _init_worker_process():
+    # Connections inherited from the parent process must not be reused
+    engine.dispose(close=False)
+
+
+def submit_ingest_jobs(
+        db: Session,
+        fileobj: BinaryIO,
+        filename: str,
+        replaces_upload_id: int | None = None
+) -> list[IngestJob]:
+    """
+    Accept an upload into the ingestion queue.
+
+    The file is copied to the spool directory, so it outlives the request,
+    and handed over to the worker pool. A zip archive becomes one job and
+    one upload per log file it contains, other uploads a single job. If
+    replaces_upload_id is given, that upload is deleted once the new one is
+    ingested successfully. Raises ValueError for archives without logs.
+
+    Logs are fingerprinted by their job, not here, see run_ingest_job.
+    """
+    os.makedirs(INGEST_SPOOL_DIR, exist_ok=True)
+    fd, spool_path = tempfile.mkstemp(dir=INGEST_SPOOL_DIR, suffix=".upload")
+    with os.fdopen(fd, "wb") as spool_file:
+        shutil.copyfileobj(fileobj, spool_file)
+
+    if detect_file_compression(spool_path) != 'zip':
+        job = _create_job(db, filename, None, os.path.getsize(spool_path), replaces_upload_id)
+        _submit(job, spool_path)
+        return [job]
+
+    try:
+        members = list_archive_members(spool_path)
+        if not members:
+            raise ValueError("The archive contains no log files")
+        if replaces_upload_id is not None and len(members) > 1:
+            raise ValueError("replaces_upload_id can not be used with an archive of several logs")
+    except (ValueError, zipfile.BadZipFile):
+        os.remove(spool_path)
+        raise
+
+    jobs = [
+        _create_job(db, f"{filename}/{member.filename}", member.filename, member.compress_size, replaces_upload_id)
+        for member in members
+    ]
+    # Every job removes its own spool file, links share the data of the upload
+    for job in jobs[1:]:
+        _submit(job, _link_spool(spool_path))
+    _submit(jobs[0], spool_path)
+    return jobs
+
+
+def _fingerprint(db: Session, spool_path: str, member: str | None) -> ContentFingerprint | None:
+    try:
+        return fingerprint_log(db, spool_path, member)
+    except Exception:
+        # Not fatal here: the log is ingested in full and a broken file fails its job
+        logger.warning("Could not fingerprint %s", member or spool_path, exc_info=True)
+        return None
+
+
+def _create_job(
+        db: Session,
+        filename: str,
+        archive_member: str | None,
+        total_bytes: int,
+        replaces_upload_id: int | None
+) -> IngestJob:
+    upload = create_upload(db, filename)
+    job = IngestJob(
+        filename=filename,
+        archive_member=archive_member,
+        upload_id=upload.id,
+        replaces_upload_id=replaces_upload_id,
+        status="queued",
+        total_bytes=total_bytes
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _link_spool(spool_path: str) -> str:
+    link_path = os.path.join(INGEST_SPOOL_DIR, f"{uuid.uuid4().hex}.upload")
+    try:
+        os.link(spool_path, link_path)
+    except OSError:
+        # File systems without hard links
+        shutil.copyfile(spool_path, link_path)
+    return link_path
+
+
+def _submit(job: IngestJob, spool_path: str) -> None:
+    future = get_executor().submit(run_ingest_job, job.id, spool_path)
+    # In process mode the worker invalidates the cache of its own process only
+    future.add_done_callback(lambda _: invalidate_results())
+
+
+def run_ingest_job(job_id: int, spool_path: str) -> None:
+    """
+    Worker entry point: ingest a spooled upload and track progress in its job row.
+
+    The log is fingerprinted first, see log_fingerprint. A log that is
+    already stored is not ingested: the job ends with status "duplicate" and
+    points at the stored upload. A log that extends a stored upload gets an
+    upload of its own, which starts with a copy of the stored entries; only
+    its tail is parsed. Jobs that replace an upload always ingest the log in
+    full. The fingerprint is saved on the upload once the job completes.
+    """
+    db = SessionLocal()
+    own_upload_id = None
+    try:
+        job = db.get(IngestJob, job_id)
+        own_upload_id = job.upload_id
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        fingerprint = _fingerprint(db, spool_path, job.archive_member)
+        if fingerprint is not None and job.replaces_upload_id is None:
+            stored = find_duplicate_upload(db, fingerprint)
+            if stored is not None:
+                _reuse_upload(db, job, stored, fingerprint.content_size)
+                job.status = "duplicate"
+                job.finished_at = datetime.utcnow()
+                db.commit()
+                return
+            prefix = db.get(Upload, fingerprint.prefix_upload_id) if fingerprint.prefix_upload_id else None
+            if prefix is not None:
+                job.skipped_bytes = fingerprint.prefix_size
+                job.skipped_entries = prefix.log_count or 0
+                db.commit()
+
+        def update_progress(progress: IngestProgress):
+            job.bytes_read = progress.bytes_read
+            job.entries_parsed = progress.entries_parsed
+            job.fixed_logs_count = progress.fixed_logs_count
+            job.rows_inserted = progress.rows_inserted
+
+        if job.skipped_bytes:
+            count, _ = extend_log_file(
+                db, spool_path, job.upload_id, fingerprint.prefix_upload_id, job.skipped_bytes,
+                on_progress=update_progress, member=job.archive_member
+            )
+        else:
+            count, _ = ingest_log_file(
+                db, spool_path, job.filename, on_progress=update_progress,
+                upload_id=job.upload_id, member=job.archive_member
+            )
+
+        # A tail of blank or invalid lines still leaves the upload complete
+        if count or job.skipped_bytes:
+            if fingerprint is not None:
+                save_fingerprint(db, job.upload_id, fingerprint)
+            replace_upload(db, job)
+            job.status = "completed"
+        else:
+            job.status = "failed"
+            job.error = "No valid log entries found in the file"
+            delete_upload(db, job.upload_id)
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        logger.exception("Ingest job %s failed", job_id)
+        db.rollback()
+        db.query(IngestJob).filter(IngestJob.id == job_id).update({
+            IngestJob.status: "failed",
+            IngestJob.error: str(e),
+            IngestJob.finished_at: datetime.utcnow()
+        })
+        db.commit()
+        # Drop the rows committed before the failure; a stored upload the job pointed at is not touched
+        if own_upload_id is not None:
+            delete_upload(db, own_upload_id)
+    finally:
+        db.close()
+        os.remove(spool_path)
+
+
+def _reuse_upload(db: Session, job: IngestJob, stored: Upload, skipped_bytes: int) -> None:
+    """Point a job at a stored upload with the same log and commit, dropping its own upload."""
+    own_upload_id = job.upload_id
+    job.upload_id = stored.id
+    job.skipped_bytes = skipped_bytes
+    job.skipped_entries = stored.log_count or 0
+    delete_upload(db, own_upload_id)
+
+
+def get_ingest_job(db: Session, job_id: int) -> IngestJob | None:
+    return db.get(IngestJob, job_id)
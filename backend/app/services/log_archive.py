@@ -0,0 +1,125 @@
+"""
+Compressed and archived uploads.
+
+Uploads are recognised by their magic bytes, not by their names: gzip
+(including multi-member files), zstd, bzip2 and xz streams are decompressed
+while they are read, so a log never exists decompressed as a whole, neither
+in memory nor on disk. Every log in a zip archive is ingested as an upload
+of its own; members may be compressed themselves.
+"""
+import bz2
+import gzip
+import lzma
+import os
+import zipfile
+from typing import BinaryIO
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+MAGIC_BYTES = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip'),
+    (b'PK\x05\x06', 'zip'),
+)
+MAGIC_SIZE = max(len(magic) for magic, _ in MAGIC_BYTES)
+
+# Archive members that are ingested; anything else (READMEs, plans, state) is skipped
+LOG_SUFFIXES = ('.json', '.jsonl', '.log')
+COMPRESSED_SUFFIXES = ('.gz', '.zst', '.bz2', '.xz')
+
+
+def detect_compression(head: bytes) -> str | None:
+    """Compression or archive format of data starting with head, None for plain text."""
+    for magic, kind in MAGIC_BYTES:
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def detect_file_compression(path: str) -> str | None:
+    with open(path, 'rb') as f:
+        return detect_compression(f.read(MAGIC_SIZE))
+
+
+def is_log_member(name: str) -> bool:
+    name = name.lower()
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return name.endswith(LOG_SUFFIXES)
+
+
+def list_archive_members(path: str) -> list[zipfile.ZipInfo]:
+    """Log files of a zip archive, in archive order."""
+    with zipfile.ZipFile(path) as archive:
+        return [
+            info for info in archive.infolist()
+            if not info.is_dir() and is_log_member(info.filename)
+        ]
+
+
+def decompress_stream(fileobj: BinaryIO, kind: str) -> BinaryIO:
+    """Wrap a binary file object in a reader that decompresses it incrementally."""
+    if kind == 'gzip':
+        return gzip.GzipFile(fileobj=fileobj, mode='rb')
+    if kind == 'bz2':
+        return bz2.BZ2File(fileobj, mode='rb')
+    if kind == 'xz':
+        return lzma.LZMAFile(fileobj, mode='rb')
+    if kind == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd compressed uploads need the zstandard package")
+        return zstandard.ZstdDecompressor().stream_reader(fileobj, read_across_frames=True)
+    raise ValueError(f"Unsupported compression: {kind}")
+
+
+class LogReader:
+    """
+    Decompressed view of a spooled upload or of one member of a zip archive.
+
+    stream yields the plain log. compressed_bytes_read() reports how much of
+    the compressed input was consumed, which is what total_bytes of a job
+    counts, so progress stays comparable for compressed uploads.
+    """
+
+    def __init__(self, path: str, member: str | None = None):
+        self.raw = open(path, 'rb')
+        self.archive = None
+        try:
+            if member is not None:
+                self.archive = zipfile.ZipFile(self.raw)
+                info = self.archive.getinfo(member)
+                self.start, self.size = info.header_offset, info.compress_size
+                source = self.archive.open(info)
+            else:
+                self.start, self.size = 0, os.path.getsize(path)
+                source = self.raw
+
+            kind = detect_compression(source.peek(MAGIC_SIZE)[:MAGIC_SIZE])
+            if kind == 'zip':
+                raise ValueError("Zip archives are only supported at the top level")
+            self.stream = decompress_stream(source, kind) if kind else source
+        except Exception:
+            self.close()
+            raise
+
+    def compressed_bytes_read(self) -> int:
+        return min(max(self.raw.tell() - self.start, 0), self.size)
+
+    def close(self) -> None:
+        if self.archive is not None:
+            self.archive.close()
+        self.raw.close()
+
+    def __enter__(self) -> 'LogReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
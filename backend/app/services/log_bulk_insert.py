@@ -0,0 +1,195 @@
+import io
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.json_codec import dumps_json
+from app.models import TerraformLog
+from app.services.log_dictionary import encode_rows
+from app.services.log_payloads import split_entry, save_payloads
+from app.services.log_stream import iter_batches
+from app.services.log_timestamps import parse_timestamp_us
+
+logger = logging.getLogger(__name__)
+
+# Number of rows sent to the database in one statement
+INSERT_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "5000"))
+# Number of batches written between two commits
+INSERT_COMMIT_EVERY = int(os.getenv("INGEST_COMMIT_EVERY", "10"))
+# "copy" or "executemany"; COPY is only used on PostgreSQL with psycopg2
+INSERT_METHOD = os.getenv("INGEST_INSERT_METHOD", "copy")
+
+LOG_COLUMNS = (
+    'upload_id',
+    'filename_id',
+    'uploaded_at',
+    'log_level_id',
+    'timestamp',
+    'timestamp_us',
+    'message',
+    'caller_id',
+    'module_id',
+    'tf_provider_addr_id',
+    'tf_req_id',
+    'tf_resource_type_id',
+    'tf_rpc_id',
+    'raw_data',
+    'payload_size',
+)
+
+
+@dataclass
+class InsertStats:
+    """Result of a bulk insert."""
+    rows: int
+    seconds: float
+    method: str
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def log_to_row(log: dict, filename: str, uploaded_at: datetime, upload_id: int) -> dict:
+    """
+    Map a parsed log entry to terraform_logs column values, see split_entry.
+
+    Dictionary-encoded columns are set by their values; bulk_insert_rows
+    adds the ids before the rows are written.
+    """
+    timestamp = log.get('@timestamp') or log.get('timestamp')
+    row = {
+        'upload_id': upload_id,
+        'filename': filename,
+        'uploaded_at': uploaded_at,
+        'log_level': log.get('@level') or log.get('level'),
+        'timestamp': timestamp,
+        'timestamp_us': parse_timestamp_us(timestamp),
+        'message': log.get('@message') or log.get('message'),
+        'caller': log.get('@caller'),
+        'module': log.get('@module'),
+        'tf_provider_addr': log.get('tf_provider_addr'),
+        'tf_req_id': log.get('tf_req_id'),
+        'tf_resource_type': log.get('tf_resource_type'),
+        'tf_rpc': log.get('tf_rpc'),
+    }
+    split_entry(log, row)
+    return row
+
+
+def choose_insert_method(db: Session) -> str:
+    """Pick the fastest write path supported by the session's database."""
+    dialect = db.get_bind().dialect
+    if INSERT_METHOD == 'copy' and dialect.name == 'postgresql' and dialect.driver == 'psycopg2':
+        return 'copy'
+    return 'executemany'
+
+
+def bulk_insert_rows(
+        db: Session,
+        rows: Iterable[dict],
+        batch_size: int = INSERT_BATCH_SIZE,
+        commit_every: int = INSERT_COMMIT_EVERY,
+        on_commit: Callable[[int], None] | None = None,
+        on_batch: Callable[[list[dict]], None] | None = None
+) -> InsertStats:
+    """
+    Insert terraform_logs rows bypassing the ORM unit of work.
+
+    On PostgreSQL rows are streamed with COPY FROM STDIN, other databases get
+    multi-row Core INSERT statements. A commit is issued every commit_every
+    batches and at the end, unless the last batch was just committed.
+    on_commit is called with the number of rows written so far right before
+    each commit, so it may add its own changes to the same transaction.
+    on_batch is called with every written batch;
+    its rows then carry the ids assigned by the database. The dictionary ids
+    of each batch are looked up before it is written, and out-of-line
+    payloads of the rows are written right after it.
+    """
+    method = choose_insert_method(db)
+    write_batch = _copy_batch if method == 'copy' else _executemany_batch
+
+    started = time.perf_counter()
+    count = committed = 0
+    for batch_number, batch in enumerate(iter_batches(rows, batch_size), start=1):
+        encode_rows(db, batch)
+        write_batch(db, batch)
+        save_payloads(db, batch)
+        if on_batch:
+            on_batch(batch)
+        count += len(batch)
+        if batch_number % commit_every == 0:
+            if on_commit:
+                on_commit(count)
+            db.commit()
+            committed = count
+    if not count or count != committed:
+        if on_commit:
+            on_commit(count)
+        db.commit()
+
+    stats = InsertStats(rows=count, seconds=time.perf_counter() - started, method=method)
+    logger.info(
+        "Inserted %d rows in %.2fs (%.0f rows/sec, %s)",
+        stats.rows, stats.seconds, stats.rows_per_second, stats.method
+    )
+    return stats
+
+
+def _executemany_batch(db: Session, batch: list[dict]) -> None:
+    # A Core insert into the table: rows are keyed by column name, raw_data is not an ORM attribute
+    table = TerraformLog.__table__
+    statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+    for row, row_id in zip(batch, db.execute(statement, batch).scalars()):
+        row['id'] = row_id
+
+
+def _copy_batch(db: Session, batch: list[dict]) -> None:
+    # COPY does not return generated keys, so ids are taken from the sequence up front
+    ids = db.execute(
+        text(
+            f"SELECT nextval(pg_get_serial_sequence('{TerraformLog.__tablename__}', 'id')) "
+            "FROM generate_series(1, :count)"
+        ),
+        {'count': len(batch)}
+    ).scalars().all()
+
+    buffer = io.StringIO()
+    for row, row_id in zip(batch, sorted(ids)):
+        row['id'] = row_id
+        buffer.write(str(row_id))
+        buffer.write('\t')
+        buffer.write('\t'.join(_copy_value(column, row[column]) for column in LOG_COLUMNS))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    dbapi_connection = db.connection().connection.dbapi_connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {TerraformLog.__tablename__} (id, {', '.join(LOG_COLUMNS)}) FROM STDIN",
+            buffer
+        )
+
+
+def _copy_value(column: str, value) -> str:
+    """Encode a value for the COPY text format."""
+    if value is None:
+        return '\\N'
+    if column == 'raw_data':
+        value = dumps_json(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    return (
+        value.replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
@@ -0,0 +1,183 @@
+"""
+Dictionary encoding of the low-cardinality columns of terraform_logs.
+
+Levels, modules, callers, provider addresses, rpcs, resource types and file
+names repeat on every row but only have a few hundred distinct values. They
+are stored once in log_dictionary, and terraform_logs keeps their integer
+ids in <field>_id columns, so rows and indexes are narrower and filters
+compare integers.
+
+Ids are looked up in a per process cache. Read functions call
+load_row_values on their results while their session is open, which
+reloads the cache through that session when an id is missing, e.g. one
+written by another process; value_of and decode_values then only read the
+cache and never query the database, so decoding does not block the event
+loop in async read mode. Values that are new to the cache are inserted by
+the ingest transaction itself; their ids are only shared with the rest of
+the process once it commits, so a rolled back ingest never leaves ids in
+the cache that do not exist.
+"""
+import threading
+from typing import Iterable
+
+from sqlalchemy import and_, event, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import LogDictionaryEntry, TerraformLog
+
+DICTIONARY_FIELDS = (
+    'filename',
+    'log_level',
+    'caller',
+    'module',
+    'tf_provider_addr',
+    'tf_resource_type',
+    'tf_rpc',
+)
+ID_COLUMNS = {field: f"{field}_id" for field in DICTIONARY_FIELDS}
+
+# Session.info key of the values a session inserted and has not committed yet
+_PENDING_KEY = 'log_dictionary_pending'
+
+_ids: dict[str, dict[str, int]] = {field: {} for field in DICTIONARY_FIELDS}
+_values: dict[int, str] = {}
+_lock = threading.Lock()
+
+
+def _remember(entries: Iterable[tuple[int, str, str]]) -> None:
+    with _lock:
+        for value_id, field, value in entries:
+            ids = _ids.get(field)
+            if ids is not None:
+                ids[value] = value_id
+                _values[value_id] = value
+
+
+def load_dictionary(db: Session) -> None:
+    """Read all values into the cache; the dictionary only ever grows, so nothing is evicted."""
+    table = LogDictionaryEntry.__table__
+    _remember(db.execute(select(table.c.id, table.c.field, table.c.value)).all())
+
+
+def load_row_values(db: Session, rows) -> None:
+    """
+    Make sure the dictionary ids of query results are cached, reloading the cache through db if one is missing.
+
+    rows are TerraformLog objects or rows with the ids labelled by field name, see projected_columns.
+    """
+    for row in rows:
+        if isinstance(row, TerraformLog):
+            value_ids = [getattr(row, id_column) for id_column in ID_COLUMNS.values()]
+        else:
+            mapping = row._mapping
+            value_ids = [mapping[field] for field in DICTIONARY_FIELDS if field in mapping]
+        if any(value_id is not None and value_id not in _values for value_id in value_ids):
+            load_dictionary(db)
+            return
+
+
+def value_of(value_id: int | None) -> str | None:
+    """The value of an id, None for None; ids of other processes are only known after load_row_values."""
+    if value_id is None:
+        return None
+    return _values.get(value_id)
+
+
+def decode_values(values) -> dict:
+    """A copy of a mapping by column name with the dictionary ids in it replaced by their values."""
+    values = dict(values)
+    for field in DICTIONARY_FIELDS:
+        if field in values:
+            values[field] = value_of(values[field])
+    return values
+
+
+def lookup_id(db: Session, field: str, value: str) -> int | None:
+    """The id of a stored value, for filters; None if no row has this value."""
+    value_id = _ids[field].get(value)
+    if value_id is None:
+        load_dictionary(db)
+        value_id = _ids[field].get(value)
+    return value_id
+
+
+def encode_rows(db: Session, rows: list[dict]) -> None:
+    """
+    Set the <field>_id columns of terraform_logs rows from their values.
+
+    Values that are not in the dictionary yet are inserted in the current
+    transaction of db. The value keys stay in the rows for the callers of
+    bulk_insert_rows; only the id columns are written.
+    """
+    pending = _pending(db)
+    missing: dict[str, set[str]] = {}
+    for field in DICTIONARY_FIELDS:
+        ids, new_ids = _ids[field], pending.get(field, {})
+        for row in rows:
+            value = row[field]
+            if value is not None:
+                value = str(value)
+                if value not in ids and value not in new_ids:
+                    missing.setdefault(field, set()).add(value)
+    if missing:
+        for value_id, field, value in _insert_values(db, missing):
+            pending.setdefault(field, {})[value] = value_id
+
+    for field, id_column in ID_COLUMNS.items():
+        ids, new_ids = _ids[field], pending.get(field, {})
+        for row in rows:
+            value = row[field]
+            if value is None:
+                row[id_column] = None
+            else:
+                value = str(value)
+                row[id_column] = ids.get(value) or new_ids[value]
+
+
+def _insert_values(db: Session, missing: dict[str, set[str]]) -> list:
+    """Insert new values, tolerating concurrent ingests that insert them too, and return their ids."""
+    table = LogDictionaryEntry.__table__
+    rows = [{'field': field, 'value': value} for field in sorted(missing) for value in sorted(missing[field])]
+    dialect = db.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        db.execute(insert(table).on_conflict_do_nothing(index_elements=[table.c.field, table.c.value]), rows)
+    else:
+        existing = {(field, value) for _, field, value in _select_values(db, missing)}
+        rows = [row for row in rows if (row['field'], row['value']) not in existing]
+        if rows:
+            db.execute(table.insert(), rows)
+    return _select_values(db, missing)
+
+
+def _select_values(db: Session, values: dict[str, set[str]]) -> list:
+    table = LogDictionaryEntry.__table__
+    condition = or_(*(
+        and_(table.c.field == field, table.c.value.in_(sorted(field_values)))
+        for field, field_values in values.items()
+    ))
+    return db.execute(select(table.c.id, table.c.field, table.c.value).where(condition)).all()
+
+
+def _pending(db: Session) -> dict[str, dict[str, int]]:
+    pending = db.info.get(_PENDING_KEY)
+    if pending is None:
+        pending = db.info[_PENDING_KEY] = {}
+        event.listen(db, 'after_commit', _promote_pending)
+        event.listen(db, 'after_rollback', _discard_pending)
+    return pending
+
+
+def _promote_pending(session: Session) -> None:
+    pending = session.info[_PENDING_KEY]
+    _remember(
+        (value_id, field, value)
+        for field, values in pending.items()
+        for value, value_id in values.items()
+    )
+    pending.clear()
+
+
+def _discard_pending(session: Session) -> None:
+    session.info[_PENDING_KEY].clear()
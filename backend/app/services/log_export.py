@@ -0,0 +1,139 @@
+import csv
+import io
+import os
+import zlib
+from typing import Iterator
+
+from sqlalchemy import Text, and_, cast
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.json_codec import dumps_json, loads
+from app.models import TerraformLog, LogPayload
+from app.services.log_dictionary import DICTIONARY_FIELDS, load_row_values, value_of
+from app.services.log_pagination import order_by_sort_key
+from app.services.log_payloads import rebuild_record, decode_payload
+from app.services.log_service import filter_logs
+
+# Number of rows fetched from the server-side cursor at a time
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+EXPORT_COLUMNS = (
+    TerraformLog.id,
+    TerraformLog.upload_id,
+    TerraformLog.filename_id.label('filename'),
+    TerraformLog.uploaded_at,
+    TerraformLog.log_level_id.label('log_level'),
+    TerraformLog.timestamp,
+    TerraformLog.timestamp_us,
+    TerraformLog.message,
+    TerraformLog.caller_id.label('caller'),
+    TerraformLog.module_id.label('module'),
+    TerraformLog.tf_provider_addr_id.label('tf_provider_addr'),
+    TerraformLog.tf_req_id,
+    TerraformLog.tf_resource_type_id.label('tf_resource_type'),
+    TerraformLog.tf_rpc_id.label('tf_rpc'),
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS) + ('raw_data',)
+
+
+def iter_export(
+        fmt: str = 'ndjson',
+        compress: bool = False,
+        group_by_request_id: bool = True,
+        **filters
+) -> Iterator[bytes]:
+    """
+    Yield every log matching the /logs filters as NDJSON or CSV bytes.
+
+    Rows are read through a server-side cursor as plain tuples, so memory
+    stays flat and no ORM objects or schemas are built per row. Exports are
+    complete: raw_data is rebuilt with the values stored out of line. The
+    generator opens its own session, which is closed when it is exhausted
+    or closed by the response.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    encode = _encode_ndjson if fmt == 'ndjson' else _encode_csv
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    db = SessionLocal()
+    try:
+        query = db.query(*EXPORT_COLUMNS, cast(TerraformLog.residual_data, Text), LogPayload.data).outerjoin(
+            LogPayload, and_(LogPayload.log_id == TerraformLog.id, LogPayload.upload_id == TerraformLog.upload_id)
+        )
+        query = filter_logs(query, **filters)
+        statement = order_by_sort_key(query, group_by_request_id).statement
+        # yield_per implies stream_results, i.e. a named cursor on psycopg2
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for chunk in encode(_with_values(db, result.partitions())):
+            if compressor is None:
+                yield chunk
+            else:
+                compressed = compressor.compress(chunk)
+                if compressed:
+                    yield compressed
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        db.close()
+
+
+def export_filename(fmt: str, compress: bool) -> str:
+    return f"terraform_logs.{fmt}" + ('.gz' if compress else '')
+
+
+def _export_record(row) -> tuple[dict, dict]:
+    """Column values and the complete entry of an exported row."""
+    *values, residual, payload = row
+    record = dict(zip(EXPORT_FIELDS, values))
+    for field in DICTIONARY_FIELDS:
+        record[field] = value_of(record[field])
+    entry = rebuild_record(loads(residual) if residual else None, record)
+    if payload is not None:
+        moved = decode_payload(payload)
+        entry.update(moved)
+        if '@message' in moved:
+            record['message'] = moved['@message']
+    return record, entry
+
+
+def _with_values(db: Session, partitions) -> Iterator[list]:
+    for partition in partitions:
+        load_row_values(db, partition)
+        yield partition
+
+
+def _encode_ndjson(partitions) -> Iterator[bytes]:
+    for partition in partitions:
+        lines = []
+        for row in partition:
+            record, entry = _export_record(row)
+            if record['uploaded_at'] is not None:
+                record['uploaded_at'] = record['uploaded_at'].isoformat()
+            record['raw_data'] = entry
+            lines.append(dumps_json(record))
+            lines.append('\n')
+        yield ''.join(lines).encode('utf-8')
+
+
+def _encode_csv(partitions) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for partition in partitions:
+        for row in partition:
+            record, entry = _export_record(row)
+            writer.writerow([*record.values(), dumps_json(entry)])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
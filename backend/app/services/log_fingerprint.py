@@ -0,0 +1,167 @@
+"""
+Content fingerprints of uploaded logs.
+
+The decompressed content of an upload is hashed chunk by chunk while it is
+read, before anything is parsed, so uploads of logs that are already stored
+cost a read instead of a full ingest:
+
+* a log with the same content hash as a stored upload is not ingested at
+  all, the stored upload is returned instead;
+* a JSONL log that starts with the complete content of a stored upload,
+  e.g. the log of a terraform run uploaded again after more lines were
+  written, gets a new upload that starts with a copy of the stored entries:
+  only the new tail is parsed. The stored upload is not changed.
+
+Stored uploads that may be a prefix of the log are looked up by the hash of
+the first line as soon as it has been read; the running hash is then
+snapshotted at the size of each of them. Fingerprints are saved once an
+upload is ingested completely, so a failed or running ingest is never
+matched.
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, NamedTuple
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from app.models import IngestJob, Upload
+from app.services.log_archive import LogReader
+from app.services.log_stream import iter_file_chunks
+
+# The first line identifies candidate prefixes; longer lines are cut here
+HEAD_SIZE = 64 * 1024
+# Stored uploads compared as possible prefixes of one log
+FINGERPRINT_MAX_CANDIDATES = int(os.getenv("FINGERPRINT_MAX_CANDIDATES", "32"))
+
+
+class PrefixCandidate(NamedTuple):
+    upload_id: int
+    content_size: int
+    content_hash: str
+
+
+@dataclass
+class ContentFingerprint:
+    content_hash: str
+    content_size: int
+    head_hash: str
+    # Stored upload whose whole content the log starts with, if any
+    prefix_upload_id: int | None = None
+    prefix_size: int = 0
+
+
+def fingerprint_stream(
+        stream: BinaryIO,
+        find_candidates: Callable[[str], list[PrefixCandidate]] = lambda head_hash: []
+) -> ContentFingerprint:
+    """
+    Hash a decompressed log; find_candidates(head_hash) returns the stored
+    uploads that may be a prefix of it.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    last_byte = b''
+    head = b''
+    head_hash = None
+    # Ascending by size; only uploads that end at a line end of a JSONL log can be extended
+    pending: list[PrefixCandidate] = []
+    prefix: PrefixCandidate | None = None
+
+    def consume(data: bytes) -> None:
+        nonlocal size, last_byte, prefix
+        view = memoryview(data)
+        start = 0
+        while pending and pending[0].content_size <= size + len(data):
+            candidate = pending.pop(0)
+            cut = candidate.content_size - size
+            hasher.update(view[start:cut])
+            start = cut
+            ends_line = (data[cut - 1:cut] if cut else last_byte) == b'\n'
+            if ends_line and hasher.copy().hexdigest() == candidate.content_hash:
+                prefix = candidate
+        hasher.update(view[start:])
+        size += len(data)
+        if data:
+            last_byte = data[-1:]
+
+    def read_head(data: bytes, at_end: bool) -> str | None:
+        end = data.find(b'\n', 0, HEAD_SIZE)
+        if end >= 0:
+            return hashlib.sha256(data[:end]).hexdigest()
+        if len(data) >= HEAD_SIZE or at_end:
+            return hashlib.sha256(data[:HEAD_SIZE]).hexdigest()
+        return None
+
+    def start(data: bytes) -> str:
+        head_hash = read_head(data, at_end=True)
+        if not data.lstrip().startswith(b'['):
+            pending.extend(sorted(find_candidates(head_hash), key=lambda candidate: candidate.content_size))
+        consume(data)
+        return head_hash
+
+    for chunk in iter_file_chunks(stream):
+        if head_hash is not None:
+            consume(chunk)
+            continue
+        head += chunk
+        if read_head(head, at_end=False) is not None:
+            head_hash = start(head)
+            head = b''
+    if head_hash is None:
+        head_hash = start(head)
+
+    fingerprint = ContentFingerprint(hasher.hexdigest(), size, head_hash)
+    if prefix is not None and prefix.content_size < size:
+        fingerprint.prefix_upload_id = prefix.upload_id
+        fingerprint.prefix_size = prefix.content_size
+    return fingerprint
+
+
+def fingerprint_log(db: Session, path: str, member: str | None = None) -> ContentFingerprint:
+    """Fingerprint a spooled upload or one member of a zip archive, see LogReader."""
+    with LogReader(path, member) as reader:
+        return fingerprint_stream(reader.stream, lambda head_hash: find_prefix_candidates(db, head_hash))
+
+
+def _is_idle():
+    # Leaves out uploads that a queued or running job is still writing to
+    return ~exists().where(
+        IngestJob.upload_id == Upload.id,
+        IngestJob.status.in_(("queued", "running"))
+    )
+
+
+def find_prefix_candidates(db: Session, head_hash: str) -> list[PrefixCandidate]:
+    rows = (
+        db.query(Upload.id, Upload.content_size, Upload.content_hash)
+        .filter(Upload.head_hash == head_hash, Upload.content_hash.isnot(None), _is_idle())
+        .order_by(Upload.id.desc())
+        .limit(FINGERPRINT_MAX_CANDIDATES)
+        .all()
+    )
+    return [PrefixCandidate(*row) for row in rows]
+
+
+def find_duplicate_upload(db: Session, fingerprint: ContentFingerprint) -> Upload | None:
+    """The most recent stored upload with the same content, if any."""
+    return (
+        db.query(Upload)
+        .filter(
+            Upload.content_hash == fingerprint.content_hash,
+            Upload.content_size == fingerprint.content_size,
+            _is_idle()
+        )
+        .order_by(Upload.id.desc())
+        .first()
+    )
+
+
+def save_fingerprint(db: Session, upload_id: int, fingerprint: ContentFingerprint) -> None:
+    """Record the content of a completely ingested upload in the current transaction."""
+    db.query(Upload).filter(Upload.id == upload_id).update({
+        Upload.content_hash: fingerprint.content_hash,
+        Upload.content_size: fingerprint.content_size,
+        Upload.head_hash: fingerprint.head_hash,
+    })
@@ -1,41 +1,61 @@
-def fix_log_sequence(log_entries: list[dict]) -> tuple[list[dict], int]:
+from typing import Iterable, Iterator
+
+from app.services.log_rules import get_rule_engine
+
+
+class LogSequenceFixer:
     """
-    Fix log sequence by filling in missing levels and timestamps.
-    
-    Returns:
-        tuple: (fixed_logs, count_of_fixed_entries)
+    Stateful log fixer that can be applied entry by entry.
+
+    Keeps the last seen timestamp and the number of fixed entries,
+    so a log can be fixed in chunks without loading it completely.
     """
-    result = []
-    prev_timestamp = None
-    fixed_count = 0
 
-    for entry in log_entries:
+    def __init__(self):
+        self.prev_timestamp = None
+        self.fixed_count = 0
+        self.rules = get_rule_engine()
+
+    def fix(self, entry: dict) -> dict:
+        """Fill in missing level and timestamp of a single entry."""
         got_level = entry.get("@level")
         got_timestamp = entry.get("@timestamp")
-        msg = entry.get("@message", "").lower()
         entry_fixed = False
 
         if got_level is None:
-            # content heuristic
-            if "error" in msg:
-                entry['@level'] = "error"
-                entry_fixed = True
-            elif "warning" in msg:
-                entry['@level'] = "warning"
+            # content heuristic, see the level rules in log_rules.json
+            level = self.rules.classify(entry.get("@message")).level
+            if level:
+                entry['@level'] = level
                 entry_fixed = True
 
         if got_timestamp is None:
-            if prev_timestamp:
-                entry['@timestamp'] = prev_timestamp
+            if self.prev_timestamp:
+                entry['@timestamp'] = self.prev_timestamp
                 entry_fixed = True
             else:
                 # content heuristic
                 pass
         else:
-            prev_timestamp = got_timestamp
-        
+            self.prev_timestamp = got_timestamp
+
         if entry_fixed:
-            fixed_count += 1
-        result.append(entry)
+            self.fixed_count += 1
+        return entry
+
+    def fix_stream(self, log_entries: Iterable[dict]) -> Iterator[dict]:
+        """Generator stage that fixes entries as they are consumed."""
+        for entry in log_entries:
+            yield self.fix(entry)
+
+
+def fix_log_sequence(log_entries: list[dict]) -> tuple[list[dict], int]:
+    """
+    Fix log sequence by filling in missing levels and timestamps.
 
-    return result, fixed_count
+    Returns:
+        tuple: (fixed_logs, count_of_fixed_entries)
+    """
+    fixer = LogSequenceFixer()
+    result = list(fixer.fix_stream(log_entries))
+    return result, fixer.fixed_count
@@ -0,0 +1,191 @@
+"""
+Level-of-detail data of the Gantt chart.
+
+The chart asks for the requests overlapping its visible time window and
+for at most max_bars items. Requests are read from request_summary, one row
+per request with its bounds in start_us and end_us. On PostgreSQL the
+overlap condition is served by a GiST index on int8range(start_us, end_us),
+an interval index; other databases scan the B-tree index on
+(start_us, end_us) up to the end of the window. Either way zooming and
+panning only read the requests of the window, not the whole session.
+
+When more requests overlap the window than max_bars, the window is cut into
+max_bars // 2 slots of equal length and the requests are counted by the
+slot they start in, in the database. The sparsest slots are returned as
+individual bars as long as the total stays within max_bars; the others
+become buckets with their request count, rpc mix, bounds and duration range.
+"""
+import os
+
+from sqlalchemy import and_, case, func, literal_column
+from sqlalchemy.orm import Session
+
+from app.models import RequestSummary
+from app.services.log_timestamps import format_timestamp_us
+
+GANTT_MAX_BARS = int(os.getenv("GANTT_MAX_BARS", "1000"))
+
+_RANGE_BOUNDS = literal_column("'[]'")
+
+
+def _interval():
+    # Must match ix_request_summary_interval in migrations/versions/0016_request_summary_interval_index.py
+    return func.int8range(RequestSummary.start_us, RequestSummary.end_us, _RANGE_BOUNDS)
+
+
+def _overlaps(db: Session, start_us: int, end_us: int):
+    """Condition of requests overlapping [start_us, end_us]."""
+    if db.get_bind().dialect.name == 'postgresql':
+        return _interval().op('&&')(func.int8range(start_us, end_us, _RANGE_BOUNDS))
+    return and_(RequestSummary.start_us <= end_us, RequestSummary.end_us >= start_us)
+
+
+def _bounds(start_us: int | None, end_us: int | None) -> dict:
+    return {
+        'start_us': start_us,
+        'end_us': end_us,
+        'start_timestamp': format_timestamp_us(start_us),
+        'end_timestamp': format_timestamp_us(end_us),
+    }
+
+
+def _bar(summary: RequestSummary) -> dict:
+    return {
+        'upload_id': summary.upload_id,
+        'tf_req_id': summary.tf_req_id,
+        'tf_rpc': summary.tf_rpc,
+        'tf_resource_type': summary.tf_resource_type,
+        'tf_provider_addr': summary.tf_provider_addr,
+        'start_us': summary.start_us,
+        'end_us': summary.end_us,
+        'start_timestamp': summary.start_timestamp,
+        'end_timestamp': summary.end_timestamp,
+        'log_count': summary.log_count,
+        'tf_req_duration_ms': summary.tf_req_duration_ms,
+    }
+
+
+def _bars(query) -> list[dict]:
+    summaries = query.order_by(RequestSummary.start_us, RequestSummary.tf_req_id, RequestSummary.upload_id)
+    return [_bar(summary) for summary in summaries]
+
+
+def _add_to_bucket(bucket: dict, rpc, count, start_us, end_us, min_duration, max_duration, log_count) -> None:
+    bucket['count'] += count
+    bucket['rpcs'].append({'value': rpc, 'count': count})
+    bucket['start_us'] = min(bucket['start_us'], start_us)
+    bucket['end_us'] = max(bucket['end_us'], end_us)
+    if min_duration is not None:
+        current = bucket['min_duration_ms']
+        bucket['min_duration_ms'] = min_duration if current is None else min(current, min_duration)
+    if max_duration is not None:
+        current = bucket['max_duration_ms']
+        bucket['max_duration_ms'] = max_duration if current is None else max(current, max_duration)
+    bucket['log_count'] += int(log_count or 0)
+
+
+def get_gantt_data(
+        db: Session,
+        upload_id: int | None = None,
+        start_us: int | None = None,
+        end_us: int | None = None,
+        max_bars: int = GANTT_MAX_BARS
+) -> dict:
+    """
+    Requests overlapping a time window, as bars or, where they are too dense, as buckets.
+
+    The window defaults to the extent of all requests, i.e. of the upload if
+    upload_id is given, and is clamped to it; a window outside the extent
+    holds no requests. Requests without timestamps are not placed on the
+    chart. Returns extent and window (bounds in epoch microseconds and as
+    timestamps), total (requests in the window), bars and buckets; bars and
+    buckets together are at most max_bars.
+    """
+    scope = [RequestSummary.start_us.isnot(None), RequestSummary.end_us.isnot(None)]
+    if upload_id is not None:
+        scope.append(RequestSummary.upload_id == upload_id)
+    extent_start, extent_end = db.query(
+        func.min(RequestSummary.start_us), func.max(RequestSummary.end_us)
+    ).filter(*scope).one()
+    window_start = extent_start if start_us is None else start_us
+    window_end = extent_end if end_us is None else end_us
+    empty = extent_start is None or window_start > extent_end or window_end < extent_start
+    if extent_start is not None:
+        # Clamped to the data, so no value handed to the database exceeds the stored bounds
+        window_start = min(max(window_start, extent_start), extent_end)
+        window_end = max(min(window_end, extent_end), extent_start)
+
+    result = {
+        'extent': _bounds(extent_start, extent_end),
+        'window': _bounds(window_start, window_end),
+        'total': 0,
+        'bars': [],
+        'buckets': [],
+    }
+    if empty or window_start > window_end:
+        return result
+
+    condition = [*scope, _overlaps(db, window_start, window_end)]
+    total = db.query(func.count()).select_from(RequestSummary).filter(*condition).scalar()
+    result['total'] = total
+    if total <= max_bars:
+        result['bars'] = _bars(db.query(RequestSummary).filter(*condition))
+        return result
+
+    # Slot of the start of a request; requests that started before the window are in the first one.
+    # Dividing by the slot width keeps the arithmetic within the span of the window
+    slots = max(max_bars // 2, 1)
+    slot_width = -(-(window_end - window_start + 1) // slots)
+    slot = case(
+        (RequestSummary.start_us < window_start, 0),
+        else_=(RequestSummary.start_us - window_start) // slot_width
+    )
+    # Grouped through a subquery: with numbered parameters (asyncpg) PostgreSQL would not
+    # recognize the slot expression of the select list in GROUP BY
+    slotted = db.query(
+        slot.label('slot'),
+        RequestSummary.tf_rpc,
+        RequestSummary.start_us,
+        RequestSummary.end_us,
+        RequestSummary.tf_req_duration_ms,
+        RequestSummary.log_count,
+    ).filter(*condition).subquery()
+    rows = db.query(
+        slotted.c.slot,
+        slotted.c.tf_rpc,
+        func.count(),
+        func.min(slotted.c.start_us),
+        func.max(slotted.c.end_us),
+        func.min(slotted.c.tf_req_duration_ms),
+        func.max(slotted.c.tf_req_duration_ms),
+        func.sum(slotted.c.log_count),
+    ).group_by(slotted.c.slot, slotted.c.tf_rpc)
+
+    buckets: dict[int, dict] = {}
+    for slot_number, rpc, count, *values in rows:
+        bucket = buckets.get(slot_number)
+        if bucket is None:
+            bucket = buckets[slot_number] = {
+                'count': 0, 'rpcs': [], 'start_us': values[0], 'end_us': values[1],
+                'min_duration_ms': None, 'max_duration_ms': None, 'log_count': 0,
+            }
+        _add_to_bucket(bucket, rpc, count, *values)
+
+    # Every bucket takes one item; showing its requests instead takes count - 1 more
+    budget = max_bars - len(buckets)
+    expanded = []
+    for slot_number, bucket in sorted(buckets.items(), key=lambda item: (item[1]['count'], item[0])):
+        if bucket['count'] - 1 > budget:
+            break
+        budget -= bucket['count'] - 1
+        expanded.append(slot_number)
+    if expanded:
+        result['bars'] = _bars(db.query(RequestSummary).filter(*condition, slot.in_(expanded)))
+        for slot_number in expanded:
+            del buckets[slot_number]
+
+    for _, bucket in sorted(buckets.items()):
+        bucket['rpcs'].sort(key=lambda item: (-item['count'], item['value'] or ''))
+        bucket.update(_bounds(bucket['start_us'], bucket['end_us']))
+        result['buckets'].append(bucket)
+    return result
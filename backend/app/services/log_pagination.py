@@ -0,0 +1,78 @@
+import base64
+import json
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Query
+
+from app.models import TerraformLog
+
+
+def sort_columns(group_by_request_id: bool) -> list:
+    """Nullable sort key columns of /logs; id is always appended as a unique tiebreaker."""
+    if group_by_request_id:
+        return [TerraformLog.tf_req_id, TerraformLog.timestamp_us]
+    return [TerraformLog.timestamp_us]
+
+
+def order_by_sort_key(query: Query, group_by_request_id: bool) -> Query:
+    # NULLS LAST is the PostgreSQL b-tree default, so the order matches the indexes
+    columns = [column.asc().nulls_last() for column in sort_columns(group_by_request_id)]
+    return query.order_by(*columns, TerraformLog.id.asc())
+
+
+def encode_cursor(log: TerraformLog, group_by_request_id: bool) -> str:
+    """Build an opaque cursor pointing right after the given log."""
+    key = [getattr(log, column.key) for column in sort_columns(group_by_request_id)] + [log.id]
+    payload = json.dumps({'g': group_by_request_id, 'k': key}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, group_by_request_id: bool) -> list:
+    """Return the sort key stored in a cursor; raises ValueError if it is invalid."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        key = payload['k']
+        grouped = payload['g']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if grouped != group_by_request_id or len(key) != len(sort_columns(group_by_request_id)) + 1:
+        raise ValueError("Cursor does not match the requested ordering")
+    return key
+
+
+def keyset_segments(group_by_request_id: bool, key: list) -> list:
+    """
+    Predicates selecting the rows after key, as disjoint segments in sort order.
+
+    A single row-value comparison can not express "after" for nullable sort
+    columns ordered NULLS LAST, and an OR of the cases prevents index range scans.
+    Instead every segment is an equality prefix plus one range or IS NULL
+    condition, which an index on the sort columns serves directly; segments
+    are queried one after another until the page is full.
+    """
+    columns = sort_columns(group_by_request_id)
+
+    def segments(position: int) -> list:
+        if position == len(columns):
+            return [TerraformLog.id > key[-1]]
+        column, value = columns[position], key[position]
+        inner = segments(position + 1)
+        if value is None:
+            return [and_(column.is_(None), predicate) for predicate in inner]
+        return [and_(column == value, predicate) for predicate in inner] + [column > value, column.is_(None)]
+
+    return segments(0)
+
+
+def fetch_page(query: Query, group_by_request_id: bool, limit: int, cursor: str | None = None) -> list:
+    """Fetch up to limit rows of an ordered query, starting after the cursor."""
+    ordered = order_by_sort_key(query, group_by_request_id)
+    if not cursor:
+        return ordered.limit(limit).all()
+
+    rows = []
+    for predicate in keyset_segments(group_by_request_id, decode_cursor(cursor, group_by_request_id)):
+        rows.extend(ordered.filter(predicate).limit(limit - len(rows)).all())
+        if len(rows) >= limit:
+            break
+    return rows
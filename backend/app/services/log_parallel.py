@@ -0,0 +1,182 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from app.services.log_fixing import LogSequenceFixer
+from app.services.log_stream import (
+    MAX_ENTRY_SIZE,
+    UPLOAD_CHUNK_SIZE,
+    decode_log_line,
+    iter_file_chunks,
+    json_document_state,
+)
+
+logger = logging.getLogger(__name__)
+
+# Number of processes decoding JSONL byte ranges
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 2)))
+# Approximate size of a byte range handed to one worker
+PARSE_RANGE_SIZE = int(os.getenv("PARSE_RANGE_SIZE", str(8 * 1024 * 1024)))
+# Smaller files are parsed in a single stream, the pool overhead is not worth it
+PARALLEL_PARSE_MIN_BYTES = int(os.getenv("PARALLEL_PARSE_MIN_BYTES", str(32 * 1024 * 1024)))
+
+_parse_executor: Executor | None = None
+
+
+@dataclass
+class ChunkResult:
+    """Entries decoded and fixed from one byte range."""
+    entries: list[dict]
+    fixed_count: int
+    size: int
+    last_timestamp: str | None = None
+    # (index, already_fixed) of leading entries that need the previous range's timestamp
+    unresolved: list[tuple[int, bool]] = field(default_factory=list)
+
+
+def get_parse_executor() -> Executor:
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _parse_executor
+
+
+def shutdown_parse_executor() -> None:
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=True)
+        _parse_executor = None
+
+
+def is_jsonl_file(path: str) -> bool:
+    """JSONL files can be split on newlines; JSON arrays and pretty-printed documents can not."""
+    head = b''
+    with open(path, 'rb') as f:
+        for chunk in iter_file_chunks(f, UPLOAD_CHUNK_SIZE):
+            head = (head + chunk).lstrip()
+            if not head:
+                continue
+            if head.startswith(b'['):
+                return False
+            state = json_document_state(head)
+            if state is not None:
+                return not state
+            if len(head) > MAX_ENTRY_SIZE:
+                break
+    return True
+
+
+def should_parse_in_parallel(path: str) -> bool:
+    return (
+        PARSE_WORKERS > 1
+        and os.path.getsize(path) >= PARALLEL_PARSE_MIN_BYTES
+        and is_jsonl_file(path)
+    )
+
+
+def _read_line(f) -> bytes | None:
+    """Read one line without buffering more than MAX_ENTRY_SIZE; None for a longer line, which is consumed."""
+    line = f.readline(MAX_ENTRY_SIZE + 1)
+    if len(line) <= MAX_ENTRY_SIZE or line.endswith(b'\n'):
+        return line
+    while line and not line.endswith(b'\n'):
+        line = f.readline(MAX_ENTRY_SIZE + 1)
+    return None
+
+
+def split_byte_ranges(path: str, range_size: int = PARSE_RANGE_SIZE) -> list[tuple[int, int]]:
+    """Split a file into byte ranges that start and end on line boundaries."""
+    file_size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, 'rb') as f:
+        while start < file_size:
+            end = start + range_size
+            if end >= file_size:
+                end = file_size
+            else:
+                f.seek(end)
+                _read_line(f)
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_byte_range(path: str, start: int, end: int) -> ChunkResult:
+    """
+    Worker function: decode and fix the JSONL entries of one byte range.
+
+    Entries before the first timestamp of the range can not be fixed here,
+    they are reported as unresolved and patched when ranges are merged.
+    """
+    fixer = LogSequenceFixer()
+    result = ChunkResult(entries=[], fixed_count=0, size=end - start)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while f.tell() < end:
+            line = _read_line(f)
+            if line is None:
+                logger.warning("Skipping a log line longer than %d bytes", MAX_ENTRY_SIZE)
+                continue
+            entry = decode_log_line(line)
+            if entry is None:
+                continue
+            fixed_before = fixer.fixed_count
+            fixer.fix(entry)
+            if entry.get('@timestamp') is None:
+                result.unresolved.append((len(result.entries), fixer.fixed_count > fixed_before))
+            result.entries.append(entry)
+
+    result.fixed_count = fixer.fixed_count
+    result.last_timestamp = fixer.prev_timestamp
+    return result
+
+
+def iter_chunk_results_parallel(path: str, executor: Executor | None = None) -> Iterator[ChunkResult]:
+    """
+    Parse a JSONL file in a process pool and yield range results in file order.
+
+    Only a bounded number of ranges is in flight at once, so memory does not
+    grow with the file size. The carried-over timestamp is reconciled across
+    range boundaries before a range is yielded, which makes the result
+    identical to fixing the whole log sequentially.
+    """
+    executor = executor or get_parse_executor()
+    ranges = deque(split_byte_ranges(path))
+    in_flight = deque()
+    max_in_flight = PARSE_WORKERS * 2
+    carried_timestamp = None
+
+    while ranges or in_flight:
+        while ranges and len(in_flight) < max_in_flight:
+            start, end = ranges.popleft()
+            in_flight.append(executor.submit(parse_byte_range, path, start, end))
+
+        result = in_flight.popleft().result()
+        if carried_timestamp:
+            for index, already_fixed in result.unresolved:
+                result.entries[index]['@timestamp'] = carried_timestamp
+                if not already_fixed:
+                    result.fixed_count += 1
+        result.unresolved = []
+        carried_timestamp = result.last_timestamp or carried_timestamp
+        yield result
+
+
+def parse_terraform_log_parallel(path: str) -> tuple[list[dict], int]:
+    """
+    Parallel variant of parse_terraform_log for JSONL files on disk.
+
+    Returns:
+        tuple: (parsed_logs, count_of_fixed_entries)
+    """
+    logs = []
+    fixed_count = 0
+    for result in iter_chunk_results_parallel(path):
+        logs.extend(result.entries)
+        fixed_count += result.fixed_count
+    return logs, fixed_count
@@ -0,0 +1,133 @@
+"""
+Slim storage layout of log entries.
+
+The indexed fields of an entry live in the columns of its row, and raw_data
+only keeps what is not stored there already. Large values are moved out of
+line into log_payloads, compressed, so list views and scans never read them:
+
+* a key whose value is stored unchanged in its column (@message in message,
+  @level in log_level, ...) is left out of raw_data; rebuild_record puts it
+  back in front of the other keys;
+* the message column always holds the complete @message, however long, so
+  search, the message_contains filter, error fingerprints and rules see the
+  whole text;
+* every residual value longer than PAYLOAD_INLINE_LIMIT, e.g.
+  tf_http_res_body, is moved to log_payloads, and payload_size tells the
+  reader that get_log_payload has the complete entry.
+
+Rows stored before this layout keep the complete entry in raw_data and are
+rebuilt unchanged.
+"""
+import os
+import zlib
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.json_codec import RawJSON, dumps_json, loads
+from app.models import LogPayload, TerraformLog
+from app.services.log_dictionary import load_row_values
+
+# Values longer than this (characters of a string, encoded bytes otherwise) are stored out of line
+PAYLOAD_INLINE_LIMIT = int(os.getenv("PAYLOAD_INLINE_LIMIT", "2048"))
+PAYLOAD_COMPRESS_LEVEL = int(os.getenv("PAYLOAD_COMPRESS_LEVEL", "6"))
+
+# (entry key, column, other key the column is read from when the entry key is missing)
+COLUMN_KEYS = (
+    ('@level', 'log_level', 'level'),
+    ('@timestamp', 'timestamp', 'timestamp'),
+    ('@message', 'message', 'message'),
+    ('@caller', 'caller', None),
+    ('@module', 'module', None),
+    ('tf_provider_addr', 'tf_provider_addr', None),
+    ('tf_req_id', 'tf_req_id', None),
+    ('tf_resource_type', 'tf_resource_type', None),
+    ('tf_rpc', 'tf_rpc', None),
+)
+RECORD_COLUMNS = tuple(column for _, column, _ in COLUMN_KEYS)
+
+
+def split_entry(entry: dict, row: dict) -> None:
+    """
+    Set raw_data, payload_size and payload of a row built from entry.
+
+    payload is not a column: bulk_insert_rows writes it to log_payloads once
+    the row has an id.
+    """
+    residual = dict(entry)
+    for key, column, alternative in COLUMN_KEYS:
+        value = residual.get(key)
+        # With both keys present the column can not tell which one it came from, so both are kept
+        if isinstance(value, str) and value == row[column] and not (alternative and alternative in residual):
+            del residual[key]
+
+    encoded = dumps_json(residual) if residual else None
+    payload = None
+    if encoded is not None and len(encoded) > PAYLOAD_INLINE_LIMIT:
+        payload = {key: value for key, value in residual.items() if _value_size(value) > PAYLOAD_INLINE_LIMIT}
+        for key in payload:
+            del residual[key]
+        encoded = dumps_json(residual) if residual else None
+
+    row['raw_data'] = RawJSON(encoded) if encoded is not None else None
+    if payload:
+        data = dumps_json(payload).encode('utf-8')
+        row['payload_size'] = len(data)
+        row['payload'] = zlib.compress(data, PAYLOAD_COMPRESS_LEVEL)
+    else:
+        row['payload_size'] = None
+        row['payload'] = None
+
+
+def _value_size(value) -> int:
+    if isinstance(value, str):
+        return len(value)
+    return len(dumps_json(value))
+
+
+def rebuild_record(residual: dict | None, values) -> dict:
+    """The entry of a row from its raw_data and its column values (a mapping by column name)."""
+    residual = residual or {}
+    record = {}
+    for key, column, alternative in COLUMN_KEYS:
+        value = values[column]
+        if value is not None and key not in residual and not (alternative and alternative in residual):
+            record[key] = value
+    record.update(residual)
+    return record
+
+
+def decode_payload(data: bytes) -> dict:
+    return loads(zlib.decompress(data))
+
+
+def merge_payload(record: dict, data: bytes | None) -> dict:
+    """Add the values stored out of line to a rebuilt record."""
+    if data is not None:
+        record.update(decode_payload(data))
+    return record
+
+
+def save_payloads(db: Session, rows: list[dict]) -> None:
+    """Write the payloads of inserted rows, which carry their ids, in the current transaction."""
+    payloads = [
+        {'log_id': row['id'], 'upload_id': row['upload_id'], 'data': row['payload']}
+        for row in rows
+        if row.get('payload') is not None
+    ]
+    if payloads:
+        db.execute(insert(LogPayload), payloads)
+
+
+def get_log_payload(db: Session, log_id: int) -> dict | None:
+    """The complete entry of a log, including the values stored out of line; None if it does not exist."""
+    log = db.query(TerraformLog).filter(TerraformLog.id == log_id).first()
+    if log is None:
+        return None
+    load_row_values(db, [log])
+    data = None
+    if log.payload_size is not None:
+        data = db.query(LogPayload.data).filter(
+            LogPayload.log_id == log_id, LogPayload.upload_id == log.upload_id
+        ).scalar()
+    return merge_payload(log.raw_data, data)
@@ -0,0 +1,92 @@
+from sqlalchemy import Text, cast
+
+from app.json_codec import dumps_bytes, loads
+from app.models import TerraformLog
+from app.services.log_dictionary import ID_COLUMNS, decode_values
+from app.services.log_pagination import sort_columns
+from app.services.log_payloads import RECORD_COLUMNS, rebuild_record
+
+# Fields of LogEntry, in response order
+LOG_FIELDS = (
+    'id',
+    'upload_id',
+    'filename',
+    'uploaded_at',
+    'log_level',
+    'timestamp',
+    'timestamp_us',
+    'message',
+    'caller',
+    'module',
+    'tf_provider_addr',
+    'tf_req_id',
+    'tf_resource_type',
+    'tf_rpc',
+    'payload_size',
+    'raw_data',
+)
+
+
+def parse_fields(fields: str | None) -> list[str]:
+    """
+    Parse a comma separated fields= projection; all fields if it is empty.
+
+    id is always included. Raises ValueError for unknown fields.
+    """
+    if not fields:
+        return list(LOG_FIELDS)
+    requested = {field.strip() for field in fields.split(',') if field.strip()}
+    unknown = requested - set(LOG_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add('id')
+    return [field for field in LOG_FIELDS if field in requested]
+
+
+def _column(field: str):
+    if field == 'raw_data':
+        # Only the residual keys are stored, decoded by the fast codec instead of the driver
+        return cast(TerraformLog.residual_data, Text).label('raw_data')
+    if field in ID_COLUMNS:
+        # Decoded by project_records
+        return getattr(TerraformLog, ID_COLUMNS[field]).label(field)
+    return getattr(TerraformLog, field)
+
+
+def projected_columns(fields: list[str], group_by_request_id: bool | None = None) -> list:
+    """
+    Columns to select for a projection.
+
+    The sort key columns of the /logs ordering are added when they are not
+    requested, so the cursor of the next page can still be built from the rows,
+    and so are the columns raw_data is rebuilt from.
+    """
+    columns = [_column(field) for field in fields]
+    keys = set(fields)
+    if group_by_request_id is not None:
+        for column in sort_columns(group_by_request_id):
+            if column.key not in keys:
+                columns.append(column)
+                keys.add(column.key)
+    if 'raw_data' in fields:
+        columns += [_column(column) for column in RECORD_COLUMNS if column not in keys]
+    return columns
+
+
+def project_records(rows, fields: list[str]) -> list[dict]:
+    """Projected row tuples as dicts with the given fields, dictionary ids replaced by their values."""
+    has_raw_data = 'raw_data' in fields
+    records = []
+    for row in rows:
+        values = decode_values(row._mapping)
+        record = {field: values[field] for field in fields}
+        if has_raw_data:
+            residual = record['raw_data']
+            record['raw_data'] = rebuild_record(loads(residual) if residual else None, values)
+        records.append(record)
+    return records
+
+
+def encode_log_rows(rows, fields: list[str]) -> bytes:
+    """Encode projected row tuples as a JSON array of objects with the given fields."""
+    return dumps_bytes(project_records(rows, fields))
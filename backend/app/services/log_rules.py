@@ -0,0 +1,211 @@
+"""
+Rule based classification of log entries.
+
+Rules are read from a JSON file (LOG_RULES_PATH, log_rules.json next to this
+module by default). Each rule matches the message or the type of an entry and
+may produce a section start or end marker, an inferred level and extra tags:
+
+    {"name": "plan_start", "contains": "starting Plan operation", "section_start": "plan"}
+    {"name": "plan_summary", "field": "type", "equals": "change_summary", "section_end": "plan"}
+    {"name": "error_level", "contains": "error", "ignore_case": true, "level": "error"}
+    {"name": "panic", "regex": "^panic: ", "tags": {"error_kind": "panic"}}
+
+The rules are compiled into one function that classifies an entry in a
+single call, producing markers, level and tags together. When several
+matching rules produce the same output, the one listed first wins; tags
+are merged.
+"""
+import json
+import os
+import re
+from dataclasses import dataclass, field as dataclass_field
+from typing import NamedTuple
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "log_rules.json")
+LOG_RULES_PATH = os.getenv("LOG_RULES_PATH", DEFAULT_RULES_PATH)
+
+RULE_FIELDS = ('message', 'type')
+RULE_MATCHERS = ('contains', 'equals', 'regex')
+
+_engine: 'RuleEngine | None' = None
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    pattern: str
+    match: str = 'contains'
+    field: str = 'message'
+    ignore_case: bool = False
+    section_start: str | None = None
+    section_end: str | None = None
+    level: str | None = None
+    tags: dict = dataclass_field(default_factory=dict)
+
+
+class Classification(NamedTuple):
+    section_start: object = None
+    section_end: object = None
+    level: str | None = None
+    # Shared between results, must not be modified
+    tags: dict = {}
+
+
+NO_MATCH = Classification()
+
+
+def parse_rule(data: dict) -> Rule:
+    """Build a Rule from its JSON object; raises ValueError for invalid rules."""
+    name = data.get('name') or '<unnamed>'
+    matchers = [key for key in RULE_MATCHERS if key in data]
+    if len(matchers) != 1:
+        raise ValueError(f"Rule {name}: exactly one of {', '.join(RULE_MATCHERS)} is required")
+    match = matchers[0]
+    pattern = data[match]
+    if not isinstance(pattern, str) or not pattern:
+        raise ValueError(f"Rule {name}: {match} must be a non-empty string")
+
+    rule_field = data.get('field', 'message')
+    if rule_field not in RULE_FIELDS:
+        raise ValueError(f"Rule {name}: unknown field {rule_field}")
+    if rule_field != 'message' and match != 'equals':
+        raise ValueError(f"Rule {name}: only equals is supported on {rule_field}")
+    if match == 'regex':
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Rule {name}: invalid regex: {e}")
+
+    tags = data.get('tags') or {}
+    if not isinstance(tags, dict):
+        raise ValueError(f"Rule {name}: tags must be an object")
+    rule = Rule(
+        name=name,
+        pattern=pattern,
+        match=match,
+        field=rule_field,
+        ignore_case=bool(data.get('ignore_case', False)),
+        section_start=data.get('section_start'),
+        section_end=data.get('section_end'),
+        level=data.get('level'),
+        tags={str(key): str(value) for key, value in tags.items()},
+    )
+    if not (rule.section_start or rule.section_end or rule.level or rule.tags):
+        raise ValueError(f"Rule {name}: no section_start, section_end, level or tags")
+    return rule
+
+
+def load_rules(path: str = LOG_RULES_PATH) -> list[Rule]:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [parse_rule(rule) for rule in data.get('rules', [])]
+
+
+class RuleEngine:
+    """
+    Rules compiled into a single classification function.
+
+    classify(message, log_type=None) returns the Classification of an
+    entry. It is generated from the rules and runs the checks of all rules as straight-line code and
+    records the matching rules in a bitmask; the result of every bitmask is
+    built once and reused. section_type converts the section names of the
+    rules, e.g. to SectionType, so an unknown name is reported when the
+    engine is built instead of per entry.
+    """
+
+    def __init__(self, rules: list[Rule], section_type=str):
+        self.rules = rules
+        self._outputs = []
+        for rule in rules:
+            try:
+                self._outputs.append((
+                    section_type(rule.section_start) if rule.section_start else None,
+                    section_type(rule.section_end) if rule.section_end else None,
+                    rule.level,
+                    rule.tags,
+                ))
+            except ValueError:
+                raise ValueError(f"Rule {rule.name}: unknown section")
+        self._results: dict[int, Classification] = {0: NO_MATCH}
+        self.source = self._generate()
+        namespace = {'_results': self._results, '_combine': self._combine}
+        namespace.update(self._regexes)
+        exec(compile(self.source, f"<log rules {LOG_RULES_PATH}>", 'exec'), namespace)
+        self.classify = namespace['classify']
+
+    def _generate(self) -> str:
+        # Rules with the same check share one test; the bits of all of them are set together
+        checks: dict[tuple, int] = {}
+        self._regexes = {}
+        for index, rule in enumerate(self.rules):
+            # The pattern is substituted by format() last, so braces in it are not placeholders
+            if rule.match == 'regex':
+                name = f"_regex_{index}"
+                flags = re.IGNORECASE if rule.ignore_case else 0
+                self._regexes[name] = re.compile(rule.pattern, flags).search
+                check = (rule.field, f"{name}({{value}})", None)
+            else:
+                pattern = rule.pattern.lower() if rule.ignore_case else rule.pattern
+                value = "{folded}" if rule.ignore_case else "{value}"
+                if rule.match == 'contains':
+                    check = (rule.field, f"{{pattern}} in {value}", repr(pattern))
+                else:
+                    check = (rule.field, f"{value} == {{pattern}}", repr(pattern))
+            checks[check] = checks.get(check, 0) | 1 << index
+
+        lines = [
+            "def classify(message, log_type=None):",
+            "    message = message or ''",
+            "    matched = 0",
+        ]
+        for rule_field, variable in (('message', 'message'), ('type', 'log_type')):
+            field_checks = [
+                (test, pattern, mask) for (name, test, pattern), mask in checks.items() if name == rule_field
+            ]
+            if not field_checks:
+                continue
+            indent = "    "
+            if rule_field != 'message':
+                lines.append(f"    if {variable}:")
+                indent = "        "
+            if any('{folded}' in test for test, pattern, mask in field_checks):
+                lines.append(f"{indent}folded_{variable} = {variable}.lower()")
+            for test, pattern, mask in field_checks:
+                test = test.format(value=variable, folded=f"folded_{variable}", pattern=pattern)
+                lines.append(f"{indent}if {test}:")
+                lines.append(f"{indent}    matched |= {mask:#x}")
+        lines += [
+            "    result = _results.get(matched)",
+            "    if result is None:",
+            "        result = _combine(matched)",
+            "    return result",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _combine(self, matched: int) -> Classification:
+        section_start = section_end = level = None
+        tags = {}
+        for index, (start, end, rule_level, rule_tags) in enumerate(self._outputs):
+            if not matched >> index & 1:
+                continue
+            section_start = section_start or start
+            section_end = section_end or end
+            level = level or rule_level
+            for key, value in rule_tags.items():
+                tags.setdefault(key, value)
+        result = self._results[matched] = Classification(section_start, section_end, level, tags)
+        return result
+
+
+def get_rule_engine() -> RuleEngine:
+    """Return the engine of LOG_RULES_PATH, compiling it on first use."""
+    global _engine
+    if _engine is None:
+        from app.services.log_sections import SectionType
+        _engine = RuleEngine(load_rules(), section_type=SectionType)
+    return _engine
+
+
+def classify_entry(entry: dict) -> Classification:
+    message = entry.get('@message', '') or entry.get('message', '')
+    return get_rule_engine().classify(message, entry.get('type'))
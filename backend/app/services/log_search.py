@@ -0,0 +1,347 @@
+import math
+import os
+import re
+import threading
+from array import array
+from datetime import datetime
+
+from sqlalchemy import func, literal, text
+from sqlalchemy.exc import DataError
+from sqlalchemy.orm import Session
+
+from app.models import TerraformLog, Upload
+from app.services.log_dictionary import load_row_values
+from app.services.result_cache import result_cache
+
+SEARCH_MODES = ('substring', 'phrase', 'prefix', 'regex')
+
+# Phrase and prefix search on PostgreSQL cover this many leading characters of a
+# message: to_tsvector fails on very large input, and the expression must match
+# the index in migrations/versions/0005_message_search_indexes.py
+TSVECTOR_MAX_CHARS = 65536
+
+# Messages are indexed up to this length by the in-process index;
+# longer ones are always treated as candidates and checked directly
+FALLBACK_MAX_INDEXED_CHARS = 4096
+# Number of candidate rows loaded at once when verifying in-process matches
+FALLBACK_VERIFY_BATCH = 1000
+# Upper bound of the ids held in the postings of the in-process index (8 bytes each);
+# messages stored after it is reached are scanned by every search instead
+FALLBACK_MAX_POSTINGS = int(os.getenv("FALLBACK_MAX_POSTINGS", str(16 * 1024 * 1024)))
+# The message_contains filter narrows rows to the index candidates only up to this
+# many ids, a larger IN list costs more than checking every message
+FALLBACK_MAX_FILTER_IDS = 10000
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def search_logs(
+        db: Session,
+        query: str,
+        mode: str = 'substring',
+        limit: int = 100,
+        upload_id: int | None = None
+) -> list[tuple]:
+    """
+    Search log messages and return (log, rank) pairs, best matches first.
+
+    Modes:
+        substring: case-insensitive substring match
+        phrase: the words of the query in this order
+        prefix: every word of the query starts a word of the message
+        regex: Python/PostgreSQL regular expression, case-insensitive
+
+    PostgreSQL uses trigram and full-text GIN indexes, other databases use
+    an in-process inverted index. Raises ValueError for an invalid query.
+    With upload_id only the logs of that upload are searched.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}")
+    if not query.strip():
+        raise ValueError("Empty search query")
+    if mode == 'regex':
+        try:
+            re.compile(query)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression: {e}")
+    elif mode in ('phrase', 'prefix') and not _WORD_RE.search(query):
+        raise ValueError("Search query has no words")
+
+    if db.get_bind().dialect.name == 'postgresql':
+        hits = _search_postgresql(db, query, mode, limit, upload_id)
+    else:
+        hits = _fallback_index.search(db, query, mode, limit, upload_id)
+    load_row_values(db, [log for log, _ in hits])
+    return hits
+
+
+def message_contains_condition(db: Session, value: str):
+    """
+    Filter condition for logs whose message contains value, case-insensitive.
+
+    Matches like the substring search mode and uses the same indexes: the
+    trigram index serves the ILIKE on PostgreSQL, the in-process index
+    narrows the rows to check elsewhere.
+    """
+    condition = TerraformLog.message.ilike(f"%{_escape_like(value)}%", escape='\\')
+    if db.get_bind().dialect.name == 'postgresql':
+        return condition
+    candidate_ids, max_id = _fallback_index.lookup(db, [value])
+    if candidate_ids is None or len(candidate_ids) > FALLBACK_MAX_FILTER_IDS:
+        return condition
+    # Rows stored after the refresh are not in the index yet
+    return condition & (TerraformLog.id.in_(candidate_ids) | (TerraformLog.id > max_id))
+
+
+def _message_tsvector():
+    return func.to_tsvector(literal('simple'), func.left(TerraformLog.message, TSVECTOR_MAX_CHARS))
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _occurrence_rank(query: str):
+    """Same rank as the in-process search: occurrences / log2(length + 2)."""
+    message = func.lower(TerraformLog.message)
+    occurrences = (
+        (func.length(message) - func.length(func.replace(message, query.lower(), ''))) / len(query)
+    )
+    return occurrences / func.log(2.0, func.length(TerraformLog.message) + 2.0)
+
+
+def _search_postgresql(db: Session, query: str, mode: str, limit: int, upload_id: int | None) -> list[tuple]:
+    if mode == 'substring':
+        condition = TerraformLog.message.ilike(f"%{_escape_like(query)}%", escape='\\')
+        rank = _occurrence_rank(query)
+    elif mode == 'regex':
+        condition = TerraformLog.message.op('~*')(query)
+        rank = literal(1.0)
+    else:
+        if mode == 'phrase':
+            ts_query = func.phraseto_tsquery(literal('simple'), query)
+        else:
+            ts_query = func.to_tsquery(
+                literal('simple'),
+                ' & '.join(f"{word}:*" for word in _WORD_RE.findall(query.lower()))
+            )
+        condition = _message_tsvector().op('@@')(ts_query)
+        rank = func.ts_rank_cd(_message_tsvector(), ts_query)
+    if upload_id is not None:
+        condition = condition & (TerraformLog.upload_id == upload_id)
+
+    try:
+        rows = (
+            db.query(TerraformLog, rank.label('rank'))
+            .filter(condition)
+            .order_by(text('rank DESC'), TerraformLog.id)
+            .limit(limit)
+            .all()
+        )
+    except DataError as e:
+        # Python and PostgreSQL regular expression syntax differ in details
+        db.rollback()
+        raise ValueError(f"Invalid regular expression: {e.orig}")
+    return [(log, float(rank_value)) for log, rank_value in rows]
+
+
+def _trigrams(value: str) -> set[str]:
+    value = value.lower()
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+def required_literals(pattern: str) -> list[str]:
+    """
+    Literal substrings that every match of a regular expression must contain.
+
+    Used as a trigram prefilter. Conservative: patterns with alternation
+    yield no literals, and any construct that is not a plain character
+    ends the current literal.
+    """
+    literals = []
+    current = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped.isalnum():
+                literals.append(''.join(current))
+                current = []
+            else:
+                current.append(escaped)
+            continue
+        if char == '|':
+            return []
+        if char in '*?':
+            if current:
+                current.pop()
+            literals.append(''.join(current))
+            current = []
+        elif char in '{[':
+            # A repetition may allow zero occurrences of the previous character
+            if char == '{' and current:
+                current.pop()
+            literals.append(''.join(current))
+            current = []
+            end = pattern.find('}' if char == '{' else ']', i + 2)
+            i = end if end != -1 else len(pattern)
+        elif char in '.^$()+':
+            literals.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    literals.append(''.join(current))
+    return [literal_value for literal_value in literals if literal_value]
+
+
+def _matcher(query: str, mode: str):
+    """Return a function that scores a message, 0 meaning no match."""
+    if mode == 'substring':
+        needle = query.lower()
+        return lambda message: message.lower().count(needle)
+    if mode == 'regex':
+        pattern = re.compile(query, re.IGNORECASE)
+        return lambda message: len(pattern.findall(message))
+    words = _WORD_RE.findall(query.lower())
+    if mode == 'phrase':
+        phrase = re.compile(r'\b' + r'\W+'.join(re.escape(word) for word in words) + r'\b')
+        return lambda message: len(phrase.findall(message.lower()))
+
+    prefixes = [re.compile(r'\b' + re.escape(word)) for word in words]
+
+    def match_prefixes(message: str) -> int:
+        lowered = message.lower()
+        counts = [len(prefix.findall(lowered)) for prefix in prefixes]
+        return sum(counts) if all(counts) else 0
+    return match_prefixes
+
+
+class InvertedIndex:
+    """
+    In-process trigram index over log messages for databases without text search indexes.
+
+    Meant for development databases such as SQLite: every worker process
+    keeps its own copy, bounded by FALLBACK_MAX_POSTINGS. Postings are id
+    arrays in insertion order. Before a search the index catches up with new
+    rows only when the data generation of the result cache has changed since
+    the last one, and is rebuilt when an indexed upload was deleted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.postings: dict[str, array] = {}
+        self.posting_count = 0
+        self.unindexed: array = array('q')
+        self.upload_ids: set[int] = set()
+        self.upload_times: dict[int, datetime | None] = {}
+        self.max_id = 0
+        self.full = False
+        self.generation = None
+
+    def refresh(self, db: Session) -> None:
+        generation = result_cache.generation()
+        if generation == self.generation:
+            return
+        # SQLite reuses the ids of a deleted last upload and its rows, so uploads are told apart by time too
+        stored = dict(db.query(Upload.id, Upload.uploaded_at))
+        if any(stored.get(upload_id) != self.upload_times.get(upload_id) for upload_id in self.upload_ids):
+            self._reset()
+        self.generation = generation
+        if self.full:
+            return
+
+        rows = (
+            db.query(TerraformLog.id, TerraformLog.upload_id, TerraformLog.message)
+            .filter(TerraformLog.id > self.max_id)
+            .order_by(TerraformLog.id)
+            .yield_per(FALLBACK_VERIFY_BATCH)
+        )
+        for log_id, upload_id, message in rows:
+            if not self.add(log_id, upload_id, message or ''):
+                break
+        for upload_id in self.upload_ids:
+            self.upload_times.setdefault(upload_id, stored.get(upload_id))
+
+    def add(self, log_id: int, upload_id: int, message: str) -> bool:
+        """Index a message; False once the index is full and the message was not indexed."""
+        if len(message) > FALLBACK_MAX_INDEXED_CHARS:
+            self.unindexed.append(log_id)
+        else:
+            trigrams = _trigrams(message)
+            if self.posting_count + len(trigrams) > FALLBACK_MAX_POSTINGS:
+                self.full = True
+                return False
+            for trigram in trigrams:
+                self.postings.setdefault(trigram, array('q')).append(log_id)
+            self.posting_count += len(trigrams)
+        self.upload_ids.add(upload_id)
+        self.max_id = max(self.max_id, log_id)
+        return True
+
+    def candidates(self, literals: list[str]) -> list[int] | None:
+        """Indexed ids of messages that may contain all the literals, in id order; None for all of them."""
+        trigrams = set()
+        for literal_value in literals:
+            trigrams |= _trigrams(literal_value)
+        if not trigrams:
+            return None
+
+        postings = sorted((self.postings.get(trigram, array('q')) for trigram in trigrams), key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result.intersection_update(posting)
+        result.update(self.unindexed)
+        return sorted(result)
+
+    def lookup(self, db: Session, literals: list[str]) -> tuple[list[int] | None, int]:
+        """Refresh the index and return the candidates for the literals with the last indexed id."""
+        with self._lock:
+            self.refresh(db)
+            return self.candidates(literals), self.max_id
+
+    def search(self, db: Session, query: str, mode: str, limit: int, upload_id: int | None = None) -> list[tuple]:
+        if mode == 'regex':
+            literals = required_literals(query)
+        elif mode == 'substring':
+            literals = [query]
+        else:
+            literals = _WORD_RE.findall(query)
+        candidate_ids, max_id = self.lookup(db, literals)
+
+        rows = db.query(TerraformLog.id, TerraformLog.message)
+        if upload_id is not None:
+            rows = rows.filter(TerraformLog.upload_id == upload_id)
+        if candidate_ids is None:
+            batches = [rows.filter(TerraformLog.id <= max_id).yield_per(FALLBACK_VERIFY_BATCH)]
+        else:
+            batches = [
+                rows.filter(TerraformLog.id.in_(candidate_ids[start:start + FALLBACK_VERIFY_BATCH]))
+                for start in range(0, len(candidate_ids), FALLBACK_VERIFY_BATCH)
+            ]
+        # Rows the index does not hold: stored after it was full or after the refresh
+        batches.append(rows.filter(TerraformLog.id > max_id).yield_per(FALLBACK_VERIFY_BATCH))
+
+        score = _matcher(query, mode)
+        ranks = []
+        for batch in batches:
+            for log_id, message in batch:
+                matches = score(message or '')
+                if matches:
+                    # More occurrences rank higher, long payload dumps rank lower
+                    ranks.append((matches / math.log2(len(message) + 2), log_id))
+
+        ranks.sort(key=lambda item: (-item[0], item[1]))
+        ranks = ranks[:limit]
+        logs = {log.id: log for log in db.query(TerraformLog).filter(TerraformLog.id.in_([i for _, i in ranks]))}
+        return [(logs[log_id], rank) for rank, log_id in ranks]
+
+
+_fallback_index = InvertedIndex()
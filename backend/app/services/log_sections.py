@@ -0,0 +1,112 @@
+from enum import Enum
+
+from app.services.log_rules import classify_entry, get_rule_engine
+
+
+class SectionType(Enum):
+    """Типы секций Terraform."""
+    PLAN = "plan"
+    APPLY = "apply"
+    INIT = "init"
+
+
+class LogSection:
+    """Представление секции лога."""
+
+    def __init__(self, section_type: SectionType, start_index: int, start_id: int | None = None):
+        self.section_type = section_type
+        self.start_index = start_index
+        self.end_index: int | None = None
+        self.start_id = start_id
+        self.end_id: int | None = None
+        self.log_count = 0
+        self.start_timestamp: str | None = None
+        self.end_timestamp: str | None = None
+
+    def append(self, log_entry: dict) -> None:
+        timestamp = log_entry.get('@timestamp') or log_entry.get('timestamp')
+        if not self.log_count:
+            self.start_timestamp = timestamp
+        self.end_timestamp = timestamp
+        self.log_count += 1
+
+    def to_dict(self) -> dict:
+        return {
+            'type': self.section_type.value,
+            'start_index': self.start_index,
+            'end_index': self.end_index,
+            'log_count': self.log_count,
+            'start_timestamp': self.start_timestamp,
+            'end_timestamp': self.end_timestamp,
+        }
+
+
+def detect_section_markers(log_entry: dict) -> tuple[SectionType | None, SectionType | None]:
+    classification = classify_entry(log_entry)
+    return classification.section_start, classification.section_end
+
+
+def detect_section_start(message: str) -> SectionType | None:
+    return get_rule_engine().classify(message).section_start
+
+
+def detect_section_end(log_type: str, message: str) -> SectionType | None:
+    return get_rule_engine().classify(message, log_type).section_end
+
+
+class SectionDetector:
+    """
+    Streaming section detection over the entries of one log, in order.
+
+    Only the open section is kept in memory; closed sections are collected
+    in `closed` until the caller takes them with pop_closed().
+    """
+
+    def __init__(self):
+        self.closed: list[LogSection] = []
+        self.current: LogSection | None = None
+        self.index = 0
+        self.previous_id: int | None = None
+
+    def feed(self, log_entry: dict, row_id: int | None = None, markers=None) -> None:
+        """Process the next entry; markers may be passed if they were detected earlier."""
+        idx = self.index
+        start_section, end_section = markers or detect_section_markers(log_entry)
+
+        # Начало новой секции
+        if start_section:
+            # Закрываем предыдущую секцию, если была открыта
+            if self.current:
+                self._close(idx - 1, self.previous_id)
+
+            self.current = LogSection(start_section, idx, row_id)
+            self.current.append(log_entry)
+
+        # Конец текущей секции
+        elif end_section and self.current:
+            if self.current.section_type == end_section:
+                self.current.append(log_entry)
+                self._close(idx, row_id)
+
+        # Продолжение текущей секции
+        elif self.current:
+            self.current.append(log_entry)
+
+        self.index += 1
+        self.previous_id = row_id
+
+    def finish(self) -> list[LogSection]:
+        """Close the last section if it is still open and return all remaining sections."""
+        if self.current:
+            self._close(self.index - 1, self.previous_id)
+        return self.pop_closed()
+
+    def pop_closed(self) -> list[LogSection]:
+        sections, self.closed = self.closed, []
+        return sections
+
+    def _close(self, end_index: int, end_id: int | None) -> None:
+        self.current.end_index = end_index
+        self.current.end_id = end_id
+        self.closed.append(self.current)
+        self.current = None
@@ -1,54 +1,34 @@
-import json
-from enum import Enum
-
-from sqlalchemy.orm import Session
-
-from app.models import TerraformLog
-from app.services.log_fixing import fix_log_sequence
-
-
-class SectionType(Enum):
-    """Типы секций Terraform."""
-    PLAN = "plan"
-    APPLY = "apply"
-    INIT = "init"
-
-
-class LogSection:
-    """Представление секции лога."""
-
-    def __init__(self, section_type: SectionType, start_index: int):
-        self.section_type = section_type
-        self.start_index = start_index
-        self.end_index: int | None = None
-        self.logs: list[dict] = []
-
-
-def detect_section_markers(log_entry: dict) -> tuple[SectionType | None, SectionType | None]:
-    message = log_entry.get('@message', '') or log_entry.get('message', '')
-    log_type = log_entry.get('type', '')
-
-    return detect_section_start(message), detect_section_end(log_type, message)
-
-
-def detect_section_start(message: str) -> SectionType | None:
-    if 'backend/local: starting Plan operation' in message:
-        return SectionType.PLAN
-    elif 'backend/local: starting Apply operation' in message:
-        return SectionType.APPLY
-    elif 'Initializing the backend' in message or 'Initializing provider plugins' in message:
-        return SectionType.INIT
-    return None
-
-
-def detect_section_end(log_type: str, message: str) -> SectionType | None:
-    if log_type == 'change_summary' or 'Plan:' in message:
-        return SectionType.PLAN
-    elif log_type == 'apply_complete' or 'Apply complete!' in message:
-        return SectionType.APPLY
-    elif 'Terraform has been successfully initialized' in message:
-        return SectionType.INIT
-    return None
+import sys
+from collections import deque
+from datetime import datetime
+from typing import Callable, Iterable, Iterator
+
+from sqlalchemy import false, func
+from sqlalchemy.orm import Session, Query
+
+from app.json_codec import loads, DecodeError
+from app.models import LogPayload, TerraformLog, LogSectionRecord, Upload
+from app.services.log_archive import LogReader, detect_file_compression
+from app.services.log_fixing import fix_log_sequence, LogSequenceFixer
+from app.services.log_dictionary import ID_COLUMNS, load_row_values, lookup_id
+from app.services.log_bulk_insert import (
+    bulk_insert_rows,
+    log_to_row,
+    INSERT_BATCH_SIZE,
+    INSERT_COMMIT_EVERY
+)
+from app.services.log_sections import LogSection, SectionDetector, SectionType, detect_section_markers
+from app.services.log_pagination import fetch_page, order_by_sort_key
+from app.services.log_payloads import merge_payload
+from app.services.log_projection import projected_columns
+from app.services.log_search import message_contains_condition
+from app.services.log_parallel import should_parse_in_parallel, iter_chunk_results_parallel
+from app.services.log_stream import iter_log_entries, iter_file_chunks, IngestProgress
+from app.services.log_timestamps import to_epoch_us, format_timestamp_us
+from app.services.log_stats import LogStatsAccumulator
+from app.services.request_summary import RequestSummaryAccumulator
+from app.services.result_cache import invalidate_results_on_commit
+from app.services.uploads import create_upload, finish_upload, delete_all_uploads
 
 
 def parse_terraform_log_with_sections(content: str, filename: str) -> dict:
@@ -59,55 +39,13 @@ def parse_terraform_log_with_sections(content: str, filename: str) -> dict:
     """
     logs, fixed_count = parse_terraform_log(content)
 
-    # Анализ секций
-    sections = []
-    current_section: LogSection | None = None
-
-    for idx, log_entry in enumerate(logs):
-        start_section, end_section = detect_section_markers(log_entry)
-
-        # Начало новой секции
-        if start_section:
-            # Закрываем предыдущую секцию, если была открыта
-            if current_section and current_section.end_index is None:
-                current_section.end_index = idx - 1
-                sections.append(current_section)
-
-            current_section = LogSection(start_section, idx)
-            current_section.logs.append(log_entry)
-
-        # Конец текущей секции
-        elif end_section and current_section:
-            if current_section.section_type.value == end_section.value:
-                current_section.logs.append(log_entry)
-                current_section.end_index = idx
-                sections.append(current_section)
-                current_section = None
-
-        # Продолжение текущей секции
-        elif current_section:
-            current_section.logs.append(log_entry)
-
-    # Закрываем последнюю секцию, если осталась открытой
-    if current_section and current_section.end_index is None:
-        current_section.end_index = len(logs) - 1
-        sections.append(current_section)
+    detector = SectionDetector()
+    for log_entry in logs:
+        detector.feed(log_entry)
 
     return {
         'logs': logs,
-        'sections': [
-            {
-                'type': section.section_type.value,
-                'start_index': section.start_index,
-                'end_index': section.end_index,
-                'log_count': len(section.logs),
-                'start_timestamp': section.logs[0].get('@timestamp') or section.logs[0].get(
-                    'timestamp') if section.logs else None,
-                'end_timestamp': section.logs[-1].get('@timestamp') or section.logs[-1].get(
-                    'timestamp') if section.logs else None
-            }
-            for section in sections
-        ],
+        'sections': [section.to_dict() for section in detector.finish()],
         'filename': filename,
         'total_logs': len(logs),
         'fixed_logs_count': fixed_count
@@ -125,46 +63,325 @@ def parse_terraform_log(content: str) -> tuple[list[dict], int]:
 
     # Try to parse as JSON array first
     try:
-        data = json.loads(content)
+        data = loads(content)
         if isinstance(data, list):
             logs = data
         elif isinstance(data, dict):
             logs = [data]
-    except json.JSONDecodeError:
+    except DecodeError:
         # Try parsing line by line (JSONL format)
         for line in content.strip().split('\n'):
             if line.strip():
                 try:
-                    log_entry = json.loads(line)
+                    log_entry = loads(line)
                     logs.append(log_entry)
-                except json.JSONDecodeError:
+                except DecodeError:
                     continue
 
     return fix_log_sequence(logs)
 
 
-def save_logs_to_db(db: Session, logs: list[dict], filename: str) -> int:
-    """Save parsed logs to database."""
-    count = 0
-    for log in logs:
-        log_entry = TerraformLog(
+def save_logs_to_db(
+        db: Session,
+        logs: Iterable[dict],
+        filename: str,
+        batch_size: int = INSERT_BATCH_SIZE,
+        commit_every: int = INSERT_COMMIT_EVERY,
+        on_commit: Callable[[int], None] | None = None,
+        upload_id: int | None = None
+) -> int:
+    """
+    Save parsed logs to database as the rows of one upload.
+
+    Logs may be any iterable, including a generator; they are consumed
+    in batches and written through the bulk insert path. request_summary
+    sections and the statistics rollups are updated in the same
+    transactions as the rows.
+    A new upload is created unless upload_id is given; the logs of an upload
+    that already has rows are appended to them.
+    """
+    if upload_id is None:
+        upload_id = create_upload(db, filename).id
+    upload = db.get(Upload, upload_id)
+    uploaded_at = upload.uploaded_at
+    stored_count = upload.log_count or 0
+    summaries = RequestSummaryAccumulator(upload_id)
+    log_stats = LogStatsAccumulator(upload_id)
+    sections = SectionDetector()
+    sections.index = stored_count
+    if stored_count:
+        reopen_last_section(db, upload_id, sections)
+    # Section markers need the parsed entry, section bounds need the row ids assigned on insert
+    pending_markers = deque()
+
+    def iter_rows():
+        for log in logs:
+            row = log_to_row(log, filename, uploaded_at, upload_id)
+            duration_ms = log.get('tf_req_duration_ms')
+            summaries.add(row, duration_ms)
+            log_stats.add(row, duration_ms)
+            pending_markers.append(detect_section_markers(log))
+            yield row
+
+    def detect_sections(batch: list[dict]):
+        for row in batch:
+            sections.feed(row, row['id'], pending_markers.popleft())
+
+    def flush_summaries(rows_inserted: int):
+        summaries.flush(db)
+        log_stats.flush(db)
+        save_sections(db, sections.pop_closed(), upload_id, filename, uploaded_at)
+        invalidate_results_on_commit(db)
+        if on_commit:
+            on_commit(rows_inserted)
+
+    stats = bulk_insert_rows(
+        db, iter_rows(), batch_size=batch_size, commit_every=commit_every,
+        on_commit=flush_summaries, on_batch=detect_sections
+    )
+    save_sections(db, sections.finish(), upload_id, filename, uploaded_at)
+    finish_upload(db, upload_id, stored_count + stats.rows)
+    invalidate_results_on_commit(db)
+    db.commit()
+    return stats.rows
+
+
+def reopen_last_section(db: Session, upload_id: int, sections: SectionDetector) -> None:
+    """
+    Continue the section that was still open at the end of an upload.
+
+    It was closed when the upload was finished; its record is removed and it
+    is saved again once the appended logs close it.
+    """
+    record = (
+        db.query(LogSectionRecord)
+        .filter(LogSectionRecord.upload_id == upload_id, LogSectionRecord.end_index == sections.index - 1)
+        .first()
+    )
+    if record is None:
+        return
+    last = db.query(TerraformLog).filter(
+        TerraformLog.upload_id == upload_id, TerraformLog.id == record.end_id
+    ).first()
+    if last is None:
+        return
+    load_row_values(db, [last])
+    _, end_section = detect_section_markers(last.raw_data)
+    if end_section is not None and end_section.value == record.type:
+        # Closed by its own end marker
+        return
+
+    section = LogSection(SectionType(record.type), record.start_index, record.start_id)
+    section.log_count = record.log_count
+    section.start_timestamp = record.start_timestamp
+    section.end_timestamp = record.end_timestamp
+    sections.current = section
+    sections.previous_id = last.id
+    db.delete(record)
+
+
+def save_sections(
+        db: Session,
+        sections: list[LogSection],
+        upload_id: int,
+        filename: str,
+        uploaded_at: datetime
+) -> None:
+    """Add detected sections of an upload to the current transaction."""
+    db.add_all(
+        LogSectionRecord(
+            upload_id=upload_id,
             filename=filename,
-            log_level=log.get('@level') or log.get('level'),
-            timestamp=log.get('@timestamp') or log.get('timestamp'),
-            message=log.get('@message') or log.get('message'),
-            caller=log.get('@caller'),
-            module=log.get('@module'),
-            tf_provider_addr=log.get('tf_provider_addr'),
-            tf_req_id=log.get('tf_req_id'),
-            tf_resource_type=log.get('tf_resource_type'),
-            tf_rpc=log.get('tf_rpc'),
-            raw_data=log
+            uploaded_at=uploaded_at,
+            type=section.section_type.value,
+            start_index=section.start_index,
+            end_index=section.end_index,
+            start_id=section.start_id,
+            end_id=section.end_id,
+            log_count=section.log_count,
+            start_timestamp=section.start_timestamp,
+            end_timestamp=section.end_timestamp,
+        )
+        for section in sections
+    )
+
+
+def ingest_log_stream(
+        db: Session,
+        chunks: Iterable[bytes],
+        filename: str,
+        on_progress: Callable[[IngestProgress], None] | None = None,
+        upload_id: int | None = None,
+        fixer: LogSequenceFixer | None = None,
+        commit_every: int = INSERT_COMMIT_EVERY
+) -> tuple[int, int]:
+    """
+    Parse, fix and save a log that arrives as a stream of byte chunks.
+
+    Memory usage does not depend on the size of the log: entries are split
+    incrementally, fixed one by one and written to the database in batches.
+    on_progress is called before every commit with the current counters.
+    A fixer may be passed in to continue the sequence of an earlier part.
+
+    Returns:
+        tuple: (saved_entries_count, count_of_fixed_entries)
+    """
+    progress = IngestProgress()
+    fixer = fixer or LogSequenceFixer()
+
+    def count_bytes(source: Iterable[bytes]):
+        for chunk in source:
+            progress.bytes_read += len(chunk)
+            yield chunk
+
+    def count_entries(source: Iterable[dict]):
+        for entry in source:
+            progress.entries_parsed += 1
+            yield entry
+
+    def report(rows_inserted: int):
+        progress.rows_inserted = rows_inserted
+        progress.fixed_logs_count = fixer.fixed_count
+        if on_progress:
+            on_progress(progress)
+
+    entries = fixer.fix_stream(count_entries(iter_log_entries(count_bytes(chunks))))
+    count = save_logs_to_db(
+        db, entries, filename, commit_every=commit_every, on_commit=report, upload_id=upload_id
+    )
+    return count, fixer.fixed_count
+
+
+def ingest_log_file(
+        db: Session,
+        path: str,
+        filename: str,
+        on_progress: Callable[[IngestProgress], None] | None = None,
+        upload_id: int | None = None,
+        member: str | None = None
+) -> tuple[int, int]:
+    """
+    Parse, fix and save a log stored on disk.
+
+    Large JSONL files are decoded on all cores in newline-aligned byte ranges,
+    everything else goes through ingest_log_stream. Compressed files and
+    members of zip archives are decompressed while they are parsed; their
+    progress counts compressed bytes.
+
+    Returns:
+        tuple: (saved_entries_count, count_of_fixed_entries)
+    """
+    if member is not None or detect_file_compression(path) is not None:
+        with LogReader(path, member) as reader:
+            def report_compressed(progress: IngestProgress):
+                progress.bytes_read = reader.compressed_bytes_read()
+                if on_progress:
+                    on_progress(progress)
+
+            return ingest_log_stream(db, iter_file_chunks(reader.stream), filename, report_compressed, upload_id)
+
+    if not should_parse_in_parallel(path):
+        with open(path, 'rb') as f:
+            return ingest_log_stream(db, iter_file_chunks(f), filename, on_progress, upload_id)
+
+    progress = IngestProgress()
+
+    def iter_entries():
+        for result in iter_chunk_results_parallel(path):
+            progress.bytes_read += result.size
+            progress.entries_parsed += len(result.entries)
+            progress.fixed_logs_count += result.fixed_count
+            yield from result.entries
+
+    def report(rows_inserted: int):
+        progress.rows_inserted = rows_inserted
+        if on_progress:
+            on_progress(progress)
+
+    count = save_logs_to_db(db, iter_entries(), filename, on_commit=report, upload_id=upload_id)
+    return count, progress.fixed_logs_count
+
+
+def extend_log_file(
+        db: Session,
+        path: str,
+        upload_id: int,
+        prefix_upload_id: int,
+        skip_bytes: int,
+        on_progress: Callable[[IngestProgress], None] | None = None,
+        member: str | None = None
+) -> tuple[int, int]:
+    """
+    Ingest a log whose first skip_bytes are the content of a stored upload.
+
+    The entries of the stored upload are copied into upload_id without being
+    parsed or fixed again, the rest of the log is read past them and parsed,
+    with timestamps fixed up from the last copied entry on. The stored upload
+    itself is left as it is. Raises ValueError if it no longer exists or
+    changes while it is copied.
+
+    Returns:
+        tuple: (saved_entries_count, count_of_fixed_entries) of the rest of the log
+    """
+    prefix = db.get(Upload, prefix_upload_id)
+    if prefix is None:
+        raise ValueError(f"Upload {prefix_upload_id} no longer exists")
+    prefix_count = prefix.log_count or 0
+    upload = db.get(Upload, upload_id)
+    copied = save_logs_to_db(db, iter_upload_entries(db, prefix_upload_id), upload.filename, upload_id=upload_id)
+    if copied != prefix_count:
+        raise ValueError(f"Upload {prefix_upload_id} changed while it was copied")
+
+    fixer = LogSequenceFixer()
+    fixer.prev_timestamp = (
+        db.query(TerraformLog.timestamp)
+        .filter(TerraformLog.upload_id == upload_id, TerraformLog.timestamp.isnot(None))
+        .order_by(TerraformLog.id.desc())
+        .limit(1)
+        .scalar()
+    )
+
+    with LogReader(path, member) as reader:
+        reader.stream.seek(skip_bytes)
+
+        def report_read(progress: IngestProgress):
+            progress.bytes_read = reader.compressed_bytes_read()
+            if on_progress:
+                on_progress(progress)
+
+        return ingest_log_stream(
+            db, iter_file_chunks(reader.stream), upload.filename, report_read, upload_id,
+            fixer=fixer, commit_every=sys.maxsize
         )
-        db.add(log_entry)
-        count += 1
 
-    db.commit()
-    return count
+
+def iter_upload_entries(db: Session, upload_id: int, batch_size: int = INSERT_BATCH_SIZE) -> Iterator[dict]:
+    """
+    The complete stored entries of an upload in their original order.
+
+    Rows are read in batches by id rather than through one cursor, so the
+    caller may commit while it consumes them.
+    """
+    last_id = 0
+    while True:
+        logs = (
+            db.query(TerraformLog)
+            .filter(TerraformLog.upload_id == upload_id, TerraformLog.id > last_id)
+            .order_by(TerraformLog.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not logs:
+            return
+        load_row_values(db, logs)
+        payload_ids = [log.id for log in logs if log.payload_size is not None]
+        payloads = dict(
+            db.query(LogPayload.log_id, LogPayload.data)
+            .filter(LogPayload.upload_id == upload_id, LogPayload.log_id.in_(payload_ids))
+        ) if payload_ids else {}
+        for log in logs:
+            yield merge_payload(log.raw_data, payloads.get(log.id))
+        last_id = logs[-1].id
 
 
 def get_all_logs(
@@ -172,182 +389,209 @@ def get_all_logs(
         skip: int = 0,
         limit: int = 100,
         tf_resource_type: str | None = None,
-        start_timestamp: str | None = None,
-        end_timestamp: str | None = None,
+        start_timestamp: datetime | None = None,
+        end_timestamp: datetime | None = None,
         tf_req_id: str | None = None,
         tf_rpc: str | None = None,
         message_contains: str | None = None,
-        group_by_request_id: bool = True
+        group_by_request_id: bool = True,
+        level: str | None = None,
+        cursor: str | None = None,
+        upload_id: int | None = None,
+        fields: list[str] | None = None
 ):
-    """Get all logs from database with optional filtering."""
-    query = db.query(TerraformLog)
+    """
+    Get all logs from database with optional filtering.
 
+    Pages are selected with a keyset cursor (see encode_cursor) when one is
+    given, so deep pages cost the same as the first one; skip is only kept
+    for older clients. Raises ValueError for an invalid cursor.
+
+    With fields, only those columns are selected and plain rows are
+    returned instead of TerraformLog objects, see encode_log_rows.
+    """
+    if fields:
+        query = db.query(*projected_columns(fields, group_by_request_id))
+    else:
+        query = db.query(TerraformLog)
+    query = filter_logs(
+        query,
+        tf_resource_type=tf_resource_type,
+        start_timestamp=start_timestamp,
+        end_timestamp=end_timestamp,
+        tf_req_id=tf_req_id,
+        tf_rpc=tf_rpc,
+        message_contains=message_contains,
+        level=level,
+        upload_id=upload_id
+    )
+
+    # Order by request_id if grouping is enabled, otherwise by timestamp
+    if cursor or not skip:
+        logs = fetch_page(query, group_by_request_id, limit, cursor)
+    else:
+        logs = order_by_sort_key(query, group_by_request_id).offset(skip).limit(limit).all()
+    load_row_values(db, logs)
+    return logs
+
+
+def filter_logs(
+        query: Query,
+        tf_resource_type: str | None = None,
+        start_timestamp: datetime | None = None,
+        end_timestamp: datetime | None = None,
+        tf_req_id: str | None = None,
+        tf_rpc: str | None = None,
+        message_contains: str | None = None,
+        level: str | None = None,
+        upload_id: int | None = None
+) -> Query:
+    """Apply the /logs filters to a query over terraform_logs."""
+    if upload_id is not None:
+        query = query.filter(TerraformLog.upload_id == upload_id)
+    if level:
+        query = _filter_value(query, 'log_level', level)
     if tf_resource_type:
-        query = query.filter(TerraformLog.tf_resource_type == tf_resource_type)
+        query = _filter_value(query, 'tf_resource_type', tf_resource_type)
     if start_timestamp:
-        query = query.filter(TerraformLog.timestamp >= start_timestamp)
+        query = query.filter(TerraformLog.timestamp_us >= to_epoch_us(start_timestamp))
     if end_timestamp:
-        query = query.filter(TerraformLog.timestamp <= end_timestamp)
+        query = query.filter(TerraformLog.timestamp_us <= to_epoch_us(end_timestamp))
     if tf_req_id:
         query = query.filter(TerraformLog.tf_req_id == tf_req_id)
     if tf_rpc:
-        query = query.filter(TerraformLog.tf_rpc == tf_rpc)
+        query = _filter_value(query, 'tf_rpc', tf_rpc)
     if message_contains:
-        query = query.filter(TerraformLog.message.contains(message_contains))
-
-    # Order by request_id if grouping is enabled, otherwise by timestamp
-    if group_by_request_id:
-        return query.order_by(TerraformLog.tf_req_id, TerraformLog.timestamp).offset(skip).limit(limit).all()
-    else:
-        return query.order_by(TerraformLog.timestamp).offset(skip).limit(limit).all()
+        query = query.filter(message_contains_condition(query.session, message_contains))
+    return query
 
 
-def get_logs_by_level(db: Session, level: str):
-    """Get logs filtered by level."""
-    return db.query(TerraformLog).filter(TerraformLog.log_level == level).order_by(
-        TerraformLog.uploaded_at.desc()).all()
+def _filter_value(query: Query, field: str, value: str) -> Query:
+    # Dictionary-encoded columns are compared by id; a value that was never stored matches nothing
+    value_id = lookup_id(query.session, field, value)
+    if value_id is None:
+        return query.filter(false())
+    return query.filter(getattr(TerraformLog, ID_COLUMNS[field]) == value_id)
 
 
 def delete_all_logs(db: Session) -> int:
-    """Delete all logs from database. Returns count of deleted logs."""
-    count = db.query(TerraformLog).count()
-    db.query(TerraformLog).delete()
-    db.commit()
-    return count
-
-
-def get_gantt_data(db: Session) -> list[dict]:
-    """
-    Get aggregated request data for Gantt chart visualization.
-    Groups logs by tf_req_id and calculates start/end timestamps.
-    Optimized: no full log storage, no per-group sorting.
-    """
-    logs_with_req_id = (
-        db.query(TerraformLog)
+    """Delete all uploads with their logs. Returns count of deleted logs."""
+    return delete_all_uploads(db)
+
+
+def get_request_ids(db: Session, upload_id: int | None = None) -> list[dict]:
+    """Get list of unique request IDs with basic metadata."""
+    logs = db.query(TerraformLog)
+    if upload_id is not None:
+        logs = logs.filter(TerraformLog.upload_id == upload_id)
+
+    # Get unique request IDs with count
+    result = (
+        logs.with_entities(
+            TerraformLog.tf_req_id,
+            func.count(TerraformLog.id).label('log_count'),
+            func.min(TerraformLog.timestamp_us).label('start_timestamp_us'),
+            func.max(TerraformLog.timestamp_us).label('end_timestamp_us')
+        )
         .filter(TerraformLog.tf_req_id.isnot(None))
-        .order_by(TerraformLog.timestamp)
+        .group_by(TerraformLog.tf_req_id)
+        .order_by(func.min(TerraformLog.timestamp_us))
         .all()
     )
 
-    requests_data = {}
-    for log in logs_with_req_id:
-        req_id = log.tf_req_id
-        if req_id not in requests_data:
-            requests_data[req_id] = {
-                'tf_req_id': req_id,
-                'tf_rpc': log.tf_rpc,
-                'tf_resource_type': log.tf_resource_type,
-                'start_timestamp': log.timestamp,
-                'end_timestamp': log.timestamp,
-                'log_count': 1,
-            }
-        else:
-            data = requests_data[req_id]
-
-            if log.timestamp and (not data['start_timestamp'] or log.timestamp < data['start_timestamp']):
-                data['start_timestamp'] = log.timestamp
-            if log.timestamp and (not data['end_timestamp'] or log.timestamp > data['end_timestamp']):
-                data['end_timestamp'] = log.timestamp
-            data['log_count'] += 1
-
-            if not data['tf_rpc'] and log.tf_rpc:
-                data['tf_rpc'] = log.tf_rpc
-            if not data['tf_resource_type'] and log.tf_resource_type:
-                data['tf_resource_type'] = log.tf_resource_type
-
-    gantt_data = list(requests_data.values())
-    gantt_data.sort(key=lambda x: x['start_timestamp'] or '')
-
-    return gantt_data
-
-
-def get_sections_from_db(db: Session) -> dict:
+    # Also get logs without request_id
+    no_req_id_count = logs.with_entities(func.count(TerraformLog.id)).filter(
+        TerraformLog.tf_req_id.is_(None)
+    ).scalar()
+
+    request_ids = [
+        {
+            'tf_req_id': row.tf_req_id,
+            'log_count': row.log_count,
+            'start_timestamp': format_timestamp_us(row.start_timestamp_us),
+            'end_timestamp': format_timestamp_us(row.end_timestamp_us)
+        }
+        for row in result
+    ]
+
+    # Add no-request-id group if exists
+    if no_req_id_count > 0:
+        request_ids.append({
+            'tf_req_id': 'no-request-id',
+            'log_count': no_req_id_count,
+            'start_timestamp': None,
+            'end_timestamp': None
+        })
+
+    return request_ids
+
+
+def get_logs_by_request(
+        db: Session,
+        request_id: str,
+        fields: list[str],
+        upload_id: int | None = None
+) -> list:
+    """Get the given columns of all logs of a request ID, 'no-request-id' for logs without one."""
+    query = db.query(*projected_columns(fields))
+    if upload_id is not None:
+        query = query.filter(TerraformLog.upload_id == upload_id)
+
+    if request_id == 'no-request-id':
+        query = query.filter(TerraformLog.tf_req_id.is_(None))
+    else:
+        query = query.filter(TerraformLog.tf_req_id == request_id)
+    logs = query.order_by(TerraformLog.timestamp_us).all()
+    load_row_values(db, logs)
+    return logs
+
+
+def get_sections_from_db(db: Session, upload_id: int | None = None) -> dict:
     """
-    Get sections data from database logs.
-    Similar to parse_terraform_log_with_sections but works from DB.
+    Get section metadata of all uploads, or of one upload.
+
+    Sections are detected once during ingest; the logs of a section are
+    fetched page by page with get_section_logs.
     """
-    # Get all logs from database
-    logs_query = db.query(TerraformLog).order_by(TerraformLog.id).all()
-    
-    if not logs_query:
-        return {
-            'logs': [],
-            'sections': [],
-            'filename': '',
-            'total_logs': 0,
-            'fixed_logs_count': 0
-        }
-    
-    # Convert DB logs to dict format similar to JSON logs
-    logs = []
-    for log in logs_query:
-        log_dict = {
-            '@level': log.log_level,
-            '@timestamp': log.timestamp,
-            '@message': log.message,
-            'level': log.log_level,
-            'timestamp': log.timestamp,
-            'message': log.message,
-        }
-        # Add raw_data if available
-        if log.raw_data:
-            log_dict.update(log.raw_data)
-        logs.append(log_dict)
-    
-    # Analyze sections using the same logic as parse_terraform_log_with_sections
-    sections = []
-    current_section: LogSection | None = None
-
-    for idx, log_entry in enumerate(logs):
-        start_section, end_section = detect_section_markers(log_entry)
-
-        # Start of new section
-        if start_section:
-            # Close previous section if open
-            if current_section and current_section.end_index is None:
-                current_section.end_index = idx - 1
-                sections.append(current_section)
-
-            current_section = LogSection(start_section, idx)
-            current_section.logs.append(log_entry)
-
-        # End of current section
-        elif end_section and current_section:
-            if current_section.section_type.value == end_section.value:
-                current_section.logs.append(log_entry)
-                current_section.end_index = idx
-                sections.append(current_section)
-                current_section = None
-
-        # Continue current section
-        elif current_section:
-            current_section.logs.append(log_entry)
-
-    # Close last section if still open
-    if current_section and current_section.end_index is None:
-        current_section.end_index = len(logs) - 1
-        sections.append(current_section)
-
-    # Get filename from first log
-    filename = logs_query[0].filename if logs_query else ''
+    sections = db.query(LogSectionRecord)
+    uploads = db.query(Upload)
+    if upload_id is not None:
+        sections = sections.filter(LogSectionRecord.upload_id == upload_id)
+        uploads = uploads.filter(Upload.id == upload_id)
+    sections = sections.order_by(LogSectionRecord.upload_id, LogSectionRecord.id).all()
+    uploads = uploads.order_by(Upload.id).all()
 
     return {
-        'logs': logs,
-        'sections': [
-            {
-                'type': section.section_type.value,
-                'start_index': section.start_index,
-                'end_index': section.end_index,
-                'log_count': len(section.logs),
-                'start_timestamp': section.logs[0].get('@timestamp') or section.logs[0].get(
-                    'timestamp') if section.logs else None,
-                'end_timestamp': section.logs[-1].get('@timestamp') or section.logs[-1].get(
-                    'timestamp') if section.logs else None
-            }
-            for section in sections
-        ],
-        'filename': filename,
-        'total_logs': len(logs),
+        'sections': sections,
+        'filename': uploads[0].filename if uploads else '',
+        'total_logs': sum(upload.log_count or 0 for upload in uploads),
         'fixed_logs_count': 0  # DB logs are already processed
     }
 
+
+def get_section_logs(
+        db: Session,
+        section_id: int,
+        limit: int = 100,
+        after_id: int | None = None
+) -> list[TerraformLog] | None:
+    """
+    Get a page of the logs of one section in ingest order.
+
+    Returns None if there is no such section.
+    """
+    section = db.get(LogSectionRecord, section_id)
+    if section is None:
+        return None
+
+    # Ids grow in insertion order within an upload, but uploads ingested
+    # concurrently may interleave, hence the upload_id check
+    query = db.query(TerraformLog).filter(
+        TerraformLog.upload_id == section.upload_id,
+        TerraformLog.id.between(section.start_id, section.end_id)
+    )
+    if after_id is not None:
+        query = query.filter(TerraformLog.id > after_id)
+    logs = query.order_by(TerraformLog.id).limit(limit).all()
+    load_row_values(db, logs)
+    return logs
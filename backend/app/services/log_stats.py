@@ -0,0 +1,195 @@
+"""
+Statistics of stored logs, served from rollup tables.
+
+Ingest counts the entries of every upload by level, rpc, resource type and
+provider into log_stats, and the tf_req_duration_ms values by rpc into a
+histogram in rpc_duration_stats, in the same transactions as the rows.
+Both are kept per upload, so deleting an upload deletes its share and
+get_stats only sums a few hundred rows, however many logs are stored.
+
+Durations are counted in logarithmic buckets, DURATION_BUCKETS_PER_DOUBLING
+per doubling; percentiles are the upper bound of the bucket they fall in,
+so they are at most about 9% above the exact value.
+Section statistics are read from the sections table, which already holds
+one row per detected section.
+"""
+import math
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import LogStat, RpcDurationStat, LogSectionRecord
+
+# Stored bucket numbers depend on it, so it is not configurable
+DURATION_BUCKETS_PER_DOUBLING = 8
+PERCENTILES = (50, 90, 95, 99)
+
+# Dimension of log_stats and the terraform_logs column it counts
+STATS_DIMENSIONS = {
+    'level': 'log_level',
+    'rpc': 'tf_rpc',
+    'resource_type': 'tf_resource_type',
+    'provider': 'tf_provider_addr',
+}
+# Key of each dimension in the get_stats result
+STATS_KEYS = {
+    'level': 'levels',
+    'rpc': 'rpcs',
+    'resource_type': 'resource_types',
+    'provider': 'providers',
+}
+
+_BUCKET_BASE = math.log(2) / DURATION_BUCKETS_PER_DOUBLING
+
+
+def duration_bucket(duration_ms: int) -> int:
+    """
+    Bucket 0 holds durations up to 0 ms, bucket k > 0 those in
+    (base^(k-2), base^(k-1)] with base = 2^(1 / DURATION_BUCKETS_PER_DOUBLING).
+    """
+    if duration_ms <= 0:
+        return 0
+    # The epsilon keeps exact powers, e.g. 2 ms, in their own bucket despite rounding
+    return 1 + max(math.ceil(math.log(duration_ms) / _BUCKET_BASE - 1e-9), 0)
+
+
+def bucket_upper_bound(bucket: int) -> int:
+    """The largest duration in ms counted in a bucket, rounded."""
+    if bucket <= 0:
+        return 0
+    return round(math.exp((bucket - 1) * _BUCKET_BASE))
+
+
+def _duration_ms(value) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _value(value) -> str:
+    return '' if value is None else str(value)
+
+
+class LogStatsAccumulator:
+    """
+    Counts the terraform_logs rows of one upload while they are inserted.
+
+    Memory is proportional to the number of distinct values seen since the
+    last flush; flush() adds them to the rollups in the current transaction.
+    """
+
+    def __init__(self, upload_id: int):
+        self.upload_id = upload_id
+        self.counts: dict[tuple[str, str], int] = {}
+        self.durations: dict[tuple[str, int], int] = {}
+
+    def add(self, row: dict, duration_ms=None) -> None:
+        counts = self.counts
+        for dimension, column in STATS_DIMENSIONS.items():
+            key = (dimension, _value(row.get(column)))
+            counts[key] = counts.get(key, 0) + 1
+        duration_ms = _duration_ms(duration_ms)
+        if duration_ms is not None:
+            key = (_value(row.get('tf_rpc')), duration_bucket(duration_ms))
+            self.durations[key] = self.durations.get(key, 0) + 1
+
+    def flush(self, db: Session) -> None:
+        if self.counts:
+            _merge_counts(db, LogStat, ('upload_id', 'dimension', 'value'), [
+                {'upload_id': self.upload_id, 'dimension': dimension, 'value': value, 'count': count}
+                for (dimension, value), count in self.counts.items()
+            ])
+            self.counts.clear()
+        if self.durations:
+            _merge_counts(db, RpcDurationStat, ('upload_id', 'tf_rpc', 'bucket'), [
+                {'upload_id': self.upload_id, 'tf_rpc': rpc, 'bucket': bucket, 'count': count}
+                for (rpc, bucket), count in self.durations.items()
+            ])
+            self.durations.clear()
+
+
+def _merge_counts(db: Session, model, keys: tuple[str, ...], rows: list[dict]) -> None:
+    """Add counts to a rollup table (upsert)."""
+    # Sorted keys take row locks in a fixed order, so concurrent ingests can not deadlock
+    rows.sort(key=lambda row: tuple(row[key] for key in keys))
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        insert = postgresql.insert
+    elif dialect == 'sqlite':
+        insert = sqlite.insert
+    else:
+        for row in rows:
+            existing = db.get(model, tuple(row[key] for key in keys))
+            if existing is None:
+                db.add(model(**row))
+            else:
+                existing.count += row['count']
+        db.flush()
+        return
+
+    table = model.__table__
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c[key] for key in keys],
+        set_={'count': table.c.count + statement.excluded.count}
+    )
+    db.execute(statement, rows)
+
+
+def _percentiles(buckets: list[tuple[int, int]]) -> dict:
+    """Nearest-rank percentiles of a histogram given as (bucket, count) in bucket order."""
+    total = sum(count for _, count in buckets)
+    result = {'count': total}
+    targets = [(f"p{percentile}", max(math.ceil(percentile / 100 * total), 1)) for percentile in PERCENTILES]
+    cumulative = 0
+    for bucket, count in buckets:
+        cumulative += count
+        while targets and cumulative >= targets[0][1]:
+            result[targets.pop(0)[0]] = bucket_upper_bound(bucket)
+    result['max'] = bucket_upper_bound(buckets[-1][0])
+    return result
+
+
+def get_stats(db: Session, upload_id: int | None = None) -> dict:
+    """
+    Entry counts by level, rpc, resource type and provider, sections by type
+    and tf_req_duration_ms percentiles by rpc, of all uploads or of one.
+
+    Values are null for entries without one; lists are ordered by count.
+    """
+    counts = db.query(LogStat.dimension, LogStat.value, func.sum(LogStat.count))
+    durations = db.query(RpcDurationStat.tf_rpc, RpcDurationStat.bucket, func.sum(RpcDurationStat.count))
+    sections = db.query(LogSectionRecord.type, func.count(), func.sum(LogSectionRecord.log_count))
+    if upload_id is not None:
+        counts = counts.filter(LogStat.upload_id == upload_id)
+        durations = durations.filter(RpcDurationStat.upload_id == upload_id)
+        sections = sections.filter(LogSectionRecord.upload_id == upload_id)
+
+    stats = {key: [] for key in STATS_KEYS.values()}
+    for dimension, value, count in counts.group_by(LogStat.dimension, LogStat.value):
+        stats[STATS_KEYS[dimension]].append({'value': value or None, 'count': int(count)})
+    for values in stats.values():
+        values.sort(key=lambda item: (-item['count'], item['value'] or ''))
+    stats['total_logs'] = sum(item['count'] for item in stats['levels'])
+
+    stats['sections'] = sorted(
+        (
+            {'value': section_type, 'count': count, 'log_count': int(log_count or 0)}
+            for section_type, count, log_count in sections.group_by(LogSectionRecord.type)
+        ),
+        key=lambda item: (-item['log_count'], item['value'] or '')
+    )
+
+    histograms: dict[str, list[tuple[int, int]]] = {}
+    rows = durations.group_by(RpcDurationStat.tf_rpc, RpcDurationStat.bucket).order_by(
+        RpcDurationStat.tf_rpc, RpcDurationStat.bucket
+    )
+    for rpc, bucket, count in rows:
+        histograms.setdefault(rpc, []).append((bucket, int(count)))
+    stats['rpc_durations'] = sorted(
+        ({'rpc': rpc or None, **_percentiles(buckets)} for rpc, buckets in histograms.items()),
+        key=lambda item: (-item['count'], item['rpc'] or '')
+    )
+    return stats
@@ -0,0 +1,225 @@
+import codecs
+import json
+import logging
+from dataclasses import dataclass
+from itertools import chain, islice
+from typing import Iterable, Iterator
+
+from app.json_codec import decode_entry
+
+logger = logging.getLogger(__name__)
+
+# Size of a single read from an uploaded file
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Upper bound for a single JSONL line or JSON array element that is still being buffered
+MAX_ENTRY_SIZE = 64 * 1024 * 1024
+
+_WHITESPACE = ' \t\r\n'
+
+
+@dataclass
+class IngestProgress:
+    """Counters of a running ingest."""
+    bytes_read: int = 0
+    entries_parsed: int = 0
+    fixed_logs_count: int = 0
+    rows_inserted: int = 0
+
+
+def iter_file_chunks(fileobj, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """Read a binary file object in fixed-size chunks."""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def iter_log_entries(chunks: Iterable[bytes]) -> Iterator[dict]:
+    """
+    Incrementally split a Terraform log into entries.
+
+    Accepts the same formats as parse_terraform_log (a JSON array, a single
+    JSON object, pretty-printed or not, or JSONL), but never keeps more than
+    one chunk plus one unfinished entry in memory. The format is chosen by the
+    first non-whitespace byte of the stream and, for objects, by whether the
+    first line is a complete entry or opens a multi-line object that decodes.
+
+    Raises ValueError for a JSON array or document that is malformed or has
+    an element larger than MAX_ENTRY_SIZE, instead of ending the upload early.
+    """
+    chunks = iter(chunks)
+    parts = []
+    size = 0
+    opening = None
+    for chunk in chunks:
+        parts.append(chunk)
+        size += len(chunk)
+        content = chunk
+        if opening is None:
+            content = chunk.lstrip()
+            opening = content[:1] or None
+        # An object needs its whole first line to tell JSONL from a pretty-printed document
+        if opening is not None and (opening != b'{' or b'\n' in content or size > MAX_ENTRY_SIZE):
+            break
+
+    head = b''.join(parts)
+    stripped = head.lstrip()
+    if not stripped:
+        return
+
+    if stripped.startswith(b'['):
+        yield from _iter_json_values(head, chunks, in_array=True)
+        return
+
+    is_document = json_document_state(stripped)
+    if is_document is None:
+        head, is_document = _read_first_object(head, chunks)
+    if is_document:
+        yield from _iter_json_values(head, chunks, in_array=False)
+    else:
+        yield from _iter_json_lines(head, chunks)
+
+
+def json_document_state(head: bytes) -> bool | None:
+    """
+    Whether a log starting with head (without leading whitespace) is one JSON
+    document rather than JSONL: its first line opens an object that it does
+    not close, as in pretty-printed JSON, and that object decodes.
+
+    Returns None while head ends inside that object. A truncated or invalid
+    first line is not a document, so the rest of the log is still read line
+    by line.
+    """
+    first_line = head.split(b'\n', 1)[0].strip()
+    if (
+        not first_line.startswith(b'{')
+        or first_line.endswith(b'}')
+        or decode_log_line(first_line) is not None
+    ):
+        return False
+    text = head.decode('utf-8', errors='ignore')
+    try:
+        json.JSONDecoder().raw_decode(text)
+    except json.JSONDecodeError as exc:
+        # An error on the last line may be the object continuing past the end of head
+        if '\n' not in text[exc.pos:]:
+            return None
+        return False
+    return True
+
+
+def _read_first_object(head: bytes, chunks: Iterator[bytes]) -> tuple[bytes, bool]:
+    """Read chunks until json_document_state can tell whether the log is one JSON document."""
+    parts = [head]
+    size = len(head)
+    for chunk in chunks:
+        parts.append(chunk)
+        size += len(chunk)
+        if size > MAX_ENTRY_SIZE:
+            break
+        # The first object can only end in a chunk that has a closing brace
+        if b'}' in chunk:
+            state = json_document_state(b''.join(parts).lstrip())
+            if state is not None:
+                return b''.join(parts), state
+    return b''.join(parts), False
+
+
+def _iter_json_lines(head: bytes, chunks: Iterator[bytes]) -> Iterator[dict]:
+    """
+    Split JSONL input into entries, skipping lines that are not valid JSON.
+
+    Only each new chunk is searched for line ends; the start of an unfinished
+    line is kept as a list of pieces, so long lines cost linear time. Lines
+    longer than MAX_ENTRY_SIZE are skipped with a warning.
+    """
+    pending: list[bytes] = []
+    pending_size = 0
+    oversized = False
+    for chunk in chain((head,), chunks):
+        start = 0
+        while (end := chunk.find(b'\n', start)) != -1:
+            if oversized:
+                oversized = False
+            else:
+                line = b''.join((*pending, chunk[start:end])) if pending else chunk[start:end]
+                entry = decode_log_line(line)
+                if entry is not None:
+                    yield entry
+            pending.clear()
+            pending_size = 0
+            start = end + 1
+
+        if start < len(chunk) and not oversized:
+            pending.append(chunk[start:])
+            pending_size += len(chunk) - start
+            if pending_size > MAX_ENTRY_SIZE:
+                logger.warning("Skipping a log line longer than %d bytes", MAX_ENTRY_SIZE)
+                oversized = True
+                pending.clear()
+                pending_size = 0
+
+    if pending:
+        entry = decode_log_line(b''.join(pending))
+        if entry is not None:
+            yield entry
+
+
+def decode_log_line(line: bytes) -> dict | None:
+    if not line.strip():
+        return None
+    return decode_entry(line)
+
+
+def _iter_json_values(head: bytes, chunks: Iterator[bytes], in_array: bool) -> Iterator[dict]:
+    """Decode the elements of a top-level JSON array, or consecutive top-level JSON values, one at a time."""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    separators = _WHITESPACE + ',' if in_array else _WHITESPACE
+
+    buffer = text_decoder.decode(head).lstrip(_WHITESPACE)
+    if in_array:
+        buffer = buffer[1:]
+    exhausted = False
+
+    while True:
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in separators:
+                pos += 1
+            if in_array and pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                entry, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Either a malformed element or one that continues in the next chunk
+                break
+            if isinstance(entry, dict):
+                yield entry
+
+        buffer = buffer[pos:]
+        if exhausted:
+            # An array that is only missing its closing bracket is accepted
+            if buffer:
+                raise ValueError(f"Malformed JSON near: {buffer[:80]!r}")
+            return
+        if len(buffer) > MAX_ENTRY_SIZE:
+            raise ValueError(f"JSON element larger than {MAX_ENTRY_SIZE} characters")
+
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer += text_decoder.decode(b'', final=True)
+        else:
+            buffer += text_decoder.decode(chunk)
+
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[list]:
+    """Group an iterable into lists of at most batch_size items."""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            break
+        yield batch
@@ -0,0 +1,498 @@
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import TerraformLog, Upload, RequestSummary, TailSession
+from app.services.log_bulk_insert import bulk_insert_rows, log_to_row
+from app.services.log_dictionary import load_row_values
+from app.services.log_fixing import LogSequenceFixer
+from app.services.log_projection import LOG_FIELDS, projected_columns, project_records
+from app.services.log_sections import SectionDetector, detect_section_markers
+from app.services.log_service import reopen_last_section, save_sections
+from app.services.log_stats import LogStatsAccumulator
+from app.services.log_stream import MAX_ENTRY_SIZE, decode_log_line
+from app.services.request_summary import RequestSummaryAccumulator
+from app.services.result_cache import invalidate_results_on_commit
+from app.services.uploads import create_upload
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two checks of a file that did not grow
+TAIL_POLL_INTERVAL = float(os.getenv("TAIL_POLL_INTERVAL", "0.5"))
+# Rows per insert batch; all batches of one poll are committed together
+TAIL_BATCH_SIZE = int(os.getenv("TAIL_BATCH_SIZE", "500"))
+# Upper bound of bytes read and ingested in one transaction
+TAIL_READ_SIZE = int(os.getenv("TAIL_READ_SIZE", str(4 * 1024 * 1024)))
+# Seconds a worker holds a tail session without renewing it; then another worker may take it over
+TAIL_LEASE_SECONDS = float(os.getenv("TAIL_LEASE_SECONDS", "30"))
+# Rows sent to a reconnecting client before live events
+TAIL_BACKLOG_LIMIT = int(os.getenv("TAIL_BACKLOG_LIMIT", "5000"))
+# Events buffered per client; a client that falls further behind gets a reset event
+TAIL_SUBSCRIBER_QUEUE = int(os.getenv("TAIL_SUBSCRIBER_QUEUE", "256"))
+# Directories whose files may be followed; defaults to the directory of TF_LOG_PATH
+TAIL_ALLOWED_DIRS = [
+    os.path.realpath(path)
+    for path in os.getenv(
+        "TAIL_ALLOWED_DIRS",
+        os.path.dirname(os.getenv("TF_LOG_PATH", "")) if os.getenv("TF_LOG_PATH") else ""
+    ).split(os.pathsep)
+    if path
+]
+
+# Fields pushed for new entries; raw_data is left out to keep events small
+TAIL_EVENT_FIELDS = [field for field in LOG_FIELDS if field != 'raw_data']
+
+
+class TailBroker:
+    """
+    Fan-out of tail events to the stream clients of this process.
+
+    Tailers publish from their threads, every client reads from its own
+    bounded asyncio queue on the event loop it subscribed from.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[int, set] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, tail_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=TAIL_SUBSCRIBER_QUEUE)
+        queue.loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(tail_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, tail_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(tail_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[tail_id]
+
+    def publish(self, tail_id: int, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(tail_id, ()))
+        for queue in subscribers:
+            try:
+                queue.loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # The loop of a client that is going away is already closed
+                pass
+
+
+def _offer(queue: asyncio.Queue, event: dict) -> None:
+    if queue.full():
+        # The client can not keep up; it has to reload instead of getting a gap
+        while not queue.empty():
+            queue.get_nowait()
+        event = {'event': 'reset', 'data': {}}
+    queue.put_nowait(event)
+
+
+tail_broker = TailBroker()
+_tailers: dict[int, 'LogTailer'] = {}
+_tailers_lock = threading.Lock()
+_lease_watcher: threading.Thread | None = None
+_lease_watcher_stop = threading.Event()
+
+
+class LeaseLost(Exception):
+    """The tail session was stopped or taken over by another worker."""
+
+
+def _lease_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_tail(db: Session, tail_id: int) -> bool:
+    """
+    Take or renew the lease of a running tail session for this process.
+
+    The conditional update is atomic, so of several workers resuming the
+    same session only one gets it; an expired lease, e.g. of a worker that
+    died, may be taken over. Returns False if another worker holds the
+    lease or the session is no longer running.
+    """
+    now = datetime.utcnow()
+    claimed = db.query(TailSession).filter(
+        TailSession.id == tail_id,
+        TailSession.status == "running",
+        or_(
+            TailSession.lease_owner.is_(None),
+            TailSession.lease_owner == _lease_owner(),
+            TailSession.lease_expires_at < now,
+        )
+    ).update({
+        TailSession.lease_owner: _lease_owner(),
+        TailSession.lease_expires_at: now + timedelta(seconds=TAIL_LEASE_SECONDS),
+    }, synchronize_session=False)
+    return claimed == 1
+
+
+def _renew_lease(db: Session, tail_id: int) -> None:
+    if not claim_tail(db, tail_id):
+        raise LeaseLost(tail_id)
+
+
+class LogTailer(threading.Thread):
+    """
+    Follows one growing JSONL log file and ingests complete lines as they appear.
+
+    Every poll reads from the saved byte offset up to the last newline, fixes
+    and inserts the new entries through the bulk insert path and saves the new
+    offset in the same transaction, so a restart neither loses nor repeats rows.
+    A line longer than TAIL_READ_SIZE is scanned over several polls and read
+    once it is complete; lines longer than MAX_ENTRY_SIZE are skipped.
+    Section detection and request summaries are updated incrementally; the
+    open section is only kept in memory, it is closed when the tailer stops
+    and reopened when the session is resumed.
+
+    The tailer holds the lease of its session (see claim_tail) and renews it
+    with every commit and at least every third of TAIL_LEASE_SECONDS. Once
+    the lease is lost it stops without touching the session.
+    """
+
+    def __init__(self, tail_id: int):
+        super().__init__(name=f"tail-{tail_id}", daemon=True)
+        self.tail_id = tail_id
+        # Bytes after the saved offset known to hold no newline, i.e. the start of an unfinished line
+        self.scanned = 0
+        self.stop_event = threading.Event()
+        # Set on shutdown: the session stays running and is resumed on the next start
+        self.resume_later = False
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def run(self) -> None:
+        db = SessionLocal()
+        try:
+            tail = db.get(TailSession, self.tail_id)
+            upload = db.get(Upload, tail.upload_id)
+            self.fixer = LogSequenceFixer()
+            self.fixer.prev_timestamp = tail.last_timestamp
+            self.fixer.fixed_count = tail.fixed_logs_count or 0
+            self.sections = SectionDetector()
+            self.sections.index = tail.entries_count or 0
+            if self.sections.index:
+                reopen_last_section(db, upload.id, self.sections)
+            _renew_lease(db, self.tail_id)
+            db.commit()
+            lease_renewed = time.monotonic()
+
+            while not self.stop_event.is_set():
+                if self.poll(db, tail, upload):
+                    lease_renewed = time.monotonic()
+                    continue
+                if time.monotonic() - lease_renewed > TAIL_LEASE_SECONDS / 3:
+                    _renew_lease(db, self.tail_id)
+                    db.commit()
+                    lease_renewed = time.monotonic()
+                self.stop_event.wait(TAIL_POLL_INTERVAL)
+
+            _renew_lease(db, self.tail_id)
+            self._finish(db, tail, upload)
+        except LeaseLost:
+            db.rollback()
+            tail = db.get(TailSession, self.tail_id)
+            if tail is not None and tail.lease_owner == _lease_owner():
+                # Stopped through another worker; the open section is still saved here
+                self._finish(db, tail, db.get(Upload, tail.upload_id))
+            else:
+                logger.info("Tail %s was taken over by another worker", self.tail_id)
+        except Exception as e:
+            logger.exception("Tail %s failed", self.tail_id)
+            db.rollback()
+            db.query(TailSession).filter(
+                TailSession.id == self.tail_id, TailSession.lease_owner == _lease_owner()
+            ).update({
+                TailSession.status: "failed",
+                TailSession.error: str(e),
+                TailSession.lease_owner: None,
+                TailSession.updated_at: datetime.utcnow()
+            })
+            db.commit()
+            tail_broker.publish(self.tail_id, {'event': 'failed', 'data': {'error': str(e)}})
+        finally:
+            db.close()
+            with _tailers_lock:
+                _tailers.pop(self.tail_id, None)
+
+    def _finish(self, db: Session, tail: TailSession, upload: Upload) -> None:
+        """Save the open section and release the lease; the session is stopped unless it is resumed later."""
+        save_sections(db, self.sections.finish(), upload.id, upload.filename, upload.uploaded_at)
+        if not self.resume_later:
+            tail.status = "stopped"
+        tail.lease_owner = None
+        tail.lease_expires_at = None
+        tail.updated_at = datetime.utcnow()
+        invalidate_results_on_commit(db)
+        db.commit()
+        if not self.resume_later:
+            tail_broker.publish(self.tail_id, {'event': 'stopped', 'data': {'tail_id': self.tail_id}})
+
+    def poll(self, db: Session, tail: TailSession, upload: Upload) -> bool:
+        """Ingest the complete lines written since the last poll; returns False if the file did not grow."""
+        try:
+            size = os.path.getsize(tail.path)
+        except FileNotFoundError:
+            return False
+        if size < tail.byte_offset + self.scanned:
+            # The file was truncated or replaced, e.g. by the next terraform run
+            logger.info("Tail %s: %s was truncated, following it from the start", tail.id, tail.path)
+            tail.byte_offset = 0
+            self.scanned = 0
+            self.fixer.prev_timestamp = None
+        start = tail.byte_offset + self.scanned
+        if size == start:
+            return False
+
+        with open(tail.path, 'rb') as f:
+            f.seek(start)
+            data = f.read(min(size - start, TAIL_READ_SIZE))
+            end = data.rfind(b'\n')
+            if end < 0:
+                # Only an unfinished line so far; the next poll goes on reading after it
+                self.scanned += len(data)
+                return True
+            byte_offset = start + end + 1
+            first = 0
+            if self.scanned:
+                # The first line started in an earlier poll
+                line_size = self.scanned + data.find(b'\n')
+                if line_size > MAX_ENTRY_SIZE:
+                    logger.warning("Tail %s: skipping a log line longer than %d bytes", tail.id, MAX_ENTRY_SIZE)
+                    first = data.find(b'\n') + 1
+                else:
+                    f.seek(tail.byte_offset)
+                    data = f.read(self.scanned) + data
+                    end += self.scanned
+        self.scanned = 0
+
+        lines = data[first:end].split(b'\n')
+        entries = [self.fixer.fix(entry) for entry in map(decode_log_line, lines) if entry]
+        self._save(db, tail, upload, entries, byte_offset)
+        return True
+
+    def _save(self, db: Session, tail: TailSession, upload: Upload, entries: list[dict], byte_offset: int) -> None:
+        summaries = RequestSummaryAccumulator(upload.id)
+        log_stats = LogStatsAccumulator(upload.id)
+        markers = deque()
+        rows = []
+        for entry in entries:
+            row = log_to_row(entry, upload.filename, upload.uploaded_at, upload.id)
+            summaries.add(row, entry.get('tf_req_duration_ms'))
+            log_stats.add(row, entry.get('tf_req_duration_ms'))
+            markers.append(detect_section_markers(entry))
+            rows.append(row)
+        touched_requests = list(summaries.pending)
+        entries_count = tail.entries_count or 0
+        log_count = upload.log_count or 0
+        closed_sections = []
+
+        def detect_sections(batch: list[dict]):
+            for row in batch:
+                self.sections.feed(row, row['id'], markers.popleft())
+
+        def flush(rows_inserted: int):
+            summaries.flush(db)
+            log_stats.flush(db)
+            sections = self.sections.pop_closed()
+            save_sections(db, sections, upload.id, upload.filename, upload.uploaded_at)
+            closed_sections.extend(sections)
+            tail.byte_offset = byte_offset
+            tail.entries_count = entries_count + rows_inserted
+            tail.fixed_logs_count = self.fixer.fixed_count
+            tail.last_timestamp = self.fixer.prev_timestamp
+            tail.updated_at = datetime.utcnow()
+            upload.log_count = log_count + rows_inserted
+            # Checked in the transaction of the rows, so a worker that lost the session stores nothing
+            _renew_lease(db, self.tail_id)
+            invalidate_results_on_commit(db)
+
+        # A single transaction per poll, so the saved offset always matches the stored rows
+        bulk_insert_rows(
+            db, rows, batch_size=TAIL_BATCH_SIZE, commit_every=max(len(rows), 1),
+            on_commit=flush, on_batch=detect_sections
+        )
+        self._publish(db, rows, closed_sections, touched_requests, upload.id)
+
+    def _publish(self, db: Session, rows: list[dict], closed_sections: list, touched_requests: list, upload_id: int):
+        if rows:
+            tail_broker.publish(self.tail_id, {
+                'event': 'logs',
+                'id': rows[-1]['id'],
+                'data': {'logs': [{field: row.get(field) for field in TAIL_EVENT_FIELDS} for row in rows]},
+            })
+        if closed_sections or self.sections.current:
+            current = self.sections.current
+            tail_broker.publish(self.tail_id, {
+                'event': 'sections',
+                'data': {
+                    'closed': [section.to_dict() for section in closed_sections],
+                    'current': current.to_dict() if current else None,
+                },
+            })
+        if touched_requests:
+            summaries = (
+                db.query(RequestSummary)
+                .filter(RequestSummary.upload_id == upload_id, RequestSummary.tf_req_id.in_(touched_requests))
+                .all()
+            )
+            tail_broker.publish(self.tail_id, {
+                'event': 'requests',
+                'data': {
+                    'requests': [
+                        {
+                            'tf_req_id': summary.tf_req_id,
+                            'tf_rpc': summary.tf_rpc,
+                            'tf_resource_type': summary.tf_resource_type,
+                            'start_timestamp': summary.start_timestamp,
+                            'end_timestamp': summary.end_timestamp,
+                            'log_count': summary.log_count,
+                            'tf_req_duration_ms': summary.tf_req_duration_ms,
+                        }
+                        for summary in summaries
+                    ]
+                },
+            })
+
+
+def resolve_tail_path(path: str | None) -> str:
+    """
+    Return the real path of a file that may be followed.
+
+    Defaults to TF_LOG_PATH; raises PermissionError outside TAIL_ALLOWED_DIRS.
+    """
+    path = path or os.getenv("TF_LOG_PATH")
+    if not path:
+        raise ValueError("No path given and TF_LOG_PATH is not set")
+    real_path = os.path.realpath(path)
+    if not any(os.path.commonpath([real_path, allowed]) == allowed for allowed in TAIL_ALLOWED_DIRS):
+        raise PermissionError("Following files is only allowed in TAIL_ALLOWED_DIRS")
+    return real_path
+
+
+def start_tail(db: Session, path: str, filename: str | None = None) -> TailSession:
+    """Create an upload for a growing log file and start following it."""
+    upload = create_upload(db, filename or os.path.basename(path))
+    tail = TailSession(
+        path=path, upload_id=upload.id, status="running", byte_offset=0, entries_count=0,
+        lease_owner=_lease_owner(), lease_expires_at=datetime.utcnow() + timedelta(seconds=TAIL_LEASE_SECONDS)
+    )
+    db.add(tail)
+    db.commit()
+    db.refresh(tail)
+    _start_tailer(tail.id)
+    return tail
+
+
+def _start_tailer(tail_id: int) -> None:
+    with _tailers_lock:
+        if tail_id in _tailers:
+            return
+        tailer = LogTailer(tail_id)
+        _tailers[tail_id] = tailer
+    tailer.start()
+
+
+def stop_tail(db: Session, tail_id: int) -> TailSession | None:
+    """Stop following a file; the rows ingested so far stay in its upload."""
+    tail = db.get(TailSession, tail_id)
+    if tail is None:
+        return None
+    with _tailers_lock:
+        tailer = _tailers.get(tail_id)
+    if tailer is not None:
+        tailer.stop()
+        tailer.join()
+    elif tail.status == "running":
+        tail.status = "stopped"
+        db.commit()
+    db.refresh(tail)
+    return tail
+
+
+def get_tail(db: Session, tail_id: int) -> TailSession | None:
+    return db.get(TailSession, tail_id)
+
+
+def get_tail_backlog(db: Session, upload_id: int, after_id: int) -> list[dict]:
+    """Rows of a followed upload after after_id, for a client that reconnects."""
+    rows = (
+        db.query(*projected_columns(TAIL_EVENT_FIELDS))
+        .filter(TerraformLog.upload_id == upload_id, TerraformLog.id > after_id)
+        .order_by(TerraformLog.id)
+        .limit(TAIL_BACKLOG_LIMIT)
+        .all()
+    )
+    load_row_values(db, rows)
+    return project_records(rows, TAIL_EVENT_FIELDS)
+
+
+def resume_tails() -> None:
+    """
+    Restart the tailers that were running when the process stopped.
+
+    Every worker process calls this on startup; a session is only resumed by
+    the worker that claims it. Sessions whose lease expires later, because
+    their worker died, are taken over by a background check every
+    TAIL_LEASE_SECONDS.
+    """
+    global _lease_watcher
+    _resume_claimable_tails()
+    _lease_watcher_stop.clear()
+    _lease_watcher = threading.Thread(target=_watch_leases, name="tail-leases", daemon=True)
+    _lease_watcher.start()
+
+
+def _resume_claimable_tails() -> None:
+    db = SessionLocal()
+    try:
+        tail_ids = [
+            tail_id for tail_id, in db.query(TailSession.id).filter(
+                TailSession.status == "running",
+                or_(TailSession.lease_owner.is_(None), TailSession.lease_expires_at < datetime.utcnow())
+            )
+        ]
+        claimed = []
+        for tail_id in tail_ids:
+            if claim_tail(db, tail_id):
+                claimed.append(tail_id)
+            db.commit()
+    finally:
+        db.close()
+    for tail_id in claimed:
+        _start_tailer(tail_id)
+
+
+def _watch_leases() -> None:
+    while not _lease_watcher_stop.wait(TAIL_LEASE_SECONDS):
+        try:
+            _resume_claimable_tails()
+        except Exception:
+            logger.exception("Could not resume tail sessions")
+
+
+def shutdown_tails() -> None:
+    """Stop the tailer threads without marking their sessions stopped, so they resume on restart."""
+    _lease_watcher_stop.set()
+    if _lease_watcher is not None:
+        _lease_watcher.join()
+    with _tailers_lock:
+        tailers = list(_tailers.values())
+    for tailer in tailers:
+        tailer.resume_later = True
+        tailer.stop()
+    for tailer in tailers:
+        tailer.join()
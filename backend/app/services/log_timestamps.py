@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_us(value: datetime) -> int:
+    """Convert a datetime to microseconds since the epoch; naive values are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def parse_timestamp_us(value) -> int | None:
+    """
+    Parse a Terraform log timestamp into microseconds since the epoch (UTC).
+
+    Offsets such as +03:00 and Z are normalized, so values from different
+    files compare correctly. Returns None for missing or unparseable values.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return to_epoch_us(datetime.fromisoformat(value))
+    except ValueError:
+        return None
+
+
+def format_timestamp_us(value: int | None) -> str | None:
+    """Format epoch microseconds as an ISO 8601 UTC timestamp."""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value / 1_000_000, tz=timezone.utc).isoformat()
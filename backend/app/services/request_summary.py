@@ -0,0 +1,151 @@
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import RequestSummary
+
+
+def _earlier(new_us, new_value, old_us, old_value):
+    """Keep old_value unless new_us is known and precedes old_us."""
+    return new_value if new_us is not None and (old_us is None or new_us < old_us) else old_value
+
+
+def _later(new_us, new_value, old_us, old_value):
+    return new_value if new_us is not None and (old_us is None or new_us > old_us) else old_value
+
+
+def _longer(new_ms, old_ms):
+    return new_ms if old_ms is None or (new_ms is not None and new_ms > old_ms) else old_ms
+
+
+def _duration_ms(value) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestSummaryAccumulator:
+    """
+    Aggregates the terraform_logs rows of one upload per tf_req_id while they are inserted.
+
+    Memory is proportional to the number of requests seen since the last
+    flush; flush() merges them into request_summary in the current transaction.
+    """
+
+    def __init__(self, upload_id: int):
+        self.upload_id = upload_id
+        self.pending: dict[str, dict] = {}
+
+    def add(self, row: dict, duration_ms=None) -> None:
+        req_id = row.get('tf_req_id')
+        if not req_id:
+            return
+        timestamp_us = row.get('timestamp_us')
+        duration_ms = _duration_ms(duration_ms)
+
+        summary = self.pending.get(req_id)
+        if summary is None:
+            self.pending[req_id] = {
+                'upload_id': self.upload_id,
+                'tf_req_id': req_id,
+                'tf_rpc': row.get('tf_rpc'),
+                'tf_resource_type': row.get('tf_resource_type'),
+                'tf_provider_addr': row.get('tf_provider_addr'),
+                'start_us': timestamp_us,
+                'end_us': timestamp_us,
+                'start_timestamp': row.get('timestamp'),
+                'end_timestamp': row.get('timestamp'),
+                'log_count': 1,
+                'tf_req_duration_ms': duration_ms,
+            }
+            return
+
+        summary['log_count'] += 1
+        for key in ('tf_rpc', 'tf_resource_type', 'tf_provider_addr'):
+            if not summary[key] and row.get(key):
+                summary[key] = row[key]
+        summary['tf_req_duration_ms'] = _longer(duration_ms, summary['tf_req_duration_ms'])
+
+        start_us, end_us = summary['start_us'], summary['end_us']
+        summary['start_timestamp'] = _earlier(timestamp_us, row.get('timestamp'), start_us, summary['start_timestamp'])
+        summary['start_us'] = _earlier(timestamp_us, timestamp_us, start_us, start_us)
+        summary['end_timestamp'] = _later(timestamp_us, row.get('timestamp'), end_us, summary['end_timestamp'])
+        summary['end_us'] = _later(timestamp_us, timestamp_us, end_us, end_us)
+
+    def flush(self, db: Session) -> None:
+        if self.pending:
+            merge_request_summaries(db, list(self.pending.values()))
+            self.pending.clear()
+
+
+def merge_request_summaries(db: Session, summaries: list[dict]) -> None:
+    """Merge partial per-request aggregates into request_summary (upsert)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        insert = postgresql.insert
+    elif dialect == 'sqlite':
+        insert = sqlite.insert
+    else:
+        _merge_with_orm(db, summaries)
+        return
+
+    table = RequestSummary.__table__
+    statement = insert(table)
+    new, old = statement.excluded, table.c
+
+    def earlier(column):
+        return case(
+            (new.start_us.isnot(None) & (old.start_us.is_(None) | (new.start_us < old.start_us)), new[column]),
+            else_=old[column]
+        )
+
+    def later(column):
+        return case(
+            (new.end_us.isnot(None) & (old.end_us.is_(None) | (new.end_us > old.end_us)), new[column]),
+            else_=old[column]
+        )
+
+    statement = statement.on_conflict_do_update(
+        index_elements=[old.upload_id, old.tf_req_id],
+        set_={
+            'tf_rpc': func.coalesce(old.tf_rpc, new.tf_rpc),
+            'tf_resource_type': func.coalesce(old.tf_resource_type, new.tf_resource_type),
+            'tf_provider_addr': func.coalesce(old.tf_provider_addr, new.tf_provider_addr),
+            'start_us': earlier('start_us'),
+            'start_timestamp': earlier('start_timestamp'),
+            'end_us': later('end_us'),
+            'end_timestamp': later('end_timestamp'),
+            'log_count': old.log_count + new.log_count,
+            'tf_req_duration_ms': case(
+                (old.tf_req_duration_ms.is_(None) | (new.tf_req_duration_ms > old.tf_req_duration_ms),
+                 new.tf_req_duration_ms),
+                else_=old.tf_req_duration_ms
+            ),
+        }
+    )
+    # Sorted keys take row locks in a fixed order, so concurrent ingests can not deadlock
+    db.execute(statement, sorted(summaries, key=lambda summary: summary['tf_req_id']))
+
+
+def _merge_with_orm(db: Session, summaries: list[dict]) -> None:
+    for summary in summaries:
+        existing = db.get(RequestSummary, (summary['upload_id'], summary['tf_req_id']))
+        if existing is None:
+            db.add(RequestSummary(**summary))
+            continue
+        for key in ('tf_rpc', 'tf_resource_type', 'tf_provider_addr'):
+            if not getattr(existing, key):
+                setattr(existing, key, summary[key])
+        existing.start_timestamp = _earlier(
+            summary['start_us'], summary['start_timestamp'], existing.start_us, existing.start_timestamp
+        )
+        existing.start_us = _earlier(summary['start_us'], summary['start_us'], existing.start_us, existing.start_us)
+        existing.end_timestamp = _later(
+            summary['end_us'], summary['end_timestamp'], existing.end_us, existing.end_timestamp
+        )
+        existing.end_us = _later(summary['end_us'], summary['end_us'], existing.end_us, existing.end_us)
+        existing.log_count += summary['log_count']
+        existing.tf_req_duration_ms = _longer(summary['tf_req_duration_ms'], existing.tf_req_duration_ms)
+    db.flush()
+
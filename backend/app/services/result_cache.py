@@ -0,0 +1,164 @@
+"""
+Cache of encoded aggregate endpoint results.
+
+Entries are keyed by endpoint, parameters and a data generation that is
+incremented whenever logs are ingested or deleted, so they never have to be
+invalidated one by one: a new generation simply stops matching old keys.
+Generations start from a random epoch, so the keys, which double as ETags,
+of a restarted process or another worker never repeat old ones.
+
+Results live in an in-process LRU bounded by RESULT_CACHE_MAX_ENTRIES. With
+RESULT_CACHE_URL (redis://...) the generation and the entries are shared by
+all workers and processes, and the LRU is a first level in front of Redis.
+"""
+import hashlib
+import logging
+import os
+import secrets
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+RESULT_CACHE_URL = os.getenv("RESULT_CACHE_URL", "")
+# Lifetime of shared entries; old generations expire on their own
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "3600"))
+
+_GENERATION_KEY = "logviewer:generation"
+_ENTRY_PREFIX = "logviewer:result:"
+
+
+class LocalBackend:
+    """Generation counter of this process."""
+
+    def __init__(self):
+        self._epoch = secrets.token_hex(8)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def generation(self) -> str:
+        return f"{self._epoch}:{self._generation}"
+
+    def bump(self) -> None:
+        with self._lock:
+            self._generation += 1
+
+    def get(self, key: str) -> bytes | None:
+        return None
+
+    def set(self, key: str, value: bytes) -> None:
+        pass
+
+
+class RedisBackend:
+    """Generation counter and entries shared through Redis."""
+
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url)
+
+    def generation(self) -> str:
+        value = self.client.get(_GENERATION_KEY)
+        if value is None:
+            self._seed()
+            value = self.client.get(_GENERATION_KEY)
+        return value.decode()
+
+    def bump(self) -> None:
+        self._seed()
+        self.client.incr(_GENERATION_KEY)
+
+    def _seed(self) -> None:
+        # A lost counter restarts from a random value rather than from 0
+        self.client.set(_GENERATION_KEY, secrets.randbits(48), nx=True)
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(_ENTRY_PREFIX + key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(_ENTRY_PREFIX + key, value, ex=RESULT_CACHE_TTL)
+
+
+class ResultCache:
+    def __init__(self, max_entries: int, backend):
+        self.max_entries = max_entries
+        self.backend = backend
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def generation(self) -> str:
+        """Current data generation; changes whenever logs are ingested or deleted."""
+        return self.backend.generation()
+
+    def key(self, endpoint: str, params: dict) -> str:
+        """Cache key of an endpoint result in the current generation; also used as its ETag."""
+        parts = [endpoint, self.backend.generation()]
+        parts += [f"{name}={params[name]}" for name in sorted(params)]
+        return hashlib.blake2b('\n'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return value
+        value = self.backend.get(key)
+        if value is not None:
+            self._store(key, value)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._store(key, value)
+        self.backend.set(key, value)
+
+    def _store(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Start a new data generation and drop the local entries."""
+        self.backend.bump()
+        with self._lock:
+            self._entries.clear()
+
+
+def _create_backend():
+    if not RESULT_CACHE_URL:
+        return LocalBackend()
+    if redis is None:
+        logger.warning("RESULT_CACHE_URL is set but redis is not installed, using the in-process cache only")
+        return LocalBackend()
+    return RedisBackend(RESULT_CACHE_URL)
+
+
+result_cache = ResultCache(RESULT_CACHE_MAX_ENTRIES, _create_backend())
+
+
+def invalidate_results() -> None:
+    """Called after logs are ingested or deleted."""
+    try:
+        result_cache.invalidate()
+    except Exception:
+        # A stale cache must never fail an ingest or delete
+        logger.exception("Could not invalidate the result cache")
+
+
+def invalidate_results_on_commit(db: Session) -> None:
+    """
+    Invalidate once the current transaction of db commits.
+
+    Invalidating earlier would let a concurrent request cache the old data
+    under the new generation.
+    """
+    event.listen(db, 'after_commit', lambda session: invalidate_results(), once=True)
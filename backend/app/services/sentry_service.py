@@ -1,76 +1,379 @@
-import sentry_sdk
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import urllib3
+from sentry_sdk.envelope import Envelope
+from sentry_sdk.utils import Dsn
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.models import TerraformLog
+from app.database import SessionLocal
+from app.models import (
+    TerraformLog, Upload, SentryForwardJob, SentryHighWater, SentryFingerprint, LogDictionaryEntry
+)
+from app.services.log_dictionary import decode_values, load_row_values
+from app.services.log_rules import get_rule_engine
+from app.services.log_timestamps import format_timestamp_us
 
+logger = logging.getLogger(__name__)
 
-def send_error_logs_to_sentry(db: Session, dsn: str) -> dict:
-    """
-    Send all ERROR level logs to Sentry.
-    
-    Args:
-        db: Database session
-        dsn: Sentry DSN (Data Source Name)
+# Events waiting to be sent; producers block while the queue is full
+SENTRY_QUEUE_SIZE = int(os.getenv("SENTRY_QUEUE_SIZE", "500"))
+# Threads sending events in parallel over a shared connection pool
+SENTRY_SENDERS = int(os.getenv("SENTRY_SENDERS", "4"))
+# Events per second over all senders
+SENTRY_RATE_LIMIT = float(os.getenv("SENTRY_RATE_LIMIT", "50"))
+SENTRY_MAX_RETRIES = int(os.getenv("SENTRY_MAX_RETRIES", "5"))
+SENTRY_TIMEOUT = float(os.getenv("SENTRY_TIMEOUT", "10"))
+# ERROR logs read from the database between two high-water mark updates
+SENTRY_FETCH_BATCH = int(os.getenv("SENTRY_FETCH_BATCH", "1000"))
+
+CLIENT_NAME = "terraform-logviewer/1.0"
+# Responses that will not change on retry
+_PERMANENT_FAILURES = {400, 401, 403, 413}
+
+_executor: ThreadPoolExecutor | None = None
+
+
+class RateLimiter:
+    """Token bucket shared by the sender threads; pause() honours Retry-After."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self.paused_until:
+                    self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    wait = self.paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class SentryForwarder:
     """
-    # Initialize Sentry with provided DSN
-    sentry_sdk.init(
-        dsn=dsn,
-        traces_sample_rate=0.0,
-    )
+    Bounded queue of Sentry events drained by sender threads.
 
-    # Query all ERROR level logs
-    error_logs = db.query(TerraformLog).filter(
-        TerraformLog.log_level.ilike('error')
-    ).all()
+    Events are posted as envelopes straight to the DSN's envelope endpoint,
+    so delivery can be confirmed per event: failed requests are retried
+    with exponential backoff, 429 responses pause all senders, and only
+    events that could not be delivered at all are counted as failed.
+    """
 
-    if not error_logs:
-        return {
-            "status": "success",
-            "message": "No ERROR logs found",
-            "count": 0
+    def __init__(
+            self,
+            dsn: str,
+            senders: int = SENTRY_SENDERS,
+            queue_size: int = SENTRY_QUEUE_SIZE,
+            rate_limit: float = SENTRY_RATE_LIMIT,
+            max_retries: int = SENTRY_MAX_RETRIES
+    ):
+        self.dsn = Dsn(dsn)
+        auth = self.dsn.to_auth(CLIENT_NAME)
+        self.url = auth.get_api_url()
+        self.headers = {
+            'Content-Type': 'application/x-sentry-envelope',
+            'X-Sentry-Auth': auth.to_header(),
         }
+        self.max_retries = max_retries
+        self.limiter = RateLimiter(rate_limit)
+        self.http = urllib3.PoolManager(maxsize=senders)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.sent = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"sentry-sender-{i}", daemon=True)
+            for i in range(senders)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, event: dict) -> None:
+        self.queue.put(event)
 
-    sent_count = 0
-    for log in error_logs:
-        try:
-            # Capture each error log as a message with context
-            with sentry_sdk.push_scope() as scope:
-                # Add log metadata as context
-                scope.set_context("log_info", {
-                    "filename": log.filename,
-                    "timestamp": str(log.timestamp) if log.timestamp else None,
-                    "tf_req_id": log.tf_req_id,
-                    "tf_resource_type": log.tf_resource_type,
-                    "tf_rpc": log.tf_rpc,
-                    "caller": log.caller,
-                    "module": log.module,
-                })
-
-                # Add tags for easier filtering in Sentry
-                if log.tf_resource_type:
-                    scope.set_tag("resource_type", log.tf_resource_type)
-                if log.tf_rpc:
-                    scope.set_tag("rpc", log.tf_rpc)
-                if log.tf_req_id:
-                    scope.set_tag("request_id", log.tf_req_id)
-
-                scope.set_tag("log_level", "ERROR")
-                scope.set_tag("filename", log.filename)
-
-                # Send the message to Sentry
-                sentry_sdk.capture_message(
-                    log.message or "No message",
-                    level="error"
+    def drain(self) -> None:
+        """Wait until every submitted event is delivered or has failed."""
+        self.queue.join()
+
+    def close(self) -> None:
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self.http.clear()
+
+    def _run(self) -> None:
+        while True:
+            event = self.queue.get()
+            try:
+                if event is None:
+                    return
+                delivered = self._send(event)
+                with self._lock:
+                    if delivered:
+                        self.sent += 1
+                    else:
+                        self.failed += 1
+            finally:
+                self.queue.task_done()
+
+    def _send(self, event: dict) -> bool:
+        envelope = Envelope(headers={
+            'event_id': event['event_id'],
+            'dsn': str(self.dsn),
+            'sent_at': datetime.now(timezone.utc).isoformat(),
+        })
+        envelope.add_event(event)
+        body = envelope.serialize()
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self.http.request(
+                    'POST', self.url, body=body, headers=self.headers,
+                    timeout=SENTRY_TIMEOUT, retries=False
                 )
-                sent_count += 1
-        except Exception as e:
-            print(f"Failed to send log {log.id} to Sentry: {e}")
+            except urllib3.exceptions.HTTPError as e:
+                logger.warning("Sending event %s to Sentry failed: %s", event['event_id'], e)
+                response = None
+
+            if response is not None:
+                if 200 <= response.status < 300:
+                    return True
+                if response.status in _PERMANENT_FAILURES:
+                    logger.warning("Sentry rejected event %s with status %s", event['event_id'], response.status)
+                    return False
+
+            delay = min(0.5 * 2 ** attempt, 30.0)
+            if response is not None and response.status == 429:
+                delay = _retry_after(response, delay)
+                self.limiter.pause(delay)
+            if attempt < self.max_retries:
+                time.sleep(delay)
+        return False
+
+
+def _retry_after(response, default: float) -> float:
+    try:
+        return float(response.headers.get('Retry-After', default))
+    except ValueError:
+        return default
+
+
+def error_fingerprint(log) -> str:
+    """Identical messages of the same request and resource type are reported once."""
+    key = '\x1f'.join((log.tf_resource_type or '', log.tf_req_id or '', log.message or ''))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _forwarded_fingerprints(db: Session, fingerprints: list[str]) -> set[str]:
+    """Those of the fingerprints that were already delivered to Sentry."""
+    return set(db.scalars(
+        select(SentryFingerprint.fingerprint).where(SentryFingerprint.fingerprint.in_(set(fingerprints)))
+    ))
+
 
-    sentry_sdk.flush(timeout=10)
+def log_to_event(log, fingerprint: str) -> dict:
+    """Build the Sentry event of an ERROR log row."""
+    tags = {'log_level': 'ERROR', 'filename': log.filename}
+    if log.tf_resource_type:
+        tags['resource_type'] = log.tf_resource_type
+    if log.tf_rpc:
+        tags['rpc'] = log.tf_rpc
+    if log.tf_req_id:
+        tags['request_id'] = log.tf_req_id
+    for key, value in get_rule_engine().classify(log.message).tags.items():
+        tags.setdefault(key, value)
 
     return {
-        "status": "success",
-        "message": f"Sent {sent_count} ERROR logs to Sentry",
-        "count": sent_count,
-        "total_errors": len(error_logs)
+        'event_id': uuid.uuid4().hex,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'level': 'error',
+        'platform': 'other',
+        'logger': 'terraform',
+        'message': {'formatted': log.message or "No message"},
+        'fingerprint': [fingerprint],
+        'tags': tags,
+        'contexts': {
+            'log_info': {
+                'upload_id': log.upload_id,
+                'log_id': log.id,
+                'filename': log.filename,
+                'timestamp': log.timestamp or format_timestamp_us(log.timestamp_us),
+                'tf_req_id': log.tf_req_id,
+                'tf_resource_type': log.tf_resource_type,
+                'tf_rpc': log.tf_rpc,
+                'caller': log.caller,
+                'module': log.module,
+            }
+        },
     }
+
+
+def get_sentry_executor() -> ThreadPoolExecutor:
+    """
+    Return the executor of forwarding jobs, creating it on first use.
+
+    It has a single worker, so jobs never read the same high-water mark concurrently.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sentry")
+    return _executor
+
+
+def shutdown_sentry_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def submit_sentry_job(db: Session, dsn: str, upload_id: int | None = None) -> SentryForwardJob:
+    """Queue forwarding of the ERROR logs that were not sent to Sentry yet."""
+    job = SentryForwardJob(upload_id=upload_id, status="queued")
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    get_sentry_executor().submit(run_sentry_job, job.id, dsn)
+    return job
+
+
+def get_sentry_job(db: Session, job_id: int) -> SentryForwardJob | None:
+    return db.get(SentryForwardJob, job_id)
+
+
+def run_sentry_job(job_id: int, dsn: str) -> None:
+    """Worker entry point: forward new ERROR logs upload by upload, advancing the high-water marks."""
+    db = SessionLocal()
+    forwarder = None
+    try:
+        job = db.get(SentryForwardJob, job_id)
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        forwarder = SentryForwarder(dsn)
+        if job.upload_id is not None:
+            upload_ids = [job.upload_id]
+        else:
+            upload_ids = [upload_id for upload_id, in db.query(Upload.id).order_by(Upload.id)]
+
+        for upload_id in upload_ids:
+            if not _forward_upload(db, job, forwarder, upload_id):
+                break
+
+        job.sent_count = forwarder.sent
+        if forwarder.failed:
+            job.status = "failed"
+            job.error = f"{forwarder.failed} events could not be delivered to Sentry"
+        else:
+            job.status = "completed"
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        logger.exception("Sentry job %s failed", job_id)
+        db.rollback()
+        db.query(SentryForwardJob).filter(SentryForwardJob.id == job_id).update({
+            SentryForwardJob.status: "failed",
+            SentryForwardJob.error: str(e),
+            SentryForwardJob.finished_at: datetime.utcnow()
+        })
+        db.commit()
+    finally:
+        if forwarder is not None:
+            forwarder.close()
+        db.close()
+
+
+def _forward_upload(db: Session, job: SentryForwardJob, forwarder: SentryForwarder, upload_id: int) -> bool:
+    """
+    Forward the new ERROR logs of one upload in batches.
+
+    Ids grow in insertion order within an upload, so the id of the last
+    delivered log is a high-water mark. It is only advanced once a whole
+    batch is delivered; returns False if delivery failed.
+
+    Fingerprints of delivered errors are stored in sentry_fingerprints in the
+    same commit as the mark, so an error already reported by an earlier job
+    or for another upload is counted as a duplicate instead of sent again.
+    """
+    high_water = db.get(SentryHighWater, upload_id)
+    if high_water is None:
+        high_water = SentryHighWater(upload_id=upload_id, last_log_id=0)
+        db.add(high_water)
+
+    # Every spelling of the ERROR level, compared by id
+    error_levels = select(LogDictionaryEntry.id).where(
+        LogDictionaryEntry.field == 'log_level', LogDictionaryEntry.value.ilike('error')
+    )
+    while True:
+        rows = (
+            db.query(
+                TerraformLog.id, TerraformLog.upload_id, TerraformLog.filename_id.label('filename'),
+                TerraformLog.timestamp, TerraformLog.timestamp_us, TerraformLog.message,
+                TerraformLog.caller_id.label('caller'), TerraformLog.module_id.label('module'),
+                TerraformLog.tf_req_id, TerraformLog.tf_resource_type_id.label('tf_resource_type'),
+                TerraformLog.tf_rpc_id.label('tf_rpc')
+            )
+            .filter(
+                TerraformLog.upload_id == upload_id,
+                TerraformLog.id > high_water.last_log_id,
+                TerraformLog.log_level_id.in_(error_levels)
+            )
+            .order_by(TerraformLog.id)
+            .limit(SENTRY_FETCH_BATCH)
+            .all()
+        )
+        load_row_values(db, rows)
+        logs = [SimpleNamespace(**decode_values(row._mapping)) for row in rows]
+        if not logs:
+            return True
+
+        fingerprints = [error_fingerprint(log) for log in logs]
+        seen = _forwarded_fingerprints(db, fingerprints)
+        delivered = []
+        for log, fingerprint in zip(logs, fingerprints):
+            if fingerprint in seen:
+                job.duplicate_count += 1
+                continue
+            seen.add(fingerprint)
+            delivered.append({'fingerprint': fingerprint, 'upload_id': log.upload_id, 'log_id': log.id})
+            forwarder.submit(log_to_event(log, fingerprint))
+        forwarder.drain()
+
+        job.errors_read += len(logs)
+        job.sent_count = forwarder.sent
+        job.failed_count = forwarder.failed
+        if forwarder.failed:
+            db.commit()
+            return False
+        if delivered:
+            db.execute(SentryFingerprint.__table__.insert(), delivered)
+        high_water.last_log_id = logs[-1].id
+        db.commit()
@@ -0,0 +1,122 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models import (
+    TerraformLog,
+    Upload,
+    RequestSummary,
+    LogSectionRecord,
+    IngestJob,
+    SentryHighWater,
+    LogPayload,
+    LogStat,
+    RpcDurationStat
+)
+from app.services.result_cache import invalidate_results
+
+logger = logging.getLogger(__name__)
+
+
+# Tables with one partition per upload on PostgreSQL
+PARTITIONED_TABLES = (TerraformLog.__tablename__, LogPayload.__tablename__)
+
+
+def is_partitioned(db: Session) -> bool:
+    """terraform_logs and log_payloads are partitioned by upload_id on PostgreSQL only."""
+    return db.get_bind().dialect.name == 'postgresql'
+
+
+def partition_name(upload_id: int, table: str = TerraformLog.__tablename__) -> str:
+    return f"{table}_u{int(upload_id)}"
+
+
+def create_upload(db: Session, filename: str) -> Upload:
+    """
+    Register a new upload and, on PostgreSQL, create its terraform_logs and log_payloads partitions.
+
+    A partition is created as a plain table and then attached, which only
+    takes a SHARE UPDATE EXCLUSIVE lock on the partitioned table, so running
+    ingests and queries are not blocked.
+    """
+    upload = Upload(filename=filename, uploaded_at=datetime.utcnow(), log_count=0)
+    db.add(upload)
+    db.flush()
+
+    if is_partitioned(db):
+        for table in PARTITIONED_TABLES:
+            name = partition_name(upload.id, table)
+            db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+            db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES IN ({upload.id})"))
+    db.commit()
+    db.refresh(upload)
+    return upload
+
+
+def list_uploads(db: Session) -> list[Upload]:
+    return db.query(Upload).order_by(Upload.id).all()
+
+
+def delete_upload(db: Session, upload_id: int) -> int | None:
+    """
+    Delete an upload with its logs and derived data.
+
+    On PostgreSQL its partitions are dropped, which takes constant time
+    regardless of the number of rows. Returns the number of deleted logs,
+    or None if there is no such upload.
+    """
+    upload = db.get(Upload, upload_id)
+    if upload is None:
+        return None
+    count = upload.log_count or 0
+
+    _delete_upload_rows(db, [upload_id])
+    db.delete(upload)
+    db.commit()
+    invalidate_results()
+    return count
+
+
+def delete_all_uploads(db: Session) -> int:
+    """Delete every upload; returns the number of deleted logs."""
+    uploads = db.query(Upload.id, Upload.log_count).all()
+    count = sum(log_count or 0 for _, log_count in uploads)
+
+    _delete_upload_rows(db, [upload_id for upload_id, _ in uploads])
+    if not is_partitioned(db):
+        # Rows that do not belong to any upload
+        db.query(TerraformLog).delete(synchronize_session=False)
+    db.query(Upload).delete(synchronize_session=False)
+    db.commit()
+    invalidate_results()
+    return count
+
+
+def _delete_upload_rows(db: Session, upload_ids: list[int]) -> None:
+    if not upload_ids:
+        return
+    if is_partitioned(db):
+        for upload_id in upload_ids:
+            for table in PARTITIONED_TABLES:
+                db.execute(text(f"DROP TABLE IF EXISTS {partition_name(upload_id, table)}"))
+    else:
+        db.query(TerraformLog).filter(TerraformLog.upload_id.in_(upload_ids)).delete(synchronize_session=False)
+        db.query(LogPayload).filter(LogPayload.upload_id.in_(upload_ids)).delete(synchronize_session=False)
+
+    db.query(RequestSummary).filter(RequestSummary.upload_id.in_(upload_ids)).delete(synchronize_session=False)
+    db.query(LogSectionRecord).filter(LogSectionRecord.upload_id.in_(upload_ids)).delete(synchronize_session=False)
+    db.query(SentryHighWater).filter(SentryHighWater.upload_id.in_(upload_ids)).delete(synchronize_session=False)
+    db.query(LogStat).filter(LogStat.upload_id.in_(upload_ids)).delete(synchronize_session=False)
+    db.query(RpcDurationStat).filter(RpcDurationStat.upload_id.in_(upload_ids)).delete(synchronize_session=False)
+
+
+def finish_upload(db: Session, upload_id: int, log_count: int) -> None:
+    db.query(Upload).filter(Upload.id == upload_id).update({Upload.log_count: log_count})
+
+
+def replace_upload(db: Session, job: IngestJob) -> None:
+    """Delete the upload a completed job replaces, if any."""
+    if job.replaces_upload_id is not None and job.replaces_upload_id != job.upload_id:
+        delete_upload(db, job.replaces_upload_id)
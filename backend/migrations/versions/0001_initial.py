@@ -0,0 +1,45 @@
+"""Initial schema: terraform_logs as created by Base.metadata.create_all.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'terraform_logs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+        sa.Column('log_level', sa.String(), nullable=True),
+        sa.Column('timestamp', sa.String(), nullable=True),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('caller', sa.String(), nullable=True),
+        sa.Column('module', sa.String(), nullable=True),
+        sa.Column('tf_provider_addr', sa.String(), nullable=True),
+        sa.Column('tf_req_id', sa.String(), nullable=True),
+        sa.Column('tf_resource_type', sa.String(), nullable=True),
+        sa.Column('tf_rpc', sa.String(), nullable=True),
+        sa.Column('raw_data', sa.JSON(), nullable=True),
+    )
+    op.create_index('ix_terraform_logs_id', 'terraform_logs', ['id'])
+    op.create_index('ix_terraform_logs_filename', 'terraform_logs', ['filename'])
+    op.create_index('ix_terraform_logs_log_level', 'terraform_logs', ['log_level'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('terraform_logs')
@@ -0,0 +1,95 @@
+"""Add normalized timestamp_us column and ingest_jobs table.
+
+Databases created by Base.metadata.create_all before revision 0001 existed
+are stamped 0001 by run_migrations. Depending on the version that created
+them they already have timestamp_us and ingest_jobs, possibly with rows
+whose timestamp_us was never set, so every step is skipped when it is done
+already, and all rows without timestamp_us are backfilled.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 12:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows backfilled per statement on databases other than PostgreSQL
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _backfill_timestamp_us() -> None:
+    """Set timestamp_us of rows stored before ingest did."""
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            """
+            UPDATE terraform_logs
+            SET timestamp_us = round(extract(epoch FROM "timestamp"::timestamptz) * 1000000)::bigint
+            WHERE timestamp_us IS NULL AND "timestamp" ~ '^\\d{4}-\\d{2}-\\d{2}T\\d{2}:\\d{2}:\\d{2}'
+            """
+        )
+        return
+
+    from app.services.log_timestamps import parse_timestamp_us
+
+    rows = bind.execute(sa.text(
+        'SELECT id, "timestamp" FROM terraform_logs WHERE timestamp_us IS NULL AND "timestamp" IS NOT NULL'
+    )).all()
+    values = [
+        {'id': row_id, 'timestamp_us': timestamp_us}
+        for row_id, timestamp in rows
+        if (timestamp_us := parse_timestamp_us(timestamp)) is not None
+    ]
+    update = sa.text("UPDATE terraform_logs SET timestamp_us = :timestamp_us WHERE id = :id")
+    for start in range(0, len(values), BACKFILL_BATCH_SIZE):
+        bind.execute(update, values[start:start + BACKFILL_BATCH_SIZE])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('terraform_logs')}
+    indexes = {index['name'] for index in inspector.get_indexes('terraform_logs')}
+
+    if 'timestamp_us' not in columns:
+        op.add_column('terraform_logs', sa.Column('timestamp_us', sa.BigInteger(), nullable=True))
+    _backfill_timestamp_us()
+    if 'ix_terraform_logs_timestamp_us' not in indexes:
+        op.create_index('ix_terraform_logs_timestamp_us', 'terraform_logs', ['timestamp_us'])
+
+    if 'ingest_jobs' in inspector.get_table_names():
+        return
+    op.create_table(
+        'ingest_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('total_bytes', sa.BigInteger(), nullable=True),
+        sa.Column('bytes_read', sa.BigInteger(), nullable=True),
+        sa.Column('entries_parsed', sa.Integer(), nullable=True),
+        sa.Column('fixed_logs_count', sa.Integer(), nullable=True),
+        sa.Column('rows_inserted', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+    )
+    op.create_index('ix_ingest_jobs_id', 'ingest_jobs', ['id'])
+    op.create_index('ix_ingest_jobs_status', 'ingest_jobs', ['status'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ingest_jobs')
+    op.drop_index('ix_terraform_logs_timestamp_us', table_name='terraform_logs')
+    op.drop_column('terraform_logs', 'timestamp_us')
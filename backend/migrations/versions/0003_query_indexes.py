@@ -0,0 +1,60 @@
+"""Composite and partial indexes for the hot query shapes of the API.
+
+- (tf_req_id, timestamp_us, id): /logs grouped by request, /logs/by-request/{id}, /request-ids
+- (timestamp_us, id) WHERE tf_req_id IS NULL: /logs/by-request/no-request-id and its count
+- (tf_rpc, timestamp_us), (tf_resource_type, timestamp_us): /logs filters
+- (log_level, uploaded_at): /logs?level=..., replaces the single-column log_level index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 12:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_terraform_logs_req_id_timestamp', 'terraform_logs',
+        ['tf_req_id', 'timestamp_us', 'id']
+    )
+    op.create_index(
+        'ix_terraform_logs_no_req_id_timestamp', 'terraform_logs',
+        ['timestamp_us', 'id'],
+        postgresql_where=sa.text('tf_req_id IS NULL'),
+        sqlite_where=sa.text('tf_req_id IS NULL')
+    )
+    op.create_index(
+        'ix_terraform_logs_rpc_timestamp', 'terraform_logs',
+        ['tf_rpc', 'timestamp_us'],
+        postgresql_where=sa.text('tf_rpc IS NOT NULL'),
+        sqlite_where=sa.text('tf_rpc IS NOT NULL')
+    )
+    op.create_index(
+        'ix_terraform_logs_resource_type_timestamp', 'terraform_logs',
+        ['tf_resource_type', 'timestamp_us'],
+        postgresql_where=sa.text('tf_resource_type IS NOT NULL'),
+        sqlite_where=sa.text('tf_resource_type IS NOT NULL')
+    )
+    op.create_index('ix_terraform_logs_level_uploaded_at', 'terraform_logs', ['log_level', 'uploaded_at'])
+    op.drop_index('ix_terraform_logs_log_level', table_name='terraform_logs')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_terraform_logs_log_level', 'terraform_logs', ['log_level'])
+    op.drop_index('ix_terraform_logs_level_uploaded_at', table_name='terraform_logs')
+    op.drop_index('ix_terraform_logs_resource_type_timestamp', table_name='terraform_logs')
+    op.drop_index('ix_terraform_logs_rpc_timestamp', table_name='terraform_logs')
+    op.drop_index('ix_terraform_logs_no_req_id_timestamp', table_name='terraform_logs')
+    op.drop_index('ix_terraform_logs_req_id_timestamp', table_name='terraform_logs')
@@ -0,0 +1,31 @@
+"""Index for keyset pagination of /logs with a level filter.
+
+/logs?level=... is now paginated like every other filter, ordered by
+(timestamp_us, id) or (tf_req_id, timestamp_us, id) instead of uploaded_at.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 12:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_terraform_logs_level_timestamp', 'terraform_logs', ['log_level', 'timestamp_us', 'id'])
+    op.drop_index('ix_terraform_logs_level_uploaded_at', table_name='terraform_logs')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_terraform_logs_level_uploaded_at', 'terraform_logs', ['log_level', 'uploaded_at'])
+    op.drop_index('ix_terraform_logs_level_timestamp', table_name='terraform_logs')
@@ -0,0 +1,60 @@
+"""Text search indexes on terraform_logs.message (PostgreSQL only).
+
+The trigram index serves substring, regex and message_contains (LIKE) queries,
+the tsvector index serves phrase and prefix search. Other databases use the
+in-process index of app/services/log_search.py instead.
+
+The trigram index is skipped when the server does not ship the pg_trgm
+extension (contrib); substring search still works, without an index.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 12:40:00
+
+"""
+from typing import Sequence, Union
+
+import logging
+
+from alembic import op
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match TSVECTOR_MAX_CHARS in app/services/log_search.py
+TSVECTOR_MAX_CHARS = 65536
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    available = op.get_bind().execute(
+        text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if available:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX ix_terraform_logs_message_trgm ON terraform_logs "
+            "USING gin (message gin_trgm_ops)"
+        )
+    else:
+        logger.warning("pg_trgm is not available, substring search on message is not indexed")
+    op.execute(
+        "CREATE INDEX ix_terraform_logs_message_tsv ON terraform_logs "
+        f"USING gin (to_tsvector('simple', left(message, {TSVECTOR_MAX_CHARS})))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_terraform_logs_message_tsv")
+    op.execute("DROP INDEX IF EXISTS ix_terraform_logs_message_trgm")
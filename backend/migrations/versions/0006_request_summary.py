@@ -0,0 +1,82 @@
+"""Add request_summary table with per-request aggregates for /gantt.
+
+Existing logs are aggregated once here; afterwards the table is maintained
+by ingest (app/services/request_summary.py).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16 12:50:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'request_summary',
+        sa.Column('tf_req_id', sa.String(), primary_key=True),
+        sa.Column('tf_rpc', sa.String(), nullable=True),
+        sa.Column('tf_resource_type', sa.String(), nullable=True),
+        sa.Column('tf_provider_addr', sa.String(), nullable=True),
+        sa.Column('start_us', sa.BigInteger(), nullable=True),
+        sa.Column('end_us', sa.BigInteger(), nullable=True),
+        sa.Column('start_timestamp', sa.String(), nullable=True),
+        sa.Column('end_timestamp', sa.String(), nullable=True),
+        sa.Column('log_count', sa.Integer(), nullable=True),
+        sa.Column('tf_req_duration_ms', sa.BigInteger(), nullable=True),
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        duration = "max((raw_data->>'tf_req_duration_ms')::numeric)::bigint"
+    else:
+        duration = "max(CAST(json_extract(raw_data, '$.tf_req_duration_ms') AS INTEGER))"
+    # Like ingest, take the first non-empty rpc, resource type and provider in timestamp
+    # order; these and the bounds strings are looked up through ix_terraform_logs_req_id_timestamp
+    def first(column: str) -> str:
+        return (
+            f"(SELECT l.{column} FROM terraform_logs l WHERE l.tf_req_id = s.tf_req_id "
+            f"AND l.{column} IS NOT NULL ORDER BY l.timestamp_us, l.id LIMIT 1)"
+        )
+
+    op.execute(
+        f"""
+        INSERT INTO request_summary (
+            tf_req_id, tf_rpc, tf_resource_type, tf_provider_addr,
+            start_us, end_us, start_timestamp, end_timestamp, log_count, tf_req_duration_ms
+        )
+        SELECT
+            s.tf_req_id, {first('tf_rpc')}, {first('tf_resource_type')}, {first('tf_provider_addr')},
+            s.start_us, s.end_us,
+            (SELECT l."timestamp" FROM terraform_logs l
+             WHERE l.tf_req_id = s.tf_req_id AND l.timestamp_us = s.start_us LIMIT 1),
+            (SELECT l."timestamp" FROM terraform_logs l
+             WHERE l.tf_req_id = s.tf_req_id AND l.timestamp_us = s.end_us LIMIT 1),
+            s.log_count, s.tf_req_duration_ms
+        FROM (
+            SELECT
+                tf_req_id,
+                min(timestamp_us) AS start_us,
+                max(timestamp_us) AS end_us,
+                count(*) AS log_count,
+                {duration} AS tf_req_duration_ms
+            FROM terraform_logs
+            WHERE tf_req_id IS NOT NULL
+            GROUP BY tf_req_id
+        ) s
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('request_summary')
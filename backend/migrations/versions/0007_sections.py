@@ -0,0 +1,160 @@
+"""Add sections table with sections detected during ingest.
+
+Sections of logs stored before this revision are detected here once, with
+a copy of the detection rules of this revision. Rows were stored with a
+per-row uploaded_at, so a stored log is a run of consecutive rows with the
+same filename, see _starts_upload.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16 13:00:00
+
+"""
+from datetime import timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Consecutive rows of one file further apart than this belong to separate uploads;
+# must match UPLOAD_GAP in 0008_uploads_and_partitions.py
+UPLOAD_GAP = timedelta(seconds=60)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    sections = op.create_table(
+        'sections',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.Column('start_index', sa.Integer(), nullable=True),
+        sa.Column('end_index', sa.Integer(), nullable=True),
+        sa.Column('start_id', sa.Integer(), nullable=True),
+        sa.Column('end_id', sa.Integer(), nullable=True),
+        sa.Column('log_count', sa.Integer(), nullable=True),
+        sa.Column('start_timestamp', sa.String(), nullable=True),
+        sa.Column('end_timestamp', sa.String(), nullable=True),
+    )
+    op.create_index('ix_sections_id', 'sections', ['id'])
+    op.create_index('ix_sections_upload', 'sections', ['uploaded_at', 'filename'])
+    _detect_existing_sections(sections)
+
+
+def _section_start(message: str) -> str | None:
+    if 'backend/local: starting Plan operation' in message:
+        return 'plan'
+    elif 'backend/local: starting Apply operation' in message:
+        return 'apply'
+    elif 'Initializing the backend' in message or 'Initializing provider plugins' in message:
+        return 'init'
+    return None
+
+
+def _section_end(log_type: str, message: str) -> str | None:
+    if log_type == 'change_summary' or 'Plan:' in message:
+        return 'plan'
+    elif log_type == 'apply_complete' or 'Apply complete!' in message:
+        return 'apply'
+    elif 'Terraform has been successfully initialized' in message:
+        return 'init'
+    return None
+
+
+class _SectionDetector:
+    """SectionDetector of this revision over the rows of one stored log, in id order."""
+
+    def __init__(self, filename: str | None, uploaded_at):
+        self.upload = {'filename': filename, 'uploaded_at': uploaded_at}
+        self.sections: list[dict] = []
+        self.current: dict | None = None
+        self.index = 0
+        self.previous_id: int | None = None
+
+    def feed(self, row) -> None:
+        message = row.message or ''
+        raw_data = row.raw_data if isinstance(row.raw_data, dict) else {}
+        start, end = _section_start(message), _section_end(raw_data.get('type', ''), message)
+
+        if start:
+            if self.current:
+                self._close(self.index - 1, self.previous_id)
+            self.current = {
+                **self.upload, 'type': start, 'start_index': self.index, 'start_id': row.id,
+                'log_count': 0, 'start_timestamp': row.timestamp,
+            }
+            self._append(row)
+        elif end and self.current:
+            if self.current['type'] == end:
+                self._append(row)
+                self._close(self.index, row.id)
+        elif self.current:
+            self._append(row)
+
+        self.index += 1
+        self.previous_id = row.id
+
+    def finish(self) -> list[dict]:
+        if self.current:
+            self._close(self.index - 1, self.previous_id)
+        return self.sections
+
+    def _append(self, row) -> None:
+        self.current['log_count'] += 1
+        self.current['end_timestamp'] = row.timestamp
+
+    def _close(self, end_index: int, end_id: int | None) -> None:
+        self.current.update(end_index=end_index, end_id=end_id)
+        self.sections.append(self.current)
+        self.current = None
+
+
+def _starts_upload(row, previous) -> bool:
+    """Whether row, the next one by id after previous, belongs to another stored log."""
+    if row.filename != previous.filename:
+        return True
+    return (
+        row.uploaded_at is not None and previous.uploaded_at is not None
+        and row.uploaded_at - previous.uploaded_at > UPLOAD_GAP
+    )
+
+
+def _detect_existing_sections(sections: sa.Table) -> None:
+    logs = sa.table(
+        'terraform_logs',
+        sa.column('id', sa.Integer),
+        sa.column('filename', sa.String),
+        sa.column('uploaded_at', sa.DateTime),
+        sa.column('timestamp', sa.String),
+        sa.column('message', sa.Text),
+        sa.column('raw_data', sa.JSON),
+    )
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(logs).order_by(logs.c.id).execution_options(yield_per=5000))
+
+    # Sections are only inserted after the scan, the rows cursor stays open meanwhile
+    found = []
+    detector, previous = None, None
+    for row in rows:
+        if previous is None or _starts_upload(row, previous):
+            if detector:
+                found.extend(detector.finish())
+            detector = _SectionDetector(row.filename, row.uploaded_at)
+        detector.feed(row)
+        previous = row
+    if detector:
+        found.extend(detector.finish())
+    if found:
+        connection.execute(sections.insert(), found)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sections')
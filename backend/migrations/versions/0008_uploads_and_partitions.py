@@ -0,0 +1,302 @@
+"""Add uploads and scope logs, sections and request summaries by upload_id.
+
+On PostgreSQL terraform_logs becomes a table partitioned by LIST (upload_id)
+with one partition per upload, so deleting an upload is a partition drop.
+Existing rows are assigned to uploads and copied into the new table once.
+Other databases get an upload_id column with an index.
+
+Rows used to be stored with a per-row uploaded_at, so an existing upload is
+a run of consecutive rows with the same filename, as in migration 0007.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16 13:10:00
+
+"""
+from datetime import timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOG_COLUMNS = (
+    'id', 'filename', 'uploaded_at', 'log_level', 'timestamp', 'timestamp_us', 'message', 'caller',
+    'module', 'tf_provider_addr', 'tf_req_id', 'tf_resource_type', 'tf_rpc', 'raw_data',
+)
+# Must match TSVECTOR_MAX_CHARS in app/services/log_search.py
+TSVECTOR_MAX_CHARS = 65536
+# Must match UPLOAD_GAP in 0007_sections.py
+UPLOAD_GAP = timedelta(seconds=60)
+
+
+def _log_columns() -> list:
+    return [
+        sa.Column('id', sa.Integer(), nullable=False,
+                  server_default=sa.text("nextval('terraform_logs_id_seq'::regclass)")),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+        sa.Column('log_level', sa.String(), nullable=True),
+        sa.Column('timestamp', sa.String(), nullable=True),
+        sa.Column('timestamp_us', sa.BigInteger(), nullable=True),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('caller', sa.String(), nullable=True),
+        sa.Column('module', sa.String(), nullable=True),
+        sa.Column('tf_provider_addr', sa.String(), nullable=True),
+        sa.Column('tf_req_id', sa.String(), nullable=True),
+        sa.Column('tf_resource_type', sa.String(), nullable=True),
+        sa.Column('tf_rpc', sa.String(), nullable=True),
+        sa.Column('raw_data', sa.JSON(), nullable=True),
+    ]
+
+
+def _create_log_indexes(with_id_index: bool) -> None:
+    """Indexes of terraform_logs as of revisions 0002-0005."""
+    if with_id_index:
+        op.create_index('ix_terraform_logs_id', 'terraform_logs', ['id'])
+    op.create_index('ix_terraform_logs_filename', 'terraform_logs', ['filename'])
+    op.create_index('ix_terraform_logs_timestamp_us', 'terraform_logs', ['timestamp_us'])
+    op.create_index('ix_terraform_logs_req_id_timestamp', 'terraform_logs', ['tf_req_id', 'timestamp_us', 'id'])
+    op.create_index(
+        'ix_terraform_logs_no_req_id_timestamp', 'terraform_logs', ['timestamp_us', 'id'],
+        postgresql_where=sa.text('tf_req_id IS NULL')
+    )
+    op.create_index(
+        'ix_terraform_logs_rpc_timestamp', 'terraform_logs', ['tf_rpc', 'timestamp_us'],
+        postgresql_where=sa.text('tf_rpc IS NOT NULL')
+    )
+    op.create_index(
+        'ix_terraform_logs_resource_type_timestamp', 'terraform_logs', ['tf_resource_type', 'timestamp_us'],
+        postgresql_where=sa.text('tf_resource_type IS NOT NULL')
+    )
+    op.create_index('ix_terraform_logs_level_timestamp', 'terraform_logs', ['log_level', 'timestamp_us', 'id'])
+
+    has_trgm = op.get_bind().execute(sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar()
+    if has_trgm:
+        op.execute("CREATE INDEX ix_terraform_logs_message_trgm ON terraform_logs USING gin (message gin_trgm_ops)")
+    op.execute(
+        "CREATE INDEX ix_terraform_logs_message_tsv ON terraform_logs "
+        f"USING gin (to_tsvector('simple', left(message, {TSVECTOR_MAX_CHARS})))"
+    )
+
+
+def _rename_away(old_name: str) -> None:
+    """Rename terraform_logs and drop its indexes, so the names can be reused."""
+    connection = op.get_bind()
+    op.execute(f"ALTER TABLE terraform_logs RENAME TO {old_name}")
+    op.execute(f"ALTER TABLE {old_name} RENAME CONSTRAINT terraform_logs_pkey TO {old_name}_pkey")
+    index_names = connection.execute(
+        sa.text(
+            "SELECT indexname FROM pg_indexes WHERE tablename = :table AND indexname <> :pkey"
+        ),
+        {'table': old_name, 'pkey': f"{old_name}_pkey"}
+    ).scalars().all()
+    for index_name in index_names:
+        op.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+
+
+def _legacy_uploads() -> list[dict]:
+    """Runs of existing rows that form one upload each, with their id ranges."""
+    rows = op.get_bind().execute(
+        sa.text("SELECT id, filename, uploaded_at FROM terraform_logs ORDER BY id")
+        .columns(uploaded_at=sa.DateTime())
+        .execution_options(yield_per=50000)
+    )
+    uploads = []
+    previous = None
+    for row in rows:
+        if previous is None or row.filename != previous.filename or (
+            row.uploaded_at is not None and previous.uploaded_at is not None
+            and row.uploaded_at - previous.uploaded_at > UPLOAD_GAP
+        ):
+            uploads.append({
+                'upload_id': len(uploads) + 1, 'filename': row.filename, 'uploaded_at': row.uploaded_at,
+                'first_id': row.id, 'last_id': row.id, 'log_count': 0,
+            })
+        uploads[-1]['last_id'] = row.id
+        uploads[-1]['log_count'] += 1
+        previous = row
+    return uploads
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    uploads = op.create_table(
+        'uploads',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+        sa.Column('log_count', sa.BigInteger(), nullable=True),
+    )
+    op.create_index('ix_uploads_id', 'uploads', ['id'])
+    legacy_uploads = _legacy_uploads()
+    if legacy_uploads:
+        op.bulk_insert(uploads, [
+            {key: upload[key] for key in ('filename', 'uploaded_at', 'log_count')} | {'id': upload['upload_id']}
+            for upload in legacy_uploads
+        ])
+
+    if is_postgresql:
+        op.execute(
+            "SELECT setval(pg_get_serial_sequence('uploads', 'id'), coalesce(max(id), 0) + 1, false) FROM uploads"
+        )
+        columns = ', '.join(f'"{column}"' for column in LOG_COLUMNS)
+        _rename_away('terraform_logs_old')
+        op.create_table(
+            'terraform_logs',
+            *_log_columns(),
+            sa.Column('upload_id', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id', 'upload_id', name='terraform_logs_pkey'),
+            postgresql_partition_by='LIST (upload_id)'
+        )
+        op.execute("ALTER SEQUENCE terraform_logs_id_seq OWNED BY terraform_logs.id")
+        _create_log_indexes(with_id_index=False)
+
+        for upload in legacy_uploads:
+            upload_id = upload['upload_id']
+            op.execute(
+                f"CREATE TABLE terraform_logs_u{upload_id} PARTITION OF terraform_logs FOR VALUES IN ({upload_id})"
+            )
+        _execute_per_upload(
+            f"""
+            INSERT INTO terraform_logs ({columns}, upload_id)
+            SELECT {', '.join(f'o.{column}' for column in LOG_COLUMNS)}, :upload_id
+            FROM terraform_logs_old o
+            WHERE o.id BETWEEN :first_id AND :last_id
+            """,
+            legacy_uploads
+        )
+        op.drop_table('terraform_logs_old')
+    else:
+        op.add_column('terraform_logs', sa.Column('upload_id', sa.Integer(), nullable=True))
+        _execute_per_upload(
+            "UPDATE terraform_logs SET upload_id = :upload_id WHERE id BETWEEN :first_id AND :last_id",
+            legacy_uploads
+        )
+        op.create_index('ix_terraform_logs_upload_id', 'terraform_logs', ['upload_id'])
+
+    op.add_column('ingest_jobs', sa.Column('upload_id', sa.Integer(), nullable=True))
+    op.add_column('ingest_jobs', sa.Column('replaces_upload_id', sa.Integer(), nullable=True))
+
+    op.add_column('sections', sa.Column('upload_id', sa.Integer(), nullable=True))
+    _execute_per_upload(
+        "UPDATE sections SET upload_id = :upload_id WHERE start_id BETWEEN :first_id AND :last_id",
+        legacy_uploads
+    )
+    op.drop_index('ix_sections_upload', table_name='sections')
+    op.create_index('ix_sections_upload_id', 'sections', ['upload_id'])
+
+    # request_summary is keyed by (upload_id, tf_req_id) now; it is recomputed from the logs
+    op.drop_table('request_summary')
+    _create_request_summary(with_upload_id=True)
+    _fill_request_summary(with_upload_id=True)
+
+
+def _execute_per_upload(statement: str, legacy_uploads: list[dict]) -> None:
+    if legacy_uploads:
+        op.get_bind().execute(sa.text(statement), legacy_uploads)
+
+
+def _create_request_summary(with_upload_id: bool) -> None:
+    key = [sa.Column('upload_id', sa.Integer(), primary_key=True)] if with_upload_id else []
+    op.create_table(
+        'request_summary',
+        *key,
+        sa.Column('tf_req_id', sa.String(), primary_key=True),
+        sa.Column('tf_rpc', sa.String(), nullable=True),
+        sa.Column('tf_resource_type', sa.String(), nullable=True),
+        sa.Column('tf_provider_addr', sa.String(), nullable=True),
+        sa.Column('start_us', sa.BigInteger(), nullable=True),
+        sa.Column('end_us', sa.BigInteger(), nullable=True),
+        sa.Column('start_timestamp', sa.String(), nullable=True),
+        sa.Column('end_timestamp', sa.String(), nullable=True),
+        sa.Column('log_count', sa.Integer(), nullable=True),
+        sa.Column('tf_req_duration_ms', sa.BigInteger(), nullable=True),
+    )
+
+
+def _fill_request_summary(with_upload_id: bool) -> None:
+    """Same aggregation as migration 0006, optionally per upload."""
+    if op.get_bind().dialect.name == 'postgresql':
+        duration = "max((raw_data->>'tf_req_duration_ms')::numeric)::bigint"
+    else:
+        duration = "max(CAST(json_extract(raw_data, '$.tf_req_duration_ms') AS INTEGER))"
+    key = ['upload_id', 'tf_req_id'] if with_upload_id else ['tf_req_id']
+    match = ' AND '.join(f"l.{column} = s.{column}" for column in key)
+
+    def first(column: str) -> str:
+        return (
+            f"(SELECT l.{column} FROM terraform_logs l WHERE {match} "
+            f"AND l.{column} IS NOT NULL ORDER BY l.timestamp_us, l.id LIMIT 1)"
+        )
+
+    def at(bound: str) -> str:
+        return f"(SELECT l.\"timestamp\" FROM terraform_logs l WHERE {match} AND l.timestamp_us = s.{bound} LIMIT 1)"
+
+    op.execute(
+        f"""
+        INSERT INTO request_summary (
+            {', '.join(key)}, tf_rpc, tf_resource_type, tf_provider_addr,
+            start_us, end_us, start_timestamp, end_timestamp, log_count, tf_req_duration_ms
+        )
+        SELECT
+            {', '.join(f's.{column}' for column in key)},
+            {first('tf_rpc')}, {first('tf_resource_type')}, {first('tf_provider_addr')},
+            s.start_us, s.end_us, {at('start_us')}, {at('end_us')},
+            s.log_count, s.tf_req_duration_ms
+        FROM (
+            SELECT
+                {', '.join(key)},
+                min(timestamp_us) AS start_us,
+                max(timestamp_us) AS end_us,
+                count(*) AS log_count,
+                {duration} AS tf_req_duration_ms
+            FROM terraform_logs
+            WHERE tf_req_id IS NOT NULL
+            GROUP BY {', '.join(key)}
+        ) s
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    op.drop_table('request_summary')
+
+    op.drop_index('ix_sections_upload_id', table_name='sections')
+    op.create_index('ix_sections_upload', 'sections', ['uploaded_at', 'filename'])
+    op.drop_column('sections', 'upload_id')
+
+    op.drop_column('ingest_jobs', 'replaces_upload_id')
+    op.drop_column('ingest_jobs', 'upload_id')
+
+    if is_postgresql:
+        columns = ', '.join(f'"{column}"' for column in LOG_COLUMNS)
+        _rename_away('terraform_logs_partitioned')
+        op.create_table(
+            'terraform_logs',
+            *_log_columns(),
+            sa.PrimaryKeyConstraint('id', name='terraform_logs_pkey'),
+        )
+        op.execute("ALTER SEQUENCE terraform_logs_id_seq OWNED BY terraform_logs.id")
+        op.execute(f"INSERT INTO terraform_logs ({columns}) SELECT {columns} FROM terraform_logs_partitioned")
+        # Dropping the partitioned table drops all of its partitions
+        op.drop_table('terraform_logs_partitioned')
+        _create_log_indexes(with_id_index=True)
+    else:
+        op.drop_index('ix_terraform_logs_upload_id', table_name='terraform_logs')
+        op.drop_column('terraform_logs', 'upload_id')
+
+    _create_request_summary(with_upload_id=False)
+    _fill_request_summary(with_upload_id=False)
+
+    op.drop_table('uploads')
@@ -0,0 +1,51 @@
+"""Add sentry_jobs and the per-upload sentry_high_water mark.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16 13:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'sentry_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('upload_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('errors_read', sa.Integer(), nullable=True),
+        sa.Column('sent_count', sa.Integer(), nullable=True),
+        sa.Column('duplicate_count', sa.Integer(), nullable=True),
+        sa.Column('failed_count', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+    )
+    op.create_index('ix_sentry_jobs_id', 'sentry_jobs', ['id'])
+    op.create_index('ix_sentry_jobs_status', 'sentry_jobs', ['status'])
+
+    op.create_table(
+        'sentry_high_water',
+        sa.Column('upload_id', sa.Integer(), primary_key=True),
+        sa.Column('last_log_id', sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sentry_high_water')
+    op.drop_index('ix_sentry_jobs_status', table_name='sentry_jobs')
+    op.drop_index('ix_sentry_jobs_id', table_name='sentry_jobs')
+    op.drop_table('sentry_jobs')
@@ -0,0 +1,44 @@
+"""Add tail_sessions for following growing log files.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-16 13:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'tail_sessions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('upload_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('byte_offset', sa.BigInteger(), nullable=True),
+        sa.Column('entries_count', sa.BigInteger(), nullable=True),
+        sa.Column('fixed_logs_count', sa.Integer(), nullable=True),
+        sa.Column('last_timestamp', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+    )
+    op.create_index('ix_tail_sessions_id', 'tail_sessions', ['id'])
+    op.create_index('ix_tail_sessions_status', 'tail_sessions', ['status'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tail_sessions_status', table_name='tail_sessions')
+    op.drop_index('ix_tail_sessions_id', table_name='tail_sessions')
+    op.drop_table('tail_sessions')
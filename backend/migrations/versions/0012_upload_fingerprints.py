@@ -0,0 +1,37 @@
+"""Add content fingerprints to uploads and skipped_bytes to ingest_jobs.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-16 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, Sequence[str], None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('uploads', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('uploads', sa.Column('content_size', sa.BigInteger(), nullable=True))
+    op.add_column('uploads', sa.Column('head_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_uploads_content_hash', 'uploads', ['content_hash'])
+    op.create_index('ix_uploads_head_hash', 'uploads', ['head_hash'])
+    op.add_column('ingest_jobs', sa.Column('skipped_bytes', sa.BigInteger(), nullable=True, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ingest_jobs', 'skipped_bytes')
+    op.drop_index('ix_uploads_head_hash', table_name='uploads')
+    op.drop_index('ix_uploads_content_hash', table_name='uploads')
+    op.drop_column('uploads', 'head_hash')
+    op.drop_column('uploads', 'content_size')
+    op.drop_column('uploads', 'content_hash')
@@ -0,0 +1,41 @@
+"""Add log_payloads for large values stored out of line and terraform_logs.payload_size.
+
+raw_data of new rows only keeps the keys that are not stored in columns.
+Existing rows keep their complete entries, which read the same way.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-16 20:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, Sequence[str], None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # On PostgreSQL the column is added to every partition of terraform_logs as well
+    op.add_column('terraform_logs', sa.Column('payload_size', sa.Integer(), nullable=True))
+    op.create_table(
+        'log_payloads',
+        sa.Column('log_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('upload_id', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint('log_id'),
+    )
+    op.create_index('ix_log_payloads_upload_id', 'log_payloads', ['upload_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_log_payloads_upload_id', table_name='log_payloads')
+    op.drop_table('log_payloads')
+    op.drop_column('terraform_logs', 'payload_size')
@@ -0,0 +1,101 @@
+"""Dictionary-encode the low-cardinality columns of terraform_logs.
+
+filename, log_level, caller, module, tf_provider_addr, tf_resource_type and
+tf_rpc are replaced by <column>_id columns referencing log_dictionary, see
+app/services/log_dictionary.py. The values of existing rows are moved into
+the dictionary here. The rpc, resource type and level indexes are rebuilt
+on the id columns; the filename index is dropped, uploads are found by
+upload_id.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-16 21:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0014'
+down_revision: Union[str, Sequence[str], None] = '0013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match DICTIONARY_FIELDS in app/services/log_dictionary.py
+DICTIONARY_FIELDS = (
+    'filename', 'log_level', 'caller', 'module', 'tf_provider_addr', 'tf_resource_type', 'tf_rpc',
+)
+
+
+def _drop_value_indexes() -> None:
+    op.drop_index('ix_terraform_logs_level_timestamp', table_name='terraform_logs')
+    op.drop_index('ix_terraform_logs_resource_type_timestamp', table_name='terraform_logs')
+    op.drop_index('ix_terraform_logs_rpc_timestamp', table_name='terraform_logs')
+
+
+def _create_value_indexes(suffix: str) -> None:
+    """The rpc, resource type and level indexes of revisions 0003 and 0004, on the columns ending in suffix."""
+    rpc, resource_type, level = (f"{column}{suffix}" for column in ('tf_rpc', 'tf_resource_type', 'log_level'))
+    op.create_index(
+        'ix_terraform_logs_rpc_timestamp', 'terraform_logs', [rpc, 'timestamp_us'],
+        postgresql_where=sa.text(f'{rpc} IS NOT NULL'),
+        sqlite_where=sa.text(f'{rpc} IS NOT NULL')
+    )
+    op.create_index(
+        'ix_terraform_logs_resource_type_timestamp', 'terraform_logs', [resource_type, 'timestamp_us'],
+        postgresql_where=sa.text(f'{resource_type} IS NOT NULL'),
+        sqlite_where=sa.text(f'{resource_type} IS NOT NULL')
+    )
+    op.create_index('ix_terraform_logs_level_timestamp', 'terraform_logs', [level, 'timestamp_us', 'id'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'log_dictionary',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('field', sa.String(), nullable=False),
+        sa.Column('value', sa.String(), nullable=False),
+        sa.UniqueConstraint('field', 'value', name='uq_log_dictionary_field_value'),
+    )
+    for field in DICTIONARY_FIELDS:
+        op.execute(
+            f"INSERT INTO log_dictionary (field, value) "
+            f"SELECT DISTINCT '{field}', \"{field}\" FROM terraform_logs WHERE \"{field}\" IS NOT NULL"
+        )
+
+    _drop_value_indexes()
+    op.drop_index('ix_terraform_logs_filename', table_name='terraform_logs')
+    # On PostgreSQL the columns are added to and dropped from every partition of terraform_logs as well
+    for field in DICTIONARY_FIELDS:
+        op.add_column('terraform_logs', sa.Column(f'{field}_id', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE terraform_logs SET " + ', '.join(
+            f"{field}_id = (SELECT d.id FROM log_dictionary d "
+            f"WHERE d.field = '{field}' AND d.value = terraform_logs.\"{field}\")"
+            for field in DICTIONARY_FIELDS
+        )
+    )
+    for field in DICTIONARY_FIELDS:
+        op.drop_column('terraform_logs', field)
+    _create_value_indexes('_id')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_value_indexes()
+    for field in DICTIONARY_FIELDS:
+        op.add_column('terraform_logs', sa.Column(field, sa.String(), nullable=True))
+    op.execute(
+        "UPDATE terraform_logs SET " + ', '.join(
+            f"\"{field}\" = (SELECT d.value FROM log_dictionary d WHERE d.id = terraform_logs.{field}_id)"
+            for field in DICTIONARY_FIELDS
+        )
+    )
+    for field in DICTIONARY_FIELDS:
+        op.drop_column('terraform_logs', f'{field}_id')
+    _create_value_indexes('')
+    op.create_index('ix_terraform_logs_filename', 'terraform_logs', ['filename'])
+    op.drop_table('log_dictionary')
@@ -0,0 +1,96 @@
+"""Add the log_stats and rpc_duration_stats rollups of /stats.
+
+The rollups of logs stored before this revision are computed here once.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-16 22:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.log_stats import duration_bucket
+
+# revision identifiers, used by Alembic.
+revision: str = '0015'
+down_revision: Union[str, Sequence[str], None] = '0014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match STATS_DIMENSIONS in app/services/log_stats.py, as of revision 0014
+STATS_DIMENSIONS = {
+    'level': 'log_level',
+    'rpc': 'tf_rpc',
+    'resource_type': 'tf_resource_type',
+    'provider': 'tf_provider_addr',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'log_stats',
+        sa.Column('upload_id', sa.Integer(), primary_key=True),
+        sa.Column('dimension', sa.String(), primary_key=True),
+        sa.Column('value', sa.String(), primary_key=True),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+    )
+    rpc_duration_stats = op.create_table(
+        'rpc_duration_stats',
+        sa.Column('upload_id', sa.Integer(), primary_key=True),
+        sa.Column('tf_rpc', sa.String(), primary_key=True),
+        sa.Column('bucket', sa.Integer(), primary_key=True),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+    )
+
+    for dimension, column in STATS_DIMENSIONS.items():
+        op.execute(
+            f"""
+            INSERT INTO log_stats (upload_id, dimension, value, count)
+            SELECT l.upload_id, '{dimension}', coalesce(d.value, ''), count(*)
+            FROM terraform_logs l
+            LEFT JOIN log_dictionary d ON d.id = l.{column}_id
+            WHERE l.upload_id IS NOT NULL
+            GROUP BY l.upload_id, coalesce(d.value, '')
+            """
+        )
+    _fill_rpc_durations(rpc_duration_stats)
+
+
+def _fill_rpc_durations(rpc_duration_stats: sa.Table) -> None:
+    # Bucketed here, the logarithm is not available in every SQLite build
+    connection = op.get_bind()
+    if connection.dialect.name == 'postgresql':
+        duration = "l.raw_data->'tf_req_duration_ms'"
+    else:
+        duration = "json_extract(l.raw_data, '$.tf_req_duration_ms')"
+    rows = connection.execute(sa.text(
+        f"""
+        SELECT l.upload_id, coalesce(d.value, ''), {duration}
+        FROM terraform_logs l
+        LEFT JOIN log_dictionary d ON d.id = l.tf_rpc_id
+        WHERE l.upload_id IS NOT NULL AND {duration} IS NOT NULL
+        """
+    ))
+    counts = {}
+    for upload_id, rpc, value in rows:
+        try:
+            duration_ms = int(value)
+        except (TypeError, ValueError):
+            continue
+        key = (upload_id, rpc, duration_bucket(duration_ms))
+        counts[key] = counts.get(key, 0) + 1
+    if counts:
+        connection.execute(rpc_duration_stats.insert(), [
+            {'upload_id': upload_id, 'tf_rpc': rpc, 'bucket': bucket, 'count': count}
+            for (upload_id, rpc, bucket), count in counts.items()
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rpc_duration_stats')
+    op.drop_table('log_stats')
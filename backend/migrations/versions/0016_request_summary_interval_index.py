@@ -0,0 +1,40 @@
+"""Index request_summary by time for the time windows of /gantt.
+
+The B-tree indexes serve the extent of the chart (min start_us, max end_us)
+and, except on PostgreSQL, the overlap condition of a window. On PostgreSQL
+a GiST index on int8range(start_us, end_us) serves the overlap condition as
+an interval index, see app/services/log_gantt.py.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-16 23:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0016'
+down_revision: Union[str, Sequence[str], None] = '0015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_request_summary_start_end', 'request_summary', ['start_us', 'end_us'])
+    op.create_index('ix_request_summary_end', 'request_summary', ['end_us'])
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_request_summary_interval ON request_summary "
+            "USING gist (int8range(start_us, end_us, '[]'))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_request_summary_interval")
+    op.drop_index('ix_request_summary_end', table_name='request_summary')
+    op.drop_index('ix_request_summary_start_end', table_name='request_summary')
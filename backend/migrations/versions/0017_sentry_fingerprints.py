@@ -0,0 +1,33 @@
+"""Add sentry_fingerprints, the error fingerprints already delivered to Sentry.
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-17 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0017'
+down_revision: Union[str, Sequence[str], None] = '0016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'sentry_fingerprints',
+        sa.Column('fingerprint', sa.String(), primary_key=True),
+        sa.Column('upload_id', sa.Integer(), nullable=False),
+        sa.Column('log_id', sa.BigInteger(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sentry_fingerprints')
@@ -0,0 +1,30 @@
+"""Add skipped_entries to ingest_jobs.
+
+Jobs now fingerprint their log themselves, so the entries a stored upload
+already held are reported on the job instead of the upload response.
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-17 10:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0018'
+down_revision: Union[str, Sequence[str], None] = '0017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ingest_jobs', sa.Column('skipped_entries', sa.Integer(), nullable=True, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ingest_jobs', 'skipped_entries')
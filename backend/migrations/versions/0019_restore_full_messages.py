@@ -0,0 +1,58 @@
+"""Restore the complete message of rows stored with a preview.
+
+Between revisions 0013 and 0019 a @message longer than PAYLOAD_INLINE_LIMIT
+was cut to a preview in terraform_logs.message and stored in full in
+log_payloads only, so search and filters missed its end. The complete
+message is copied back into the column; the payload keeps its copy, which
+merges to the same entry.
+
+Revision ID: 0019
+Revises: 0018
+Create Date: 2026-10-17 11:00:00
+
+"""
+import json
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0019'
+down_revision: Union[str, Sequence[str], None] = '0018'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Payloads read per statement
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    select = sa.text(
+        "SELECT log_id, upload_id, data FROM log_payloads WHERE log_id > :after ORDER BY log_id LIMIT :limit"
+    )
+    # upload_id lets PostgreSQL prune the partitions of terraform_logs
+    update = sa.text("UPDATE terraform_logs SET message = :message WHERE id = :id AND upload_id = :upload_id")
+    after = 0
+    while True:
+        rows = bind.execute(select, {'after': after, 'limit': BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            return
+        values = []
+        for log_id, upload_id, data in rows:
+            message = json.loads(zlib.decompress(data)).get('@message')
+            if isinstance(message, str):
+                values.append({'id': log_id, 'upload_id': upload_id, 'message': message})
+        if values:
+            bind.execute(update, values)
+        after = rows[-1][0]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Complete messages are valid for the older layout as well
+    pass
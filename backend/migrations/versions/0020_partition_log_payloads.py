@@ -0,0 +1,82 @@
+"""Partition log_payloads by upload_id on PostgreSQL.
+
+log_payloads gets one partition per upload like terraform_logs, see
+migration 0008, so deleting an upload drops its payloads with a partition
+drop instead of deleting them row by row. Existing payloads are copied into
+the new table once. Other databases keep the table and its upload_id index.
+
+Revision ID: 0020
+Revises: 0019
+Create Date: 2026-10-17 11:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0020'
+down_revision: Union[str, Sequence[str], None] = '0019'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _payload_columns() -> list:
+    return [
+        sa.Column('log_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('upload_id', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_log_payloads_upload_id', table_name='log_payloads')
+    op.execute("ALTER TABLE log_payloads RENAME TO log_payloads_old")
+    op.execute("ALTER TABLE log_payloads_old RENAME CONSTRAINT log_payloads_pkey TO log_payloads_old_pkey")
+    op.create_table(
+        'log_payloads',
+        *_payload_columns(),
+        sa.PrimaryKeyConstraint('log_id', 'upload_id', name='log_payloads_pkey'),
+        postgresql_partition_by='LIST (upload_id)'
+    )
+    upload_ids = op.get_bind().execute(sa.text("SELECT id FROM uploads ORDER BY id")).scalars().all()
+    for upload_id in upload_ids:
+        op.execute(f"CREATE TABLE log_payloads_u{upload_id} PARTITION OF log_payloads FOR VALUES IN ({upload_id})")
+    # Payloads of uploads that no longer exist are left behind
+    op.execute(
+        """
+        INSERT INTO log_payloads (log_id, upload_id, data)
+        SELECT o.log_id, o.upload_id, o.data
+        FROM log_payloads_old o
+        JOIN uploads u ON u.id = o.upload_id
+        """
+    )
+    op.drop_table('log_payloads_old')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE log_payloads RENAME TO log_payloads_partitioned")
+    op.execute(
+        "ALTER TABLE log_payloads_partitioned RENAME CONSTRAINT log_payloads_pkey TO log_payloads_partitioned_pkey"
+    )
+    op.create_table(
+        'log_payloads',
+        *_payload_columns(),
+        sa.PrimaryKeyConstraint('log_id', name='log_payloads_pkey'),
+    )
+    op.execute(
+        "INSERT INTO log_payloads (log_id, upload_id, data) "
+        "SELECT log_id, upload_id, data FROM log_payloads_partitioned"
+    )
+    # Dropping the partitioned table drops all of its partitions
+    op.drop_table('log_payloads_partitioned')
+    op.create_index('ix_log_payloads_upload_id', 'log_payloads', ['upload_id'])
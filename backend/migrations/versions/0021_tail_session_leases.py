@@ -0,0 +1,33 @@
+"""Add a lease to tail_sessions.
+
+A worker process claims a running tail session before following its file
+and renews the claim while it does, so sessions are resumed by one worker
+only and taken over when their worker dies.
+
+Revision ID: 0021
+Revises: 0020
+Create Date: 2026-10-17 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0021'
+down_revision: Union[str, Sequence[str], None] = '0020'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tail_sessions', sa.Column('lease_owner', sa.String(), nullable=True))
+    op.add_column('tail_sessions', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tail_sessions', 'lease_expires_at')
+    op.drop_column('tail_sessions', 'lease_owner')
@@ -0,0 +1,110 @@
+"""
+Compare the rule engine with the hard-coded checks it replaced.
+
+Classifies every entry of the sample logs with both, reports entries where
+the section markers or the inferred level differ and the time per entry of
+each approach.
+
+Usage:
+    python scripts/bench_rules.py [log files...]    (default: ../sample-logs/*.json)
+"""
+import glob
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.log_rules import RuleEngine, classify_entry, get_rule_engine  # noqa: E402
+from app.services.log_sections import SectionType  # noqa: E402
+from app.services.log_stream import decode_log_line  # noqa: E402
+
+SAMPLE_LOGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'sample-logs', '*.json')
+REPEAT = 5
+
+
+def legacy_markers(log_entry: dict) -> tuple:
+    message = log_entry.get('@message', '') or log_entry.get('message', '')
+    log_type = log_entry.get('type', '')
+
+    start = None
+    if 'backend/local: starting Plan operation' in message:
+        start = SectionType.PLAN
+    elif 'backend/local: starting Apply operation' in message:
+        start = SectionType.APPLY
+    elif 'Initializing the backend' in message or 'Initializing provider plugins' in message:
+        start = SectionType.INIT
+
+    end = None
+    if log_type == 'change_summary' or 'Plan:' in message:
+        end = SectionType.PLAN
+    elif log_type == 'apply_complete' or 'Apply complete!' in message:
+        end = SectionType.APPLY
+    elif 'Terraform has been successfully initialized' in message:
+        end = SectionType.INIT
+    return start, end
+
+
+def legacy_level(log_entry: dict) -> str | None:
+    msg = (log_entry.get('@message', '') or '').lower()
+    if 'error' in msg:
+        return 'error'
+    elif 'warning' in msg:
+        return 'warning'
+    return None
+
+
+def legacy(entries: list[dict]) -> None:
+    for entry in entries:
+        legacy_markers(entry)
+        legacy_level(entry)
+
+
+def rules(entries: list[dict]) -> None:
+    for entry in entries:
+        classify_entry(entry)
+
+
+def untagged_rules(entries: list[dict]) -> None:
+    """The rule engine with only the rules that replace the hard-coded checks."""
+    engine = RuleEngine([rule for rule in get_rule_engine().rules if not rule.tags], section_type=SectionType)
+    classify = engine.classify
+    for entry in entries:
+        classify(entry.get('@message', '') or entry.get('message', ''), entry.get('type'))
+
+
+def load_entries(paths: list[str]) -> list[dict]:
+    entries = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            entries += [entry for entry in map(decode_log_line, f) if entry is not None]
+    return entries
+
+
+def main() -> None:
+    paths = sys.argv[1:] or sorted(glob.glob(SAMPLE_LOGS))
+    entries = load_entries(paths)
+    print(f"{len(entries)} entries from {len(paths)} files")
+
+    mismatches = 0
+    for entry in entries:
+        classification = classify_entry(entry)
+        expected = legacy_markers(entry) + (legacy_level(entry),)
+        if (classification.section_start, classification.section_end, classification.level) != expected:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"  mismatch: {entry.get('@message', '')[:80]!r}")
+    print(f"{mismatches} entries classified differently")
+
+    benchmarks = (
+        ('hard-coded checks', legacy),
+        ('rule engine', rules),
+        ('without tag rules', untagged_rules),
+    )
+    for name, function in benchmarks:
+        seconds = min(timeit.repeat(lambda: function(entries), number=1, repeat=REPEAT))
+        print(f"{name:>18}: {seconds * 1e9 / len(entries):8.0f} ns/entry")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Check that the queries behind the API endpoints are served by indexes.
+
+Runs the same service functions the endpoints use, captures the
+SQL they send and runs EXPLAIN on every statement that reads terraform_logs.
+Sequential scans are disabled for the session, so a "Seq Scan" in a plan
+means that no index can serve the query at all, whatever the table size.
+
+Usage (PostgreSQL only, with the schema migrated to head):
+    python scripts/explain_indexes.py
+"""
+import os
+import sys
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine  # noqa: E402
+from app.models import TerraformLog  # noqa: E402
+from app.services import (  # noqa: E402
+    get_all_logs,
+    get_logs_by_request,
+    get_request_ids,
+    encode_cursor,
+    search_logs
+)
+from app.services.log_projection import LOG_FIELDS  # noqa: E402
+
+
+def endpoint_checks(db, sample: TerraformLog | None) -> dict:
+    req_id = sample.tf_req_id if sample and sample.tf_req_id else 'sample-request-id'
+    rpc = sample.tf_rpc if sample and sample.tf_rpc else 'PlanResourceChange'
+    resource_type = sample.tf_resource_type if sample and sample.tf_resource_type else 'aws_instance'
+    grouped_cursor = encode_cursor(sample, True) if sample else None
+    flat_cursor = encode_cursor(sample, False) if sample else None
+    upload_id = sample.upload_id if sample else 1
+
+    return {
+        '/api/logs': lambda: get_all_logs(db),
+        '/api/logs?group_by_request_id=false': lambda: get_all_logs(db, group_by_request_id=False),
+        '/api/logs?tf_req_id=': lambda: get_all_logs(db, tf_req_id=req_id),
+        '/api/logs?tf_rpc=': lambda: get_all_logs(db, tf_rpc=rpc, group_by_request_id=False),
+        '/api/logs?tf_resource_type=': lambda: get_all_logs(
+            db, tf_resource_type=resource_type, group_by_request_id=False
+        ),
+        '/api/logs?level=': lambda: get_all_logs(db, level='error', group_by_request_id=False),
+        '/api/logs?cursor=': lambda: get_all_logs(db, cursor=grouped_cursor),
+        '/api/logs?group_by_request_id=false&cursor=': lambda: get_all_logs(
+            db, cursor=flat_cursor, group_by_request_id=False
+        ),
+        '/api/logs?level=&cursor=': lambda: get_all_logs(
+            db, level='error', cursor=flat_cursor, group_by_request_id=False
+        ),
+        '/api/logs/search?mode=phrase': lambda: search_logs(db, 'starting plugin', mode='phrase'),
+        '/api/logs/search?mode=prefix': lambda: search_logs(db, 'plug', mode='prefix'),
+        '/api/logs/by-request/{id}': lambda: get_logs_by_request(db, req_id, LOG_FIELDS),
+        '/api/logs/by-request/no-request-id': lambda: get_logs_by_request(db, 'no-request-id', LOG_FIELDS),
+        '/api/request-ids': lambda: get_request_ids(db),
+        '/api/logs?upload_id=': lambda: get_all_logs(db, upload_id=upload_id),
+        '/api/logs?upload_id=&cursor=': lambda: get_all_logs(db, cursor=grouped_cursor, upload_id=upload_id),
+        '/api/logs/by-request/{id}?upload_id=': lambda: get_logs_by_request(db, req_id, LOG_FIELDS, upload_id),
+        '/api/request-ids?upload_id=': lambda: get_request_ids(db, upload_id),
+        '/api/logs?fields=': lambda: get_all_logs(db, fields=['id', 'log_level', 'timestamp', 'message']),
+        '/api/logs?fields=&cursor=': lambda: get_all_logs(
+            db, cursor=grouped_cursor, fields=['id', 'log_level', 'timestamp', 'message']
+        ),
+    }
+
+
+def capture_statements(run) -> list[tuple[str, object]]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and TerraformLog.__tablename__ in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        run()
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return statements
+
+
+def main() -> int:
+    if engine.dialect.name != 'postgresql':
+        print(f"EXPLAIN checks need PostgreSQL, got {engine.dialect.name}")
+        return 2
+
+    db = SessionLocal()
+    failed = False
+    try:
+        sample = db.query(TerraformLog).filter(TerraformLog.tf_req_id.isnot(None)).first()
+        for name, run in endpoint_checks(db, sample).items():
+            for statement, parameters in capture_statements(run):
+                connection = db.connection()
+                connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+                plan = "\n".join(
+                    row[0] for row in connection.exec_driver_sql("EXPLAIN " + statement, parameters)
+                )
+                uses_seq_scan = f"Seq Scan on {TerraformLog.__tablename__}" in plan
+                failed = failed or uses_seq_scan
+                print(f"{'FAIL' if uses_seq_scan else 'OK  '} {name}")
+                if uses_seq_scan:
+                    print("    " + plan.replace("\n", "\n    "))
+    finally:
+        db.rollback()
+        db.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
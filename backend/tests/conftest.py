@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+import pytest
+
+# The app binds its engine at import time, so the test database is chosen before any app import
+os.environ.setdefault(
+    "DATABASE_URL",
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="logviewer-tests-"), "test.db")
+)
+
+
+@pytest.fixture(scope="session")
+def database():
+    from app.database import run_migrations
+
+    run_migrations()
+
+
+@pytest.fixture
+def db(database):
+    from app.database import SessionLocal
+    from app.services import delete_all_uploads
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        delete_all_uploads(session)
+        session.close()
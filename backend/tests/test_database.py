@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+import pytest
+
+from app import database
+from app.database import ReadSession, _async_url, dispose_async_engine, get_read_db
+from app.services.log_service import get_all_logs, save_logs_to_db
+
+
+@pytest.mark.parametrize('url, expected', [
+    ("postgresql://user:secret@db:5432/logs", "postgresql+asyncpg://user:secret@db:5432/logs"),
+    ("sqlite:///tmp/test.db", "sqlite+aiosqlite:///tmp/test.db"),
+])
+def test_async_url(url, expected):
+    assert _async_url(url) == expected
+
+
+def test_read_session_does_not_block_the_event_loop(db):
+    release = threading.Event()
+
+    def blocking_read(session):
+        assert session is db
+        release.wait(timeout=10)
+        return threading.get_ident()
+
+    async def main():
+        read = asyncio.create_task(ReadSession(db).run(blocking_read))
+        # The loop keeps running while the read waits in the thread pool
+        await asyncio.sleep(0.05)
+        assert not read.done()
+        release.set()
+        return await read
+
+    assert asyncio.run(main()) != threading.get_ident()
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_read_db_runs_service_functions(db, monkeypatch, mode):
+    if mode == 'async':
+        pytest.importorskip('aiosqlite')
+    monkeypatch.setattr(database, "DB_READ_MODE", mode)
+    save_logs_to_db(db, [{"@level": "info", "@message": "read me"}], "read.json")
+
+    async def main():
+        sessions = get_read_db()
+        session = await sessions.__anext__()
+        try:
+            return await session.run(get_all_logs, limit=10)
+        finally:
+            await sessions.aclose()
+            await dispose_async_engine()
+
+    assert [log.message for log in asyncio.run(main())] == ["read me"]
@@ -0,0 +1,110 @@
+import gzip
+import io
+import json
+import threading
+import time
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import IngestJob, TerraformLog, Upload
+from app.services import ingest_jobs
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(app) as client:
+        yield client
+    db.query(IngestJob).delete()
+    db.commit()
+
+
+def _log(count: int) -> bytes:
+    return b''.join(
+        json.dumps({"@level": "info", "@message": f"line {i}", "@timestamp": "2025-09-09T15:31:32.000000+03:00"})
+        .encode() + b'\n'
+        for i in range(count)
+    )
+
+
+def _upload(client, content: bytes) -> dict:
+    response = client.post("/api/upload", files={"file": ("terraform.json", content)})
+    assert response.status_code == 202
+    return response.json()
+
+
+def _wait(client, job_id: int) -> dict:
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job['status'] in ('completed', 'duplicate', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_upload_returns_before_the_log_is_fingerprinted(client, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    fingerprint_log = ingest_jobs.fingerprint_log
+
+    def slow_fingerprint(*args):
+        started.set()
+        assert release.wait(30)
+        return fingerprint_log(*args)
+
+    monkeypatch.setattr(ingest_jobs, "fingerprint_log", slow_fingerprint)
+    try:
+        accepted = _upload(client, _log(10))
+        assert accepted['status'] == "queued"
+        assert started.wait(30)
+        assert client.get(f"/api/jobs/{accepted['job_id']}").json()['status'] == "running"
+    finally:
+        release.set()
+    assert _wait(client, accepted['job_id'])['status'] == "completed"
+
+
+def test_stored_log_is_a_duplicate(client, db):
+    first = _wait(client, _upload(client, _log(10))['job_id'])
+    accepted = _upload(client, _log(10))
+    second = _wait(client, accepted['job_id'])
+
+    assert second['status'] == "duplicate"
+    assert second['upload_id'] == first['upload_id']
+    assert second['skipped_entries'] == 10
+    # The upload created for the job is dropped again
+    assert db.get(Upload, accepted['upload_id']) is None
+
+
+def test_grown_log_gets_its_own_upload_starting_with_the_stored_entries(client, db):
+    first = _wait(client, _upload(client, _log(10))['job_id'])
+    stored_hash = db.get(Upload, first['upload_id']).content_hash
+    second = _wait(client, _upload(client, _log(15))['job_id'])
+
+    assert second['status'] == "completed"
+    assert second['upload_id'] != first['upload_id']
+    assert second['skipped_bytes'] == len(_log(10))
+    assert second['skipped_entries'] == 10
+    assert second['rows_inserted'] == 5
+    messages = [message for message, in db.query(TerraformLog.message)
+                .filter(TerraformLog.upload_id == second['upload_id']).order_by(TerraformLog.id)]
+    assert messages == [f"line {i}" for i in range(15)]
+    # The stored upload keeps its rows and fingerprint
+    db.expire_all()
+    stored = db.get(Upload, first['upload_id'])
+    assert stored.log_count == 10 and stored.content_hash == stored_hash
+
+def test_zip_archive_becomes_one_job_per_log(client, db):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr("plan.json", _log(3))
+        zf.writestr("notes.txt", b"skipped")
+        zf.writestr("apply.log.gz", gzip.compress(_log(5)))
+    response = client.post("/api/upload", files={"file": ("logs.zip", archive.getvalue())})
+    assert response.status_code == 202
+
+    jobs = [_wait(client, job['id']) for job in response.json()['jobs']]
+    assert [(job['status'], job['rows_inserted']) for job in jobs] == [("completed", 3), ("completed", 5)]
+    assert [db.get(Upload, job['upload_id']).filename for job in jobs] == ["logs.zip/plan.json", "logs.zip/apply.log.gz"]
@@ -0,0 +1,27 @@
+import json
+from datetime import datetime
+
+from app import json_codec
+from app.services.log_bulk_insert import log_to_row
+from app.services.log_stream import iter_log_entries
+
+
+def test_ingest_decodes_every_line_once(monkeypatch):
+    calls = []
+    loads = json_codec.loads
+
+    def counting_loads(data):
+        calls.append(data)
+        return loads(data)
+
+    monkeypatch.setattr(json_codec, 'loads', counting_loads)
+    lines = [
+        json.dumps({"@level": "info", "@message": f"message {i}", "tf_req_id": "r", "extra": {"i": i}})
+        for i in range(100)
+    ]
+    data = '\n'.join(lines).encode()
+
+    rows = [log_to_row(entry, 'f.json', datetime(2026, 1, 1), 1) for entry in iter_log_entries([data])]
+
+    assert len(rows) == 100
+    assert len(calls) == 100
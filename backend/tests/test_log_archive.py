@@ -0,0 +1,69 @@
+import bz2
+import gzip
+import lzma
+import zipfile
+
+import pytest
+import zstandard
+
+from app.services.log_archive import LogReader, detect_compression, is_log_member, list_archive_members
+
+LOG = b''.join(b'{"@level": "info", "@message": "line %d"}\n' % i for i in range(200))
+
+COMPRESSORS = {
+    'gzip': lambda data: gzip.compress(data[:100]) + gzip.compress(data[100:]),
+    'bz2': bz2.compress,
+    'xz': lzma.compress,
+    'zstd': lambda data: zstandard.ZstdCompressor().compress(data),
+}
+
+
+@pytest.mark.parametrize('kind', COMPRESSORS)
+def test_compressed_upload_is_read_incrementally(tmp_path, kind):
+    path = tmp_path / "terraform.log"
+    compressed = COMPRESSORS[kind](LOG)
+    path.write_bytes(compressed)
+    assert detect_compression(compressed) == kind
+
+    with LogReader(str(path)) as reader:
+        data = b''
+        while chunk := reader.stream.read(256):
+            data += chunk
+        assert data == LOG
+        assert reader.compressed_bytes_read() == len(compressed)
+
+
+def test_plain_upload_is_read_as_is(tmp_path):
+    path = tmp_path / "terraform.log"
+    path.write_bytes(LOG)
+    assert detect_compression(LOG) is None
+    with LogReader(str(path)) as reader:
+        assert reader.stream.read() == LOG
+
+
+def test_zip_members(tmp_path):
+    path = tmp_path / "logs.zip"
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("apply.json", LOG)
+        archive.writestr("README.md", b"not a log")
+        archive.writestr("nested/plan.log.gz", gzip.compress(LOG))
+        archive.writestr("inner.json", b'PK\x05\x06' + bytes(18))
+
+    members = [info.filename for info in list_archive_members(str(path))]
+    assert members == ["apply.json", "nested/plan.log.gz", "inner.json"]
+    for member in members[:2]:
+        with LogReader(str(path), member) as reader:
+            assert reader.stream.read() == LOG
+    with pytest.raises(ValueError, match="top level"):
+        LogReader(str(path), "inner.json")
+
+
+@pytest.mark.parametrize('name, expected', [
+    ("terraform.json", True),
+    ("TERRAFORM.LOG.GZ", True),
+    ("trace.jsonl.zst", True),
+    ("plan.tfplan", False),
+    ("terraform.tfstate.gz", False),
+])
+def test_is_log_member(name, expected):
+    assert is_log_member(name) is expected
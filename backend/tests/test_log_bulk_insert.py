@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from app.models import TerraformLog
+from app.services.log_bulk_insert import _copy_value, bulk_insert_rows, log_to_row
+from app.services.uploads import create_upload
+
+
+def _rows(upload, count: int) -> list[dict]:
+    return [
+        log_to_row({"@level": "info", "@message": f"line {i}", "@module": "provider"}, upload.filename,
+                   upload.uploaded_at, upload.id)
+        for i in range(count)
+    ]
+
+
+def test_batches_commits_and_ids(db):
+    upload = create_upload(db, "bulk.json")
+    commits, batches = [], []
+
+    stats = bulk_insert_rows(
+        db, _rows(upload, 10), batch_size=3, commit_every=2,
+        on_commit=commits.append, on_batch=lambda batch: batches.append([row['id'] for row in batch])
+    )
+
+    assert stats.rows == 10 and stats.method == 'executemany'
+    assert commits == [6, 10]
+    assert [len(ids) for ids in batches] == [3, 3, 3, 1]
+    stored = db.query(TerraformLog.id, TerraformLog.message).filter(TerraformLog.upload_id == upload.id)
+    ids = [row_id for batch in batches for row_id in batch]
+    assert stored.order_by(TerraformLog.id).all() == [(row_id, f"line {i}") for i, row_id in enumerate(ids)]
+
+
+def test_on_commit_writes_in_the_same_transaction(db):
+    upload = create_upload(db, "bulk.json")
+
+    def count_rows(count):
+        upload.log_count = count
+
+    bulk_insert_rows(db, _rows(upload, 4), batch_size=3, commit_every=1, on_commit=count_rows)
+    db.expire_all()
+    assert upload.log_count == 4
+
+
+def test_empty_insert_still_commits(db):
+    upload = create_upload(db, "bulk.json")
+    commits = []
+    assert bulk_insert_rows(db, [], on_commit=commits.append).rows == 0
+    assert commits == [0]
+
+
+def test_copy_values_are_escaped():
+    assert _copy_value('message', None) == '\\N'
+    assert _copy_value('message', 'a\tb\nc\\d\re') == 'a\\tb\\nc\\\\d\\re'
+    assert _copy_value('uploaded_at', datetime(2025, 9, 9, 12, 31)) == '2025-09-09T12:31:00'
+    assert _copy_value('raw_data', {"text": "x\ty"}) == '{"text":"x\\\\ty"}'
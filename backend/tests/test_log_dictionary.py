@@ -0,0 +1,48 @@
+import pytest
+
+from app.json_codec import loads
+from app.models import TerraformLog
+from app.services import log_dictionary
+from app.services.log_projection import encode_log_rows
+from app.services.log_search import search_logs
+from app.services.log_service import get_all_logs, save_logs_to_db
+
+
+@pytest.fixture
+def cold_cache(monkeypatch):
+    """The cache of a process that did not write the stored values, e.g. another worker."""
+    monkeypatch.setattr(log_dictionary, "_ids", {field: {} for field in log_dictionary.DICTIONARY_FIELDS})
+    monkeypatch.setattr(log_dictionary, "_values", {})
+
+
+def _no_queries(*args):
+    raise AssertionError("Decoding must not query the database")
+
+
+def _save(db):
+    save_logs_to_db(db, [{"@level": "warn", "@message": "provider started", "tf_rpc": "ApplyResourceChange"}],
+                    "dictionary.json")
+
+
+def test_read_functions_load_missing_values_through_their_session(db, cold_cache, monkeypatch):
+    _save(db)
+    log_dictionary._values.clear()
+
+    fields = ['id', 'log_level', 'tf_rpc', 'message']
+    rows = get_all_logs(db, fields=fields)
+    monkeypatch.setattr(log_dictionary, "load_dictionary", _no_queries)
+
+    records = loads(encode_log_rows(rows, fields))
+    assert [(record['log_level'], record['tf_rpc']) for record in records] == [("warn", "ApplyResourceChange")]
+
+
+def test_search_hits_are_decoded_without_queries(db, cold_cache, monkeypatch):
+    _save(db)
+    log_dictionary._values.clear()
+
+    hits = search_logs(db, "provider")
+    monkeypatch.setattr(log_dictionary, "load_dictionary", _no_queries)
+
+    log = hits[0][0]
+    assert isinstance(log, TerraformLog)
+    assert (log.log_level, log.tf_rpc, log.raw_data['@level']) == ("warn", "ApplyResourceChange", "warn")
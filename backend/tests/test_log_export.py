@@ -0,0 +1,66 @@
+import csv
+import gzip
+import io
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from app.main import app
+from app.models import Upload
+from app.services import log_export
+from app.services.log_export import EXPORT_FIELDS, iter_export
+from app.services.log_payloads import PAYLOAD_INLINE_LIMIT
+from app.services.log_service import get_all_logs, save_logs_to_db
+
+BODY = "x" * (PAYLOAD_INLINE_LIMIT + 1)
+
+
+def _save(db) -> int:
+    logs = [
+        {"@level": "error" if i % 2 else "info", "@message": f"line {i}", "tf_req_id": f"req-{i % 3}",
+         "tf_rpc": "ApplyResourceChange", "@timestamp": f"2025-09-09T12:31:{i:02d}.000000Z", "custom": i}
+        for i in range(7)
+    ]
+    logs[3]["tf_http_res_body"] = BODY
+    save_logs_to_db(db, logs, "export.json")
+    return db.query(func.max(Upload.id)).scalar()
+
+
+def _ndjson(content: bytes) -> list[dict]:
+    return [json.loads(line) for line in content.decode('utf-8').splitlines()]
+
+
+def test_ndjson_export_is_complete_and_in_list_order(db, monkeypatch):
+    monkeypatch.setattr(log_export, "EXPORT_BATCH_SIZE", 2)
+    upload_id = _save(db)
+
+    records = _ndjson(b''.join(iter_export('ndjson', upload_id=upload_id)))
+    assert [record['id'] for record in records] == [log.id for log in get_all_logs(db, upload_id=upload_id)]
+    assert {record['tf_rpc'] for record in records} == {"ApplyResourceChange"}
+    assert sorted(record['raw_data']['custom'] for record in records) == list(range(7))
+    assert [record['raw_data'].get('tf_http_res_body') for record in records].count(BODY) == 1
+
+
+def test_export_filters_and_gzip(db):
+    upload_id = _save(db)
+    plain = b''.join(iter_export('ndjson', level='error', upload_id=upload_id))
+    compressed = b''.join(iter_export('ndjson', compress=True, level='error', upload_id=upload_id))
+
+    assert gzip.decompress(compressed) == plain
+    assert sorted(record['message'] for record in _ndjson(plain)) == ["line 1", "line 3", "line 5"]
+
+
+def test_csv_export(db, monkeypatch):
+    monkeypatch.setattr(log_export, "EXPORT_BATCH_SIZE", 3)
+    upload_id = _save(db)
+
+    with TestClient(app) as client:
+        response = client.get("/api/logs/export", params={"format": "csv", "upload_id": upload_id})
+        assert response.status_code == 200
+        assert client.get("/api/logs/export", params={"format": "xml"}).status_code == 400
+
+    header, *rows = list(csv.reader(io.StringIO(response.text)))
+    assert tuple(header) == EXPORT_FIELDS
+    assert len(rows) == 7
+    assert sorted(json.loads(row[-1])['custom'] for row in rows) == list(range(7))
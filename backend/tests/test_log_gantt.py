@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from app.main import app
+from app.models import Upload
+from app.services.log_gantt import get_gantt_data
+from app.services.log_service import save_logs_to_db
+
+BASE_US = 1757421060000000
+
+
+def _save_requests(db, count: int) -> int:
+    logs = [
+        {"@level": "info", "@message": f"{edge} {i}", "tf_req_id": f"req-{i}", "tf_rpc": "ApplyResourceChange",
+         "@timestamp": f"2025-09-09T12:31:{i + second:02d}.000000Z"}
+        for i in range(count)
+        for edge, second in (("start", 0), ("end", 1))
+    ]
+    save_logs_to_db(db, logs, "gantt.json")
+    return db.query(func.max(Upload.id)).scalar()
+
+
+def test_window_is_clamped_to_the_extent(db):
+    upload_id = _save_requests(db, 20)
+    data = get_gantt_data(db, upload_id, start_us=-2 ** 63, end_us=2 ** 63 - 1, max_bars=10)
+
+    assert data['window'] == data['extent']
+    assert data['total'] == 20
+    assert sum(bucket['count'] for bucket in data['buckets']) + len(data['bars']) == 20
+    assert len(data['buckets']) + len(data['bars']) <= 10
+
+
+def test_window_outside_the_extent_is_empty(db):
+    upload_id = _save_requests(db, 3)
+    data = get_gantt_data(db, upload_id, start_us=2 ** 62, end_us=2 ** 63 - 1)
+    assert data['total'] == 0 and data['bars'] == [] and data['buckets'] == []
+
+
+def test_sparse_window_returns_bars(db):
+    upload_id = _save_requests(db, 20)
+    data = get_gantt_data(db, upload_id, start_us=BASE_US + 2_000_000, end_us=BASE_US + 4_000_000)
+    assert [bar['tf_req_id'] for bar in data['bars']] == ['req-1', 'req-2', 'req-3', 'req-4']
+    assert data['buckets'] == []
+
+
+def test_inverted_window_is_rejected(db):
+    with TestClient(app) as client:
+        response = client.get("/api/gantt", params={'start_us': 2, 'end_us': 1})
+    assert response.status_code == 400
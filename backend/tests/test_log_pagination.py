@@ -0,0 +1,48 @@
+import pytest
+
+from app.models import Upload
+from app.services.log_pagination import encode_cursor
+from app.services.log_service import get_all_logs, save_logs_to_db
+
+
+def _save(db) -> int:
+    logs = []
+    for i in range(12):
+        entry = {"@level": "error" if i % 3 == 0 else "info", "@message": f"line {i}"}
+        if i % 4:
+            entry["tf_req_id"] = f"req-{i % 2}"
+        if i % 5:
+            entry["@timestamp"] = f"2025-09-09T12:31:{i % 6:02d}.000000Z"
+        logs.append(entry)
+    save_logs_to_db(db, logs, "pages.json")
+    return db.query(Upload.id).order_by(Upload.id.desc()).limit(1).scalar()
+
+
+def _pages(db, group_by_request_id: bool, **filters) -> list[list[str]]:
+    pages, cursor = [], None
+    while True:
+        logs = get_all_logs(db, limit=5, cursor=cursor, group_by_request_id=group_by_request_id, **filters)
+        if not logs:
+            return pages
+        pages.append([log.message for log in logs])
+        cursor = encode_cursor(logs[-1], group_by_request_id)
+
+
+@pytest.mark.parametrize('group_by_request_id', [True, False])
+@pytest.mark.parametrize('level', [None, 'error'])
+def test_cursor_pages_match_the_full_ordering(db, group_by_request_id, level):
+    upload_id = _save(db)
+    everything = get_all_logs(db, limit=100, group_by_request_id=group_by_request_id, level=level, upload_id=upload_id)
+
+    pages = _pages(db, group_by_request_id, level=level, upload_id=upload_id)
+    assert [message for page in pages for message in page] == [log.message for log in everything]
+    assert all(len(page) == 5 for page in pages[:-1])
+
+
+def test_cursor_of_another_ordering_is_rejected(db):
+    _save(db)
+    log = get_all_logs(db, limit=1)[0]
+    with pytest.raises(ValueError):
+        get_all_logs(db, cursor=encode_cursor(log, True), group_by_request_id=False)
+    with pytest.raises(ValueError):
+        get_all_logs(db, cursor="not a cursor")
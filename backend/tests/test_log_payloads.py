@@ -0,0 +1,63 @@
+import zlib
+
+from sqlalchemy import create_engine, text
+
+from app.database import run_migrations
+from app.json_codec import dumps_json
+from app.models import LogPayload, TerraformLog
+from app.services.log_payloads import PAYLOAD_INLINE_LIMIT, get_log_payload
+from app.services.log_search import InvertedIndex
+from app.services.log_service import get_all_logs, save_logs_to_db
+from app.services.uploads import delete_upload
+
+LONG_MESSAGE = "x" * (PAYLOAD_INLINE_LIMIT * 3) + " needle at the end"
+
+
+def _save(db, entries):
+    save_logs_to_db(db, entries, "payloads.json")
+    return db.query(TerraformLog).order_by(TerraformLog.id.desc()).limit(1).one()
+
+
+def test_long_message_is_stored_searched_and_filtered_in_full(db):
+    body = "y" * (PAYLOAD_INLINE_LIMIT * 2)
+    entry = {"@level": "error", "@message": LONG_MESSAGE, "@timestamp": "2025-09-09T15:31:32.000000+03:00",
+             "tf_http_res_body": body}
+    log = _save(db, [entry])
+
+    assert log.message == LONG_MESSAGE
+    # Only the residual value goes out of line
+    assert db.get(LogPayload, log.id) is not None
+    assert get_log_payload(db, log.id) == entry
+
+    assert [row.id for row in get_all_logs(db, message_contains="needle at the end")] == [log.id]
+    hits = InvertedIndex().search(db, "needle at the end", 'substring', 10)
+    assert [hit.id for hit, _ in hits] == [log.id]
+
+
+def test_payloads_are_deleted_with_their_upload(db):
+    entry = {"@level": "info", "@message": "body", "tf_http_res_body": "y" * (PAYLOAD_INLINE_LIMIT * 2)}
+    kept = _save(db, [entry]).id
+    deleted = _save(db, [entry])
+    deleted_id = deleted.id
+
+    delete_upload(db, deleted.upload_id)
+
+    assert db.get(LogPayload, deleted_id) is None
+    assert db.get(LogPayload, kept) is not None
+
+
+def test_preview_messages_are_restored_by_the_migration(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'preview.db'}")
+    run_migrations(engine, revision="0018")
+    payload = zlib.compress(dumps_json({"@message": LONG_MESSAGE}).encode('utf-8'))
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO terraform_logs (id, upload_id, message, payload_size) VALUES (1, 1, :preview, 1)"
+        ), {'preview': LONG_MESSAGE[:PAYLOAD_INLINE_LIMIT]})
+        connection.execute(text("INSERT INTO log_payloads (log_id, upload_id, data) VALUES (1, 1, :data)"),
+                           {'data': payload})
+
+    run_migrations(engine)
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT message FROM terraform_logs")).scalar() == LONG_MESSAGE
@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from app.main import app
+from app.models import Upload
+from app.services.log_projection import LOG_FIELDS, parse_fields
+from app.services.log_service import save_logs_to_db
+
+
+@pytest.fixture
+def upload_id(db) -> int:
+    logs = [
+        {"@level": "info", "@message": f"line {i}", "tf_req_id": f"req-{i % 2}", "tf_rpc": "ReadResource",
+         "@timestamp": f"2025-09-09T12:31:{i:02d}.000000Z", "custom": i}
+        for i in range(5)
+    ]
+    save_logs_to_db(db, logs, "fields.json")
+    return db.query(func.max(Upload.id)).scalar()
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(app) as client:
+        yield client
+
+
+def test_parse_fields():
+    assert parse_fields(None) == list(LOG_FIELDS)
+    assert parse_fields(" message, log_level ,") == ['id', 'log_level', 'message']
+    with pytest.raises(ValueError, match="secret"):
+        parse_fields("message,secret")
+
+
+def test_logs_return_only_the_requested_fields(client, upload_id):
+    full = client.get("/api/logs", params={"upload_id": upload_id}).json()
+    projected = client.get("/api/logs", params={"upload_id": upload_id, "fields": "message,tf_rpc"}).json()
+
+    assert set(full[0]) == set(LOG_FIELDS)
+    assert projected == [{key: log[key] for key in ('id', 'message', 'tf_rpc')} for log in full]
+    assert sorted(log['raw_data']['custom'] for log in full) == list(range(5))
+    assert client.get("/api/logs", params={"fields": "secret"}).status_code == 400
+
+
+def test_projected_pages_carry_the_cursor(client, upload_id):
+    params = {"upload_id": upload_id, "fields": "message", "limit": 2}
+    messages, cursor = [], None
+    while True:
+        response = client.get("/api/logs", params={**params, "cursor": cursor} if cursor else params)
+        messages += [log['message'] for log in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    full = client.get("/api/logs", params={"upload_id": upload_id}).json()
+    assert messages == [log['message'] for log in full]
+
+
+def test_logs_by_request_with_fields(client, upload_id):
+    logs = client.get("/api/logs/by-request/req-1", params={"upload_id": upload_id, "fields": "raw_data"}).json()
+    assert [set(log) for log in logs] == [{'id', 'raw_data'}] * 2
+    assert [log['raw_data']['custom'] for log in logs] == [1, 3]
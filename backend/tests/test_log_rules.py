@@ -0,0 +1,62 @@
+import pytest
+
+from app.services.log_rules import NO_MATCH, RuleEngine, classify_entry, parse_rule
+from app.services.log_sections import SectionType
+
+
+def _engine(*rules: dict) -> RuleEngine:
+    return RuleEngine([parse_rule(rule) for rule in rules], section_type=SectionType)
+
+
+def test_default_rules_mark_sections():
+    assert classify_entry({"@message": "backend/local: starting Plan operation"}).section_start == SectionType.PLAN
+    assert classify_entry({"@message": "summary", "type": "change_summary"}).section_end == SectionType.PLAN
+    assert classify_entry({"@message": "nothing to see"}).section_start is None
+
+
+def test_first_matching_rule_wins_and_tags_are_merged():
+    engine = _engine(
+        {"name": "panic", "regex": "^panic: ", "level": "error", "tags": {"error_kind": "panic"}},
+        {"name": "error", "contains": "ERROR", "ignore_case": True, "level": "warn",
+         "tags": {"error_kind": "other", "source": "rules"}},
+        {"name": "apply", "equals": "apply_complete", "field": "type", "section_end": "apply"},
+    )
+
+    result = engine.classify("panic: runtime error", "apply_complete")
+    assert result.level == "error"
+    assert result.tags == {"error_kind": "panic", "source": "rules"}
+    assert result.section_end == SectionType.APPLY
+    assert engine.classify("an Error occurred").level == "warn"
+    assert engine.classify("all good", None) is NO_MATCH
+    # Results are built once per combination of matching rules
+    assert engine.classify("error 1") is engine.classify("error 2")
+
+
+def test_patterns_are_matched_literally():
+    engine = _engine(
+        {"name": "braces", "contains": '{"error": {}}', "level": "error"},
+        {"name": "quotes", "equals": "it's \\ \"done\"", "tags": {"quoted": "yes"}},
+    )
+    assert engine.classify('body {"error": {}} returned').level == "error"
+    assert engine.classify("it's \\ \"done\"").tags == {"quoted": "yes"}
+    assert engine.classify("{}") is NO_MATCH
+
+
+@pytest.mark.parametrize('rule, message', [
+    ({"name": "none", "level": "error"}, "exactly one of"),
+    ({"name": "two", "contains": "a", "regex": "b", "level": "error"}, "exactly one of"),
+    ({"name": "empty", "contains": "", "level": "error"}, "non-empty"),
+    ({"name": "field", "contains": "a", "field": "module", "level": "error"}, "unknown field"),
+    ({"name": "type", "contains": "a", "field": "type", "level": "error"}, "only equals"),
+    ({"name": "regex", "regex": "(", "level": "error"}, "invalid regex"),
+    ({"name": "tags", "contains": "a", "tags": ["x"]}, "tags must be"),
+    ({"name": "noop", "contains": "a"}, "no section_start"),
+])
+def test_invalid_rules_are_rejected(rule, message):
+    with pytest.raises(ValueError, match=message):
+        parse_rule(rule)
+
+
+def test_unknown_section_is_rejected_when_the_engine_is_built():
+    with pytest.raises(ValueError, match="unknown section"):
+        _engine({"name": "destroy", "contains": "Destroying", "section_start": "destroy"})
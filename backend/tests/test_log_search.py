@@ -0,0 +1,83 @@
+from sqlalchemy import event
+
+from app.services import log_search
+from app.services.log_search import InvertedIndex
+from app.services.log_service import save_logs_to_db
+from app.services.uploads import delete_upload
+
+
+def _save(db, messages):
+    logs = [{"@level": "info", "@message": message, "@timestamp": "2025-09-09T15:31:32.000000+03:00"}
+            for message in messages]
+    save_logs_to_db(db, logs, "search.json")
+    return db.query(log_search.Upload.id).order_by(log_search.Upload.id.desc()).limit(1).scalar()
+
+
+def _found(index, db, query):
+    return sorted(log.message for log, _ in index.search(db, query, 'substring', 100))
+
+
+def test_index_follows_ingest_and_delete(db):
+    index = InvertedIndex()
+    first = _save(db, ["provider started", "unrelated"])
+    assert _found(index, db, "provider") == ["provider started"]
+
+    second = _save(db, ["provider stopped"])
+    assert _found(index, db, "provider") == ["provider started", "provider stopped"]
+
+    delete_upload(db, first)
+    assert _found(index, db, "provider") == ["provider stopped"]
+    assert index.upload_ids == {second}
+
+
+def test_search_without_new_data_does_not_rescan_the_table(db):
+    index = InvertedIndex()
+    _save(db, ["provider started"])
+    index.search(db, "provider", 'substring', 100)
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    engine = db.get_bind()
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        index.search(db, "provider", 'substring', 100)
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    assert not any('count(' in statement.lower() for statement in statements)
+    assert not any('uploads' in statement.lower() for statement in statements)
+
+
+def test_full_index_still_finds_rows_it_does_not_hold(db, monkeypatch):
+    monkeypatch.setattr(log_search, 'FALLBACK_MAX_POSTINGS', 20)
+    index = InvertedIndex()
+    _save(db, ["provider started", "provider running for a long time", "provider stopped"])
+    assert _found(index, db, "provider") == [
+        "provider running for a long time", "provider started", "provider stopped"
+    ]
+    assert index.full and index.posting_count <= 20
+
+
+def test_message_contains_filter_matches_like_substring_search(db):
+    from app.models import TerraformLog
+    from app.services.log_service import filter_logs
+
+    upload_id = _save(db, ["Provider started", "50% done", "500 done", "unrelated"])
+
+    def filtered(value, **filters):
+        query = filter_logs(db.query(TerraformLog), message_contains=value, **filters)
+        return sorted(log.message for log in query)
+
+    assert filtered("provider", upload_id=upload_id) == ["Provider started"]
+    assert filtered("0%", upload_id=upload_id) == ["50% done"]
+    _save(db, ["provider stopped"])
+    assert filtered("PROVIDER") == ["Provider started", "provider stopped"]
+
+
+def test_index_is_rebuilt_when_a_deleted_upload_id_is_reused(db):
+    index = InvertedIndex()
+    first = _save(db, ["provider started"])
+    assert _found(index, db, "provider") == ["provider started"]
+
+    delete_upload(db, first)
+    _save(db, ["plugin exited"])
+    assert _found(index, db, "plugin") == ["plugin exited"]
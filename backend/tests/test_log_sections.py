@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from sqlalchemy import func
+
+from app.models import Upload
+from app.services.log_service import (
+    get_section_logs, get_sections_from_db, parse_terraform_log_with_sections, save_logs_to_db
+)
+
+MESSAGES = [
+    "before any section",
+    "backend/local: starting Plan operation",
+    "planning",
+    "Plan: 1 to add, 0 to change, 0 to destroy.",
+    "between sections",
+    "backend/local: starting Apply operation",
+    "applying",
+    "Initializing the backend...",
+    "Terraform has been successfully initialized!",
+    "backend/local: starting Apply operation",
+    "still applying",
+]
+
+SECTIONS = [('plan', 1, 3, 3), ('apply', 5, 6, 2), ('init', 7, 8, 2), ('apply', 9, 10, 2)]
+
+
+def _logs() -> list[dict]:
+    return [
+        {"@level": "info", "@message": message, "@timestamp": f"2025-09-09T12:31:{i:02d}.000000Z"}
+        for i, message in enumerate(MESSAGES)
+    ]
+
+
+def test_sections_of_a_parsed_log():
+    content = '\n'.join(json.dumps(log) for log in _logs())
+    sections = parse_terraform_log_with_sections(content, "sections.json")['sections']
+
+    assert [(s['type'], s['start_index'], s['end_index'], s['log_count']) for s in sections] == SECTIONS
+    assert sections[0]['start_timestamp'] == "2025-09-09T12:31:01.000000Z"
+    assert sections[0]['end_timestamp'] == "2025-09-09T12:31:03.000000Z"
+
+
+@pytest.mark.parametrize('batch_size', [1, 4, 1000])
+def test_sections_detected_during_ingest_do_not_depend_on_batches(db, batch_size):
+    save_logs_to_db(db, _logs(), "sections.json", batch_size=batch_size)
+    upload_id = db.query(func.max(Upload.id)).scalar()
+
+    sections = get_sections_from_db(db, upload_id)['sections']
+    assert [(s.type, s.start_index, s.end_index, s.log_count) for s in sections] == SECTIONS
+    for section in sections:
+        logs = get_section_logs(db, section.id)
+        assert [log.message for log in logs] == MESSAGES[section.start_index:section.end_index + 1]
+
+
+def test_section_logs_are_paged_by_id(db):
+    save_logs_to_db(db, _logs(), "sections.json")
+    upload_id = db.query(func.max(Upload.id)).scalar()
+    plan = get_sections_from_db(db, upload_id)['sections'][0]
+
+    first = get_section_logs(db, plan.id, limit=2)
+    rest = get_section_logs(db, plan.id, limit=2, after_id=first[-1].id)
+    assert [log.message for log in first + rest] == MESSAGES[1:4]
+    assert get_section_logs(db, -1) is None
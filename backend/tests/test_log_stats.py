@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import func
+
+from app.models import Upload
+from app.services.log_stats import bucket_upper_bound, duration_bucket, get_stats
+from app.services.log_service import save_logs_to_db
+from app.services.uploads import delete_upload
+
+
+def _save(db, durations: list[int], rpc: str = "ApplyResourceChange") -> int:
+    logs = [
+        {"@level": "info", "@message": f"call {i}", "tf_rpc": rpc, "tf_req_duration_ms": duration}
+        for i, duration in enumerate(durations)
+    ]
+    logs += [
+        {"@level": "error", "@message": "failed", "tf_resource_type": "aws_s3_bucket"},
+        {"@level": "info", "@message": "backend/local: starting Plan operation"},
+        {"@level": "info", "@message": "Plan: 1 to add, 0 to change, 0 to destroy."},
+    ]
+    save_logs_to_db(db, logs, "stats.json", batch_size=3)
+    return db.query(func.max(Upload.id)).scalar()
+
+
+@pytest.mark.parametrize('duration_ms', [0, 1, 2, 3, 7, 8, 100, 1000, 123456])
+def test_bucket_bounds_its_durations(duration_ms):
+    bucket = duration_bucket(duration_ms)
+    assert duration_ms <= bucket_upper_bound(bucket) <= duration_ms * 1.1 + 0.5
+
+
+def test_stats_count_every_dimension(db):
+    upload_id = _save(db, list(range(1, 101)))
+    stats = get_stats(db, upload_id)
+
+    assert stats['total_logs'] == 103
+    assert stats['levels'] == [{'value': 'info', 'count': 102}, {'value': 'error', 'count': 1}]
+    assert stats['rpcs'] == [{'value': 'ApplyResourceChange', 'count': 100}, {'value': None, 'count': 3}]
+    assert {'value': 'aws_s3_bucket', 'count': 1} in stats['resource_types']
+    assert stats['sections'] == [{'value': 'plan', 'count': 1, 'log_count': 2}]
+
+    (durations,) = stats['rpc_durations']
+    assert durations['rpc'] == 'ApplyResourceChange' and durations['count'] == 100
+    for percentile in (50, 90, 95, 99):
+        assert percentile <= durations[f"p{percentile}"] <= percentile * 1.1
+    assert 100 <= durations['max'] <= 110
+
+
+def test_stats_of_all_uploads_lose_a_deleted_upload(db):
+    first = _save(db, [10, 20])
+    second = _save(db, [30], rpc="ReadResource")
+    assert get_stats(db)['total_logs'] == 9
+
+    delete_upload(db, first)
+    assert get_stats(db) == get_stats(db, second)
+    assert get_stats(db)['total_logs'] == 4
+    assert [item['rpc'] for item in get_stats(db)['rpc_durations']] == ['ReadResource']
@@ -0,0 +1,91 @@
+import json
+import time
+
+import pytest
+
+from app.services import log_parallel, log_stream
+from app.services.log_parallel import is_jsonl_file
+from app.services.log_stream import iter_log_entries
+
+
+def _chunks(data: bytes, size: int = 7):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+ENTRIES = [{"@level": "info", "@message": f"line\n{i}", "i": i} for i in range(3)]
+
+
+def test_pretty_printed_object_is_one_entry():
+    data = json.dumps(ENTRIES[0], indent=2).encode()
+    assert list(iter_log_entries(_chunks(data))) == [ENTRIES[0]]
+
+
+def test_concatenated_pretty_printed_objects():
+    data = b''.join(json.dumps(entry, indent=2).encode() + b'\n' for entry in ENTRIES)
+    assert list(iter_log_entries(_chunks(data))) == ENTRIES
+
+
+def test_jsonl_skips_invalid_lines():
+    data = b'\n\n' + b'\n'.join(json.dumps(entry).encode() for entry in ENTRIES) + b'\n{broken\n[1]\n'
+    assert list(iter_log_entries(_chunks(data))) == ENTRIES
+
+
+def test_truncated_first_line_falls_back_to_jsonl():
+    data = json.dumps(ENTRIES[0]).encode()[:-5] + b'\n' + b'\n'.join(json.dumps(entry).encode() for entry in ENTRIES[1:])
+    assert list(iter_log_entries(_chunks(data))) == ENTRIES[1:]
+
+
+def test_array_without_closing_bracket_is_accepted():
+    data = json.dumps(ENTRIES).encode()[:-1]
+    assert list(iter_log_entries(_chunks(data))) == ENTRIES
+
+
+def test_malformed_array_element_raises():
+    data = json.dumps(ENTRIES).encode()[:-10]
+    with pytest.raises(ValueError):
+        list(iter_log_entries(_chunks(data)))
+
+
+def test_oversized_array_element_raises(monkeypatch):
+    monkeypatch.setattr(log_stream, 'MAX_ENTRY_SIZE', 1000)
+    data = json.dumps([ENTRIES[0], {"@message": "x" * 5000}, ENTRIES[1]]).encode()
+    with pytest.raises(ValueError):
+        list(iter_log_entries(_chunks(data, 100)))
+
+
+def test_oversized_jsonl_line_is_skipped(monkeypatch):
+    monkeypatch.setattr(log_stream, 'MAX_ENTRY_SIZE', 1000)
+    lines = [json.dumps(ENTRIES[0]), json.dumps({"@message": "x" * 5000}), json.dumps(ENTRIES[1])]
+    data = '\n'.join(lines).encode()
+    assert list(iter_log_entries(_chunks(data, 100))) == ENTRIES[:2]
+
+
+def test_long_jsonl_line_is_split_in_linear_time():
+    entry = {"@message": "x" * (16 * 1024 * 1024)}
+    data = json.dumps(ENTRIES[0]).encode() + b'\n' + json.dumps(entry).encode() + b'\n'
+    started = time.perf_counter()
+    # Re-splitting the whole buffer on every 4 KiB chunk would take minutes here
+    entries = list(iter_log_entries(_chunks(data, 4096)))
+    assert time.perf_counter() - started < 10
+    assert entries == [ENTRIES[0], entry]
+
+
+@pytest.mark.parametrize('entries, expected', [
+    ([json.dumps(ENTRIES[0])[:-5], json.dumps(ENTRIES[1])], True),
+    ([json.dumps(ENTRIES[0], indent=2)], False),
+    (['[', json.dumps(ENTRIES[0]), ']'], False),
+])
+def test_is_jsonl_file(tmp_path, entries, expected):
+    path = tmp_path / 'log.json'
+    path.write_text('\n'.join(entries))
+    assert is_jsonl_file(str(path)) is expected
+
+
+def test_parallel_range_skips_oversized_line(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_parallel, 'MAX_ENTRY_SIZE', 1000)
+    lines = [json.dumps(ENTRIES[0]), json.dumps({"@message": "x" * 5000}), json.dumps(ENTRIES[1])]
+    path = tmp_path / 'log.json'
+    path.write_text('\n'.join(lines) + '\n')
+    ranges = log_parallel.split_byte_ranges(str(path), range_size=100)
+    entries = [entry for start, end in ranges for entry in log_parallel.parse_byte_range(str(path), start, end).entries]
+    assert [entry['i'] for entry in entries] == [0, 1]
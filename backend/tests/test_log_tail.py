@@ -0,0 +1,122 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import LogSectionRecord, TailSession, TerraformLog
+from app.services import log_tail
+from app.services.log_fixing import LogSequenceFixer
+from app.services.log_sections import SectionDetector
+from app.services.log_tail import LogTailer
+from app.services.uploads import create_upload
+
+
+@pytest.fixture(autouse=True)
+def tail_sessions(db):
+    yield
+    db.rollback()
+    db.query(TailSession).delete()
+    db.commit()
+
+
+def _line(message: str) -> bytes:
+    entry = {"@level": "info", "@message": message, "@timestamp": "2025-09-09T15:31:32.000000+03:00"}
+    return json.dumps(entry).encode() + b'\n'
+
+
+def _tailer(db, path):
+    upload = create_upload(db, "tail.json")
+    tail = TailSession(path=str(path), upload_id=upload.id, status="running", byte_offset=0, entries_count=0)
+    db.add(tail)
+    db.commit()
+    tailer = LogTailer(tail.id)
+    tailer.fixer = LogSequenceFixer()
+    tailer.sections = SectionDetector()
+    return tailer, tail, upload
+
+
+def _poll_until_idle(tailer, db, tail, upload):
+    while tailer.poll(db, tail, upload):
+        pass
+
+
+def _messages(db, upload):
+    return [message for message, in db.query(TerraformLog.message)
+            .filter(TerraformLog.upload_id == upload.id).order_by(TerraformLog.id)]
+
+
+def test_line_longer_than_the_read_size_is_ingested(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(log_tail, "TAIL_READ_SIZE", 64)
+    path = tmp_path / "terraform.log"
+    long_message = "x" * 1000
+    path.write_bytes(_line("first") + _line(long_message)[:500])
+    tailer, tail, upload = _tailer(db, path)
+
+    _poll_until_idle(tailer, db, tail, upload)
+    assert _messages(db, upload) == ["first"]
+
+    with open(path, 'ab') as f:
+        f.write(_line(long_message)[500:] + _line("last"))
+    _poll_until_idle(tailer, db, tail, upload)
+    assert _messages(db, upload) == ["first", long_message, "last"]
+    assert tail.byte_offset == path.stat().st_size
+
+
+def test_line_longer_than_the_entry_limit_is_skipped(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(log_tail, "TAIL_READ_SIZE", 64)
+    monkeypatch.setattr(log_tail, "MAX_ENTRY_SIZE", 256)
+    path = tmp_path / "terraform.log"
+    path.write_bytes(_line("x" * 1000) + _line("after"))
+    tailer, tail, upload = _tailer(db, path)
+
+    _poll_until_idle(tailer, db, tail, upload)
+    assert _messages(db, upload) == ["after"]
+    assert tail.byte_offset == path.stat().st_size
+
+
+def test_session_leased_by_a_live_worker_is_not_claimed(db, tmp_path):
+    _, tail, _ = _tailer(db, tmp_path / "terraform.log")
+    tail.lease_owner = "other-host:1"
+    tail.lease_expires_at = datetime.utcnow() + timedelta(minutes=1)
+    db.commit()
+    assert not log_tail.claim_tail(db, tail.id)
+
+    # The other worker died and its lease ran out
+    tail.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    assert log_tail.claim_tail(db, tail.id)
+    db.commit()
+    db.refresh(tail)
+    assert tail.lease_owner == log_tail._lease_owner()
+
+
+def _follow(db, tail, entries_count, resume_later):
+    tailer = LogTailer(tail.id)
+    tailer.start()
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        db.expire_all()
+        if db.get(TailSession, tail.id).entries_count == entries_count:
+            break
+        time.sleep(0.01)
+    tailer.resume_later = resume_later
+    tailer.stop()
+    tailer.join()
+
+
+def test_resumed_session_continues_the_open_section(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(log_tail, "TAIL_POLL_INTERVAL", 0.01)
+    path = tmp_path / "terraform.log"
+    path.write_bytes(_line("backend/local: starting Plan operation") + _line("planning"))
+    _, tail, upload = _tailer(db, path)
+
+    _follow(db, tail, 2, resume_later=True)
+    with open(path, 'ab') as f:
+        f.write(_line("Plan: 1 to add, 0 to change, 0 to destroy."))
+    _follow(db, tail, 3, resume_later=False)
+
+    sections = db.query(LogSectionRecord).filter(LogSectionRecord.upload_id == upload.id).all()
+    assert [(s.type, s.start_index, s.end_index, s.log_count) for s in sections] == [('plan', 0, 2, 3)]
+    db.refresh(tail)
+    assert tail.status == "stopped" and tail.lease_owner is None
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.log_service import get_all_logs, save_logs_to_db
+from app.services.log_timestamps import format_timestamp_us, parse_timestamp_us, to_epoch_us
+
+
+@pytest.mark.parametrize('value', [
+    "2025-09-09T12:31:32.500000Z",
+    "2025-09-09T15:31:32.500000+03:00",
+    "2025-09-09T08:01:32.500000-04:30",
+    "2025-09-09T12:31:32.500000",
+])
+def test_offsets_are_normalized(value):
+    assert parse_timestamp_us(value) == 1757421092500000
+    assert format_timestamp_us(parse_timestamp_us(value)) == "2025-09-09T12:31:32.500000+00:00"
+
+
+@pytest.mark.parametrize('value', [None, "", "yesterday", 1757421092, {"t": 1}])
+def test_unparseable_timestamps_are_none(value):
+    assert parse_timestamp_us(value) is None
+
+
+def test_naive_datetimes_are_utc():
+    aware = datetime(2025, 9, 9, 15, 31, 32, 1, tzinfo=timezone(timedelta(hours=3)))
+    assert to_epoch_us(aware) == to_epoch_us(datetime(2025, 9, 9, 12, 31, 32, 1)) == 1757421092000001
+
+
+def test_range_filter_compares_instants_across_offsets(db):
+    logs = [
+        {"@level": "info", "@message": "utc", "@timestamp": "2025-09-09T12:00:00.000000Z"},
+        {"@level": "info", "@message": "moscow", "@timestamp": "2025-09-09T14:30:00.000000+03:00"},
+        {"@level": "info", "@message": "new york", "@timestamp": "2025-09-09T09:00:00.000000-04:00"},
+        {"@level": "info", "@message": "no time"},
+    ]
+    save_logs_to_db(db, logs, "offsets.json")
+
+    window = get_all_logs(
+        db,
+        start_timestamp=datetime(2025, 9, 9, 11, 0, tzinfo=timezone.utc),
+        end_timestamp=datetime(2025, 9, 9, 15, 30, tzinfo=timezone(timedelta(hours=3))),
+        group_by_request_id=False,
+    )
+    assert [log.message for log in window] == ["moscow", "utc"]
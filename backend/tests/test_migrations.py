@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.database import run_migrations
+
+
+def _legacy_database(path, with_timestamp_us: bool):
+    """A database as Base.metadata.create_all left it before Alembic, with one stored log."""
+    engine = create_engine(f"sqlite:///{path}")
+    run_migrations(engine, revision="0001")
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+        if with_timestamp_us:
+            # Created by the models of the timestamp_us change, before its migration existed
+            connection.execute(text("ALTER TABLE terraform_logs ADD COLUMN timestamp_us BIGINT"))
+            connection.execute(text("CREATE INDEX ix_terraform_logs_timestamp_us ON terraform_logs (timestamp_us)"))
+            connection.execute(text("CREATE TABLE ingest_jobs (id INTEGER PRIMARY KEY, filename VARCHAR)"))
+        connection.execute(text(
+            "INSERT INTO terraform_logs (id, filename, timestamp, message) "
+            "VALUES (1, 'old.json', '2025-09-09T15:31:32.000000+03:00', 'stored before timestamp_us')"
+        ))
+    return engine
+
+
+@pytest.mark.parametrize('with_timestamp_us', [False, True])
+def test_create_all_databases_are_upgraded_and_backfilled(tmp_path, with_timestamp_us):
+    engine = _legacy_database(tmp_path / "legacy.db", with_timestamp_us)
+
+    run_migrations(engine)
+
+    with engine.connect() as connection:
+        timestamp_us = connection.execute(text("SELECT timestamp_us FROM terraform_logs")).scalar()
+        assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() is not None
+    assert timestamp_us == 1757421092000000
+
+
+def test_rows_with_per_row_upload_times_are_grouped_into_uploads(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    run_migrations(engine, revision="0001")
+    rows = [
+        # Every row of a stored log got its own uploaded_at
+        ('plan.json', '2025-09-09 12:00:00.000001', 'backend/local: starting Plan operation'),
+        ('plan.json', '2025-09-09 12:00:00.000002', 'planning'),
+        ('plan.json', '2025-09-09 12:00:00.000003', 'Plan: 1 to add, 0 to change, 0 to destroy.'),
+        ('other.json', '2025-09-09 12:01:00.000001', 'unrelated'),
+        ('other.json', '2025-09-09 12:01:00.000002', 'unrelated'),
+        # The same file uploaded again later
+        ('plan.json', '2025-09-09 13:00:00.000001', 'again'),
+        ('plan.json', '2025-09-09 13:00:00.000002', 'again'),
+    ]
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO terraform_logs (filename, uploaded_at, message) "
+                "VALUES (:filename, :uploaded_at, :message)"
+            ),
+            [dict(zip(('filename', 'uploaded_at', 'message'), row)) for row in rows]
+        )
+
+    run_migrations(engine)
+
+    with engine.connect() as connection:
+        uploads = connection.execute(text("SELECT id, filename, log_count FROM uploads ORDER BY id")).all()
+        log_uploads = connection.execute(text("SELECT upload_id FROM terraform_logs ORDER BY id")).scalars().all()
+        sections = connection.execute(text("SELECT upload_id, type, log_count FROM sections")).all()
+    assert uploads == [(1, 'plan.json', 3), (2, 'other.json', 2), (3, 'plan.json', 2)]
+    assert log_uploads == [1, 1, 1, 2, 2, 3, 3]
+    assert sections == [(1, 'plan', 3)]
@@ -0,0 +1,61 @@
+from sqlalchemy import func
+
+from app.models import RequestSummary, Upload
+from app.services.log_service import save_logs_to_db
+from app.services.request_summary import RequestSummaryAccumulator, _merge_with_orm, merge_request_summaries
+
+LOGS = [
+    {"@level": "info", "@message": "middle", "tf_req_id": "req-a", "@timestamp": "2025-09-09T12:31:05.000000Z"},
+    {"@level": "info", "@message": "no time", "tf_req_id": "req-a", "tf_rpc": "ApplyResourceChange"},
+    {"@level": "info", "@message": "first", "tf_req_id": "req-a", "@timestamp": "2025-09-09T12:31:01.000000Z",
+     "tf_req_duration_ms": 40},
+    {"@level": "info", "@message": "last", "tf_req_id": "req-a", "@timestamp": "2025-09-09T12:31:09.000000Z",
+     "tf_req_duration_ms": 25},
+    {"@level": "info", "@message": "other", "tf_req_id": "req-b", "tf_resource_type": "aws_s3_bucket"},
+    {"@level": "info", "@message": "no request"},
+]
+
+COLUMNS = ('tf_req_id', 'tf_rpc', 'tf_resource_type', 'start_us', 'end_us', 'start_timestamp', 'end_timestamp',
+           'log_count', 'tf_req_duration_ms')
+
+
+def _summaries(db, upload_id: int) -> list[tuple]:
+    rows = db.query(RequestSummary).filter(RequestSummary.upload_id == upload_id).order_by(RequestSummary.tf_req_id)
+    return [tuple(getattr(row, column) for column in COLUMNS) for row in rows]
+
+
+def _save(db, batch_size: int) -> int:
+    save_logs_to_db(db, LOGS, "summary.json", batch_size=batch_size)
+    return db.query(func.max(Upload.id)).scalar()
+
+
+def test_summary_spans_out_of_order_and_untimed_rows(db):
+    (req_a, req_b) = _summaries(db, _save(db, batch_size=1000))
+
+    assert req_a[:2] == ('req-a', 'ApplyResourceChange')
+    assert req_a[5].endswith('12:31:01.000000Z') and req_a[6].endswith('12:31:09.000000Z')
+    assert req_a[3] < req_a[4]
+    assert req_a[7:] == (4, 40)
+    assert req_b == ('req-b', None, 'aws_s3_bucket', None, None, None, None, 1, None)
+
+
+def test_summary_is_the_same_when_merged_per_batch(db):
+    whole = _summaries(db, _save(db, batch_size=1000))
+    batched = _summaries(db, _save(db, batch_size=1))
+    assert batched == whole
+
+
+def test_orm_merge_matches_the_upsert(db):
+    upload_id = _save(db, batch_size=1000)
+    expected = _summaries(db, upload_id)
+
+    for merge in (merge_request_summaries, _merge_with_orm):
+        db.query(RequestSummary).filter(RequestSummary.upload_id == upload_id).delete()
+        for log in LOGS:
+            accumulator = RequestSummaryAccumulator(upload_id)
+            accumulator.add({'tf_req_id': log.get('tf_req_id'), 'tf_rpc': log.get('tf_rpc'),
+                             'tf_resource_type': log.get('tf_resource_type')}, log.get('tf_req_duration_ms'))
+            if accumulator.pending:
+                merge(db, list(accumulator.pending.values()))
+        db.flush()
+        assert [row[:3] + row[7:] for row in _summaries(db, upload_id)] == [row[:3] + row[7:] for row in expected]
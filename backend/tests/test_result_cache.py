@@ -0,0 +1,18 @@
+from app.services.result_cache import LocalBackend, ResultCache
+
+
+def test_keys_of_another_process_never_match():
+    first, second = ResultCache(8, LocalBackend()), ResultCache(8, LocalBackend())
+    params = {'upload_id': 1}
+    assert first.key('stats', params) == first.key('stats', params)
+    # Both start at their first generation, e.g. after a restart or in another worker
+    assert first.key('stats', params) != second.key('stats', params)
+
+
+def test_invalidate_starts_a_new_generation():
+    cache = ResultCache(8, LocalBackend())
+    key = cache.key('stats', {})
+    cache.set(key, b'{}')
+    cache.invalidate()
+    assert cache.key('stats', {}) != key
+    assert cache.get(key) is None
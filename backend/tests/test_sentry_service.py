@@ -0,0 +1,76 @@
+from app.models import SentryFingerprint, SentryForwardJob, Upload
+from app.services.log_service import save_logs_to_db
+from app.services.sentry_service import _forward_upload
+
+
+class RecordingForwarder:
+    """Stands in for SentryForwarder: every submitted event is delivered."""
+
+    def __init__(self, fail: bool = False):
+        self.events = []
+        self.fail = fail
+        self.sent = 0
+        self.failed = 0
+
+    def submit(self, event: dict) -> None:
+        self.events.append(event)
+
+    def drain(self) -> None:
+        if self.fail:
+            self.failed = len(self.events)
+        else:
+            self.sent = len(self.events)
+
+
+def _save(db, messages):
+    logs = [{"@level": "error", "@message": message, "@timestamp": "2025-09-09T15:31:32.000000+03:00",
+             "tf_req_id": "req-1"} for message in messages]
+    save_logs_to_db(db, logs, "errors.json")
+    return db.query(Upload.id).order_by(Upload.id.desc()).limit(1).scalar()
+
+
+def _forward(db, upload_id, forwarder):
+    job = SentryForwardJob(upload_id=upload_id, status="running")
+    db.add(job)
+    db.commit()
+    delivered = _forward_upload(db, job, forwarder, upload_id)
+    return job, delivered
+
+
+def test_fingerprints_are_deduplicated_across_jobs_and_uploads(db):
+    try:
+        first = _save(db, ["provider crashed", "provider crashed", "timeout"])
+        forwarder = RecordingForwarder()
+        job, delivered = _forward(db, first, forwarder)
+        assert delivered
+        assert [event['message']['formatted'] for event in forwarder.events] == ["provider crashed", "timeout"]
+        assert job.duplicate_count == 1
+
+        # The same errors uploaded again are not reported by a later job
+        second = _save(db, ["provider crashed", "timeout", "disk full"])
+        forwarder = RecordingForwarder()
+        job, delivered = _forward(db, second, forwarder)
+        assert delivered
+        assert [event['message']['formatted'] for event in forwarder.events] == ["disk full"]
+        assert job.duplicate_count == 2
+    finally:
+        db.query(SentryFingerprint).delete()
+        db.query(SentryForwardJob).delete()
+        db.commit()
+
+
+def test_fingerprints_of_failed_deliveries_are_not_stored(db):
+    try:
+        upload_id = _save(db, ["provider crashed"])
+        job, delivered = _forward(db, upload_id, RecordingForwarder(fail=True))
+        assert not delivered
+        assert db.query(SentryFingerprint).count() == 0
+
+        forwarder = RecordingForwarder()
+        job, delivered = _forward(db, upload_id, forwarder)
+        assert delivered
+        assert len(forwarder.events) == 1
+    finally:
+        db.query(SentryFingerprint).delete()
+        db.query(SentryForwardJob).delete()
+        db.commit()
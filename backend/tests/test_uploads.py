@@ -0,0 +1,50 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from app.main import app
+from app.models import LogPayload, LogSectionRecord, LogStat, RequestSummary, TerraformLog, Upload
+from app.services.log_payloads import PAYLOAD_INLINE_LIMIT
+from app.services.log_service import get_all_logs, save_logs_to_db
+
+DERIVED = (TerraformLog, LogPayload, RequestSummary, LogSectionRecord, LogStat)
+
+
+def _save(db, name: str) -> int:
+    logs = [
+        {"@level": "info", "@message": "backend/local: starting Plan operation", "tf_req_id": f"{name}-req"},
+        {"@level": "info", "@message": f"{name} line", "tf_req_id": f"{name}-req", "tf_http_res_body": name * PAYLOAD_INLINE_LIMIT},
+        {"@level": "info", "@message": "Plan: 1 to add, 0 to change, 0 to destroy."},
+    ]
+    save_logs_to_db(db, logs, f"{name}.json")
+    return db.query(func.max(Upload.id)).scalar()
+
+
+def _counts(db, upload_id: int) -> list[int]:
+    return [db.query(model).filter(model.upload_id == upload_id).count() for model in DERIVED]
+
+
+def test_logs_are_scoped_to_their_upload(db):
+    first, second = _save(db, "first"), _save(db, "second")
+
+    assert [log.message for log in get_all_logs(db, upload_id=first)] == [
+        "backend/local: starting Plan operation", "first line", "Plan: 1 to add, 0 to change, 0 to destroy."
+    ]
+    assert {log.upload_id for log in get_all_logs(db, upload_id=second)} == {second}
+    assert len(get_all_logs(db)) == 6
+
+
+def test_deleting_an_upload_keeps_the_others(db):
+    first, second = _save(db, "first"), _save(db, "second")
+    kept = _counts(db, second)
+    assert all(kept)
+
+    with TestClient(app) as client:
+        response = client.delete(f"/api/uploads/{first}")
+        assert response.status_code == 200
+        assert response.json()['deleted_count'] == 3
+        assert client.delete(f"/api/uploads/{first}").status_code == 404
+        assert [upload['id'] for upload in client.get("/api/uploads").json()] == [second]
+
+    db.expire_all()
+    assert _counts(db, first) == [0] * len(DERIVED)
+    assert _counts(db, second) == kept
@@ -1,5 +1,5 @@
 import React, {useRef, useState} from 'react';
-import {clearSession, uploadLogFile} from '../services/api';
+import {clearSession, uploadLogFile, waitForJob} from '../services/api';
 
 function FileUpload({onUploadSuccess}) {
     const [file, setFile] = useState(null);
@@ -27,10 +27,29 @@ function FileUpload({onUploadSuccess}) {
         setMessage('');
 
         try {
-            const result = await uploadLogFile(file);
-            let msg = `Success! Uploaded ${result.entries_count} log entries from ${result.filename}`;
-            if (result.fixed_logs_count > 0) {
-                msg += ` ⚠️ Warning: ${result.fixed_logs_count} log entries had missing fields that were automatically restored.`;
+            const accepted = await uploadLogFile(file);
+            // A zip archive is ingested as one job per contained log
+            const jobIds = accepted.jobs.length ? accepted.jobs.map((job) => job.id) : [accepted.job_id];
+            let rowsInserted = 0;
+            let fixedLogsCount = 0;
+            let skippedEntries = 0;
+            for (const jobId of jobIds) {
+                const result = await waitForJob(jobId, (job) => {
+                    setMessage(`Processing ${job.filename}: ${rowsInserted + job.rows_inserted} log entries saved`);
+                });
+                if (result.status === 'failed') {
+                    throw new Error(`${result.filename}: ${result.error || 'Processing failed'}`);
+                }
+                rowsInserted += result.rows_inserted;
+                fixedLogsCount += result.fixed_logs_count;
+                skippedEntries += result.skipped_entries;
+            }
+            let msg = `Success! Uploaded ${rowsInserted} log entries from ${accepted.filename}`;
+            if (skippedEntries > 0) {
+                msg += ` (${skippedEntries} entries were already stored and not uploaded again)`;
+            }
+            if (fixedLogsCount > 0) {
+                msg += ` ⚠️ Warning: ${fixedLogsCount} log entries had missing fields that were automatically restored.`;
             }
             setMessage(msg);
             setFile(null);
@@ -68,7 +87,7 @@ function FileUpload({onUploadSuccess}) {
                 {/* Скрытый input */}
                 <input
                     type="file"
-                    accept=".json,.log"
+                    accept=".json,.log,.gz,.zst,.bz2,.xz,.zip"
                     onChange={handleFileChange}
                     ref={fileInputRef}
                     style={styles.hiddenFileInput}
@@ -100,7 +119,7 @@ function FileUpload({onUploadSuccess}) {
             </div>
 
             {message && (
-                <div style={message.startsWith('Success') ? styles.successMessage : styles.errorMessage}>
+                <div style={message.startsWith('Success') || message.startsWith('Processing') ? styles.successMessage : styles.errorMessage}>
                     {message}
                 </div>
             )}
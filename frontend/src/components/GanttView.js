@@ -1,21 +1,26 @@
 import React, { useState, useEffect } from 'react';
 import { getGanttData } from '../services/api';
 
+// Bars and buckets requested at most; denser parts of the window come back as buckets
+const MAX_BARS = 500;
+
 function GanttView({ refreshTrigger }) {
-  const [ganttData, setGanttData] = useState([]);
+  const [ganttData, setGanttData] = useState(null);
+  // Visible time window in epoch microseconds, null for all requests
+  const [timeWindow, setTimeWindow] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
-  const [hoveredRequest, setHoveredRequest] = useState(null);
+  const [hoveredItem, setHoveredItem] = useState(null);
 
   useEffect(() => {
     fetchGanttData();
-  }, [refreshTrigger]);
+  }, [refreshTrigger, timeWindow]);
 
   const fetchGanttData = async () => {
     setLoading(true);
     setError(null);
     try {
-      const data = await getGanttData();
+      const data = await getGanttData({ ...(timeWindow || {}), max_bars: MAX_BARS });
       setGanttData(data);
     } catch (err) {
       setError(`Error loading Gantt data: ${err.message}`);
@@ -41,10 +46,11 @@ function GanttView({ refreshTrigger }) {
     return (endTime - startTime) / 1000; // duration in seconds
   };
 
-  const formatDuration = (start, end) => {
-    const duration = calculateDuration(start, end);
-    if (duration === 0) return 'N/A';
-    
+  const formatDuration = (start, end) => formatSeconds(calculateDuration(start, end));
+
+  const formatSeconds = (duration) => {
+    if (!duration) return 'N/A';
+
     if (duration < 1) {
       return `${(duration * 1000).toFixed(0)}ms`;
     } else if (duration < 60) {
@@ -71,69 +77,186 @@ function GanttView({ refreshTrigger }) {
     return colors[rpc] || '#607D8B';
   };
 
-  const renderGanttChart = () => {
-    if (!ganttData || ganttData.length === 0) {
-      return <div style={styles.noData}>No request data available. Upload logs to see the Gantt chart.</div>;
+  // Window navigation; the window is kept within the extent of all requests
+  const setWindowBounds = (start, end) => {
+    const extent = ganttData?.extent;
+    if (!extent || extent.start_us === null) return;
+    if (end - start >= extent.end_us - extent.start_us) {
+      setTimeWindow(null);
+      return;
     }
+    if (start < extent.start_us) {
+      end += extent.start_us - start;
+      start = extent.start_us;
+    }
+    if (end > extent.end_us) {
+      start -= end - extent.end_us;
+      end = extent.end_us;
+    }
+    setTimeWindow({ start_us: Math.round(start), end_us: Math.round(end) });
+  };
 
-    // Find the overall time range
-    let minTime = null;
-    let maxTime = null;
+  const zoom = (factor) => {
+    const { start_us: start, end_us: end } = ganttData.window;
+    const center = (start + end) / 2;
+    const halfSpan = Math.max(((end - start) * factor) / 2, 500);
+    setWindowBounds(center - halfSpan, center + halfSpan);
+  };
 
-    ganttData.forEach(request => {
-      const start = parseTimestamp(request.start_timestamp);
-      const end = parseTimestamp(request.end_timestamp);
-      
-      if (start && (!minTime || start < minTime)) minTime = start;
-      if (end && (!maxTime || end > maxTime)) maxTime = end;
-    });
+  const pan = (fraction) => {
+    const { start_us: start, end_us: end } = ganttData.window;
+    const shift = (end - start) * fraction;
+    setWindowBounds(start + shift, end + shift);
+  };
+
+  const formatAxisTime = (us, span) => {
+    const time = new Date(us / 1000);
+    if (span >= 60 * 1000000) return time.toLocaleTimeString();
+    return `${time.toLocaleTimeString()}.${String(time.getMilliseconds()).padStart(3, '0')}`;
+  };
+
+  const renderTooltip = () => {
+    if (!hoveredItem) return null;
+    if (hoveredItem.kind === 'bucket') {
+      const bucket = hoveredItem.item;
+      return (
+        <div style={styles.tooltip}>
+          <div><strong>Requests:</strong> {bucket.count}</div>
+          <div><strong>RPCs:</strong></div>
+          {bucket.rpcs.slice(0, 5).map(rpc => (
+            <div key={rpc.value || 'unknown'} style={styles.tooltipIndent}>
+              {rpc.value || 'Unknown'}: {rpc.count}
+            </div>
+          ))}
+          {bucket.rpcs.length > 5 && <div style={styles.tooltipIndent}>…</div>}
+          <div><strong>Duration:</strong> {bucket.min_duration_ms ?? 'N/A'} – {bucket.max_duration_ms ?? 'N/A'} ms</div>
+          <div><strong>Logs:</strong> {bucket.log_count}</div>
+          <div><strong>Start:</strong> {bucket.start_timestamp}</div>
+          <div><strong>End:</strong> {bucket.end_timestamp}</div>
+          <div style={styles.tooltipHint}>Click to zoom in</div>
+        </div>
+      );
+    }
+    const request = hoveredItem.item;
+    return (
+      <div style={styles.tooltip}>
+        <div><strong>Request ID:</strong> {request.tf_req_id}</div>
+        <div><strong>RPC:</strong> {request.tf_rpc || 'N/A'}</div>
+        <div><strong>Resource:</strong> {request.tf_resource_type || 'N/A'}</div>
+        <div><strong>Duration:</strong> {formatDuration(request.start_timestamp, request.end_timestamp)}</div>
+        <div><strong>Logs:</strong> {request.log_count}</div>
+        <div><strong>Start:</strong> {request.start_timestamp}</div>
+        <div><strong>End:</strong> {request.end_timestamp}</div>
+      </div>
+    );
+  };
 
-    if (!minTime || !maxTime) {
-      return <div style={styles.noData}>Unable to parse timestamps from data.</div>;
+  const renderGanttChart = () => {
+    if (!ganttData || ganttData.window.start_us === null) {
+      return <div style={styles.noData}>No request data available. Upload logs to see the Gantt chart.</div>;
+    }
+    if (ganttData.total === 0) {
+      return <div style={styles.noData}>No requests in this time window.</div>;
     }
 
-    const totalDuration = (maxTime - minTime) / 1000; // in seconds
+    const { bars, buckets } = ganttData;
+    const minTime = ganttData.window.start_us;
+    const maxTime = ganttData.window.end_us;
+    const totalDuration = Math.max(maxTime - minTime, 1); // in microseconds
     const chartWidth = 900; // pixels for the timeline
     const barHeight = 30;
     const barGap = 10;
     const leftMargin = 300;
     const topMargin = 50;
 
-    const getXPosition = (timestamp) => {
-      const time = parseTimestamp(timestamp);
-      if (!time) return leftMargin;
-      const offset = (time - minTime) / 1000;
+    // Bars of requests that started before or end after the window are cut at its edges
+    const getXPosition = (us) => {
+      const offset = Math.min(Math.max(us - minTime, 0), totalDuration);
       return leftMargin + (offset / totalDuration) * chartWidth;
     };
 
     const getBarWidth = (start, end) => {
-      const startX = getXPosition(start);
-      const endX = getXPosition(end);
-      return Math.max(endX - startX, 2); // minimum 2px width
+      return Math.max(getXPosition(end) - getXPosition(start), 2); // minimum 2px width
     };
 
+    let yOffset = topMargin;
+    const sections = [];
+
+    // Dense parts of the window, one row; darker buckets hold more requests
+    if (buckets.length > 0) {
+      const maxCount = Math.max(...buckets.map(bucket => bucket.count));
+      buckets.forEach(bucket => {
+        const key = `bucket-${bucket.start_us}-${bucket.end_us}`;
+        const hovered = hoveredItem?.key === key;
+        const barX = getXPosition(bucket.start_us);
+        const barWidth = getBarWidth(bucket.start_us, bucket.end_us);
+        sections.push(
+          <g key={key}>
+            <rect
+              x={barX}
+              y={yOffset}
+              width={barWidth}
+              height={barHeight}
+              fill="#37474F"
+              opacity={hovered ? 1 : 0.3 + 0.6 * (bucket.count / maxCount)}
+              stroke={hovered ? '#000' : 'none'}
+              strokeWidth={hovered ? 2 : 0}
+              style={{ cursor: 'zoom-in' }}
+              onMouseEnter={() => setHoveredItem({ key, kind: 'bucket', item: bucket })}
+              onMouseLeave={() => setHoveredItem(null)}
+              onClick={() => {
+                setHoveredItem(null);
+                setWindowBounds(Math.max(bucket.start_us, minTime), Math.min(bucket.end_us, maxTime));
+              }}
+            />
+            {barWidth > 30 && (
+              <text
+                x={barX + barWidth / 2}
+                y={yOffset + barHeight / 2}
+                textAnchor="middle"
+                alignmentBaseline="middle"
+                style={{ fontSize: '10px', fill: '#fff', pointerEvents: 'none' }}
+              >
+                {bucket.count}
+              </text>
+            )}
+          </g>
+        );
+      });
+      sections.push(
+        <text
+          key="label-buckets"
+          x={10}
+          y={yOffset + 15}
+          style={{ fontSize: '14px', fontWeight: 'bold', fill: '#333' }}
+        >
+          Aggregated ({buckets.reduce((sum, bucket) => sum + bucket.count, 0)} requests)
+        </text>
+      );
+      yOffset += barHeight + barGap + 20;
+    }
+
     // Group by RPC type
-    const groupedByRPC = ganttData.reduce((acc, request) => {
+    const groupedByRPC = bars.reduce((acc, request) => {
       const rpc = request.tf_rpc || 'Unknown';
       if (!acc[rpc]) acc[rpc] = [];
       acc[rpc].push(request);
       return acc;
     }, {});
 
-    let yOffset = topMargin;
-    const sections = [];
-
     Object.entries(groupedByRPC).forEach(([rpc, requests]) => {
       const sectionY = yOffset;
-      
+
       requests.forEach((request, idx) => {
+        const key = `${request.upload_id}-${request.tf_req_id}`;
+        const hovered = hoveredItem?.key === key;
         const barY = yOffset + idx * (barHeight + barGap);
-        const barX = getXPosition(request.start_timestamp);
-        const barWidth = getBarWidth(request.start_timestamp, request.end_timestamp);
+        const barX = getXPosition(request.start_us);
+        const barWidth = getBarWidth(request.start_us, request.end_us);
         const color = getColorForRPC(rpc);
 
         sections.push(
-          <g key={request.tf_req_id}>
+          <g key={key}>
             {/* Request bar */}
             <rect
               x={barX}
@@ -141,12 +264,12 @@ function GanttView({ refreshTrigger }) {
               width={barWidth}
               height={barHeight}
               fill={color}
-              opacity={hoveredRequest === request.tf_req_id ? 1 : 0.8}
-              stroke={hoveredRequest === request.tf_req_id ? '#000' : color}
-              strokeWidth={hoveredRequest === request.tf_req_id ? 2 : 0}
+              opacity={hovered ? 1 : 0.8}
+              stroke={hovered ? '#000' : color}
+              strokeWidth={hovered ? 2 : 0}
               style={{ cursor: 'pointer' }}
-              onMouseEnter={() => setHoveredRequest(request.tf_req_id)}
-              onMouseLeave={() => setHoveredRequest(null)}
+              onMouseEnter={() => setHoveredItem({ key, kind: 'request', item: request })}
+              onMouseLeave={() => setHoveredItem(null)}
             />
             {/* Request ID label */}
             <text
@@ -184,7 +307,7 @@ function GanttView({ refreshTrigger }) {
     const numMarkers = 10;
     for (let i = 0; i <= numMarkers; i++) {
       const x = leftMargin + (i / numMarkers) * chartWidth;
-      const time = new Date(minTime.getTime() + (i / numMarkers) * (maxTime - minTime));
+      const time = minTime + (i / numMarkers) * totalDuration;
       timeMarkers.push(
         <g key={`marker-${i}`}>
           <line
@@ -201,7 +324,7 @@ function GanttView({ refreshTrigger }) {
             textAnchor="middle"
             style={{ fontSize: '9px', fill: '#666' }}
           >
-            {time.toLocaleTimeString()}
+            {formatAxisTime(time, totalDuration)}
           </text>
         </g>
       );
@@ -223,22 +346,8 @@ function GanttView({ refreshTrigger }) {
           {sections}
         </svg>
 
-        {/* Tooltip for hovered request */}
-        {hoveredRequest && (
-          <div style={styles.tooltip}>
-            {ganttData.filter(r => r.tf_req_id === hoveredRequest).map(request => (
-              <div key={request.tf_req_id}>
-                <div><strong>Request ID:</strong> {request.tf_req_id}</div>
-                <div><strong>RPC:</strong> {request.tf_rpc || 'N/A'}</div>
-                <div><strong>Resource:</strong> {request.tf_resource_type || 'N/A'}</div>
-                <div><strong>Duration:</strong> {formatDuration(request.start_timestamp, request.end_timestamp)}</div>
-                <div><strong>Logs:</strong> {request.log_count}</div>
-                <div><strong>Start:</strong> {request.start_timestamp}</div>
-                <div><strong>End:</strong> {request.end_timestamp}</div>
-              </div>
-            ))}
-          </div>
-        )}
+        {/* Tooltip for the hovered request or bucket */}
+        {renderTooltip()}
       </div>
     );
   };
@@ -254,21 +363,39 @@ function GanttView({ refreshTrigger }) {
         <button onClick={fetchGanttData} style={styles.refreshButton}>
           Refresh Data
         </button>
+        <button onClick={() => zoom(0.5)} style={styles.navButton} disabled={!ganttData?.total}>
+          Zoom In
+        </button>
+        <button onClick={() => zoom(2)} style={styles.navButton} disabled={!timeWindow}>
+          Zoom Out
+        </button>
+        <button onClick={() => pan(-0.5)} style={styles.navButton} disabled={!timeWindow}>
+          ← Earlier
+        </button>
+        <button onClick={() => pan(0.5)} style={styles.navButton} disabled={!timeWindow}>
+          Later →
+        </button>
+        <button onClick={() => setTimeWindow(null)} style={styles.navButton} disabled={!timeWindow}>
+          Show All
+        </button>
       </div>
 
       {loading && <div style={styles.loading}>Loading Gantt chart data...</div>}
       {error && <div style={styles.error}>{error}</div>}
 
-      {!loading && !error && (
+      {/* The previous window stays visible while the next one loads */}
+      {ganttData && !error && (
         <>
           <div style={styles.stats}>
-            <div>Total Requests: {ganttData.length}</div>
-            {ganttData.length > 0 && (
+            <div>Total Requests: {ganttData.total}</div>
+            {ganttData.total > 0 && (
+              <div>
+                Time Range: {formatSeconds((ganttData.window.end_us - ganttData.window.start_us) / 1000000)}
+              </div>
+            )}
+            {ganttData.buckets.length > 0 && (
               <div>
-                Time Range: {formatDuration(
-                  ganttData[0]?.start_timestamp,
-                  ganttData[ganttData.length - 1]?.end_timestamp
-                )}
+                Shown: {ganttData.bars.length} requests, {ganttData.buckets.length} aggregated buckets
               </div>
             )}
           </div>
@@ -319,6 +446,15 @@ const styles = {
     cursor: 'pointer',
     fontWeight: 'bold',
   },
+  navButton: {
+    padding: '10px 15px',
+    marginLeft: '10px',
+    backgroundColor: '#fff',
+    color: '#007bff',
+    border: '1px solid #007bff',
+    borderRadius: '4px',
+    cursor: 'pointer',
+  },
   stats: {
     display: 'flex',
     gap: '20px',
@@ -373,6 +509,14 @@ const styles = {
     maxWidth: '300px',
     fontSize: '12px',
   },
+  tooltipIndent: {
+    paddingLeft: '10px',
+  },
+  tooltipHint: {
+    marginTop: '8px',
+    color: '#666',
+    fontStyle: 'italic',
+  },
   loading: {
     textAlign: 'center',
     padding: '40px',
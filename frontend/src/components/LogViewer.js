@@ -1,8 +1,39 @@
 import React, { useState, useEffect, useCallback } from 'react';
-import { getLogs, getRequestIds, getLogsByRequestId, sendErrorsToSentry } from '../services/api';
+import { getLogsPage, getRequestIds, getLogsByRequestId, getLogPayload, sendErrorsToSentry } from '../services/api';
+
+const PAGE_SIZE = 1000;
+
+// Raw data of a log; large values are stored separately and loaded on request
+function RawData({ log }) {
+  const [payload, setPayload] = useState(null);
+  const [loading, setLoading] = useState(false);
+
+  const loadPayload = async () => {
+    setLoading(true);
+    try {
+      setPayload(await getLogPayload(log.id));
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  return (
+    <details style={styles.details}>
+      <summary style={styles.summary}>Raw Data</summary>
+      <pre style={styles.rawData}>{JSON.stringify(payload || log.raw_data, null, 2)}</pre>
+      {log.payload_size && !payload && (
+        <button onClick={loadPayload} disabled={loading} style={styles.markReadButtonSmall}>
+          {loading ? 'Loading...' : `Load full entry (${Math.ceil(log.payload_size / 1024)} KB more)`}
+        </button>
+      )}
+    </details>
+  );
+}
 
 function LogViewer({ refreshTrigger }) {
   const [logs, setLogs] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [groupedLogs, setGroupedLogs] = useState({});
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
@@ -29,6 +60,18 @@ function LogViewer({ refreshTrigger }) {
   const [readLogs, setReadLogs] = useState(new Set());
 
 
+  const buildFilterOptions = useCallback(() => ({
+    level: levelFilter,
+    tf_resource_type: resourceTypeFilter,
+    // datetime-local values are in the browser's time zone, the API expects explicit offsets
+    start_timestamp: startTimestamp && new Date(startTimestamp).toISOString(),
+    end_timestamp: endTimestamp && new Date(endTimestamp).toISOString(),
+    tf_req_id: reqIdFilter,
+    tf_rpc: rpcFilter,
+    message_contains: messageFilter,
+    group_by_request_id: groupByRequestId,
+  }), [levelFilter, resourceTypeFilter, startTimestamp, endTimestamp, reqIdFilter, rpcFilter, messageFilter, groupByRequestId]);
+
   const fetchLogs = useCallback(async () => {
     setLoading(true);
     setError('');
@@ -43,21 +86,13 @@ function LogViewer({ refreshTrigger }) {
         const reqIds = await getRequestIds();
         setRequestIds(reqIds);
         setLogs([]);
+        setNextCursor(null);
         setLoadedRequestIds({});
       } else {
-        // Regular mode: fetch all logs
-        const filterOptions = {
-          level: levelFilter,
-          tf_resource_type: resourceTypeFilter,
-          start_timestamp: startTimestamp,
-          end_timestamp: endTimestamp,
-          tf_req_id: reqIdFilter,
-          tf_rpc: rpcFilter,
-          message_contains: messageFilter,
-          group_by_request_id: groupByRequestId,
-        };
-        const data = await getLogs(0, 1000, filterOptions);
-        setLogs(data);
+        // Regular mode: fetch the first page of logs
+        const page = await getLogsPage(PAGE_SIZE, null, buildFilterOptions());
+        setLogs(page.logs);
+        setNextCursor(page.nextCursor);
         setRequestIds([]);
       }
     } catch (err) {
@@ -65,7 +100,21 @@ function LogViewer({ refreshTrigger }) {
     } finally {
       setLoading(false);
     }
-  }, [levelFilter, resourceTypeFilter, startTimestamp, endTimestamp, reqIdFilter, rpcFilter, messageFilter, groupByRequestId]);
+  }, [levelFilter, resourceTypeFilter, startTimestamp, endTimestamp, reqIdFilter, rpcFilter, messageFilter, groupByRequestId, buildFilterOptions]);
+
+  const loadMoreLogs = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await getLogsPage(PAGE_SIZE, nextCursor, buildFilterOptions());
+      setLogs(prev => [...prev, ...page.logs]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      setError(`Error loading logs: ${err.message}`);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const loadRequestLogs = async (requestId) => {
     if (loadedRequestIds[requestId] || loadingRequestIds[requestId]) {
@@ -122,8 +171,10 @@ function LogViewer({ refreshTrigger }) {
     setSentryMessage('');
 
     try {
-      const result = await sendErrorsToSentry();
-      setSentryMessage(result.message || `Sent ${result.count} errors to Sentry`);
+      const job = await sendErrorsToSentry();
+      setSentryMessage(job.status === 'failed'
+        ? `Error: ${job.error}`
+        : `Sent ${job.sent_count} new errors to Sentry (${job.duplicate_count} duplicates skipped)`);
       setTimeout(() => setSentryMessage(''), 5000); // Clear message after 5 seconds
     } catch (err) {
       setSentryMessage(`Error: ${err.message}`);
@@ -304,12 +355,7 @@ function LogViewer({ refreshTrigger }) {
                           <div style={styles.logMessage}>{log.message}</div>
                           {log.tf_resource_type && <div style={styles.metadata}><strong>Resource:</strong> {log.tf_resource_type}</div>}
                           {log.tf_rpc && <div style={styles.metadata}><strong>RPC:</strong> {log.tf_rpc}</div>}
-                          {log.raw_data && (
-                            <details style={styles.details}>
-                              <summary style={styles.summary}>Raw Data</summary>
-                              <pre style={styles.rawData}>{JSON.stringify(log.raw_data, null, 2)}</pre>
-                            </details>
-                          )}
+                          {log.raw_data && <RawData log={log} />}
                         </div>
                       );
                     })
@@ -372,12 +418,7 @@ function LogViewer({ refreshTrigger }) {
                         <div style={styles.logMessage}>{log.message}</div>
                         {log.tf_resource_type && <div style={styles.metadata}><strong>Resource:</strong> {log.tf_resource_type}</div>}
                         {log.tf_rpc && <div style={styles.metadata}><strong>RPC:</strong> {log.tf_rpc}</div>}
-                        {log.raw_data && (
-                          <details style={styles.details}>
-                            <summary style={styles.summary}>Raw Data</summary>
-                            <pre style={styles.rawData}>{JSON.stringify(log.raw_data, null, 2)}</pre>
-                          </details>
-                        )}
+                        {log.raw_data && <RawData log={log} />}
                       </div>
                     );
                   })}
@@ -411,17 +452,18 @@ function LogViewer({ refreshTrigger }) {
                 <div style={styles.logMessage}>{log.message}</div>
                 {log.tf_resource_type && <div style={styles.metadata}><strong>Resource:</strong> {log.tf_resource_type}</div>}
                 {log.tf_rpc && <div style={styles.metadata}><strong>RPC:</strong> {log.tf_rpc}</div>}
-                {log.raw_data && (
-                  <details style={styles.details}>
-                    <summary style={styles.summary}>Raw Data</summary>
-                    <pre style={styles.rawData}>{JSON.stringify(log.raw_data, null, 2)}</pre>
-                  </details>
-                )}
+                {log.raw_data && <RawData log={log} />}
               </div>
             );
           })
         )}
       </div>
+
+      {nextCursor && logs.length > 0 && (
+        <button onClick={loadMoreLogs} disabled={loadingMore} style={styles.button}>
+          {loadingMore ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </div>
   );
 }
@@ -1,10 +1,11 @@
 import React, { useState, useEffect } from 'react';
-import { getLogs } from '../services/api';
+import { getStats } from '../services/api';
 
 function PieChartView({ refreshTrigger }) {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
   const [levelStats, setLevelStats] = useState({});
+  const [stats, setStats] = useState(null);
 
   useEffect(() => {
     fetchLevelStats();
@@ -15,18 +16,19 @@ function PieChartView({ refreshTrigger }) {
     setError('');
 
     try {
-      const logs = await getLogs(0, 2000, { group_by_request_id: false });
-      
-      // Count logs by level
-      const stats = {};
-      logs.forEach(log => {
-        const level = (log.log_level || 'UNKNOWN').toLowerCase();
-        stats[level] = (stats[level] || 0) + 1;
+      const data = await getStats();
+
+      // Levels are counted as stored; merge spellings that only differ in case
+      const counts = {};
+      data.levels.forEach(({ value, count }) => {
+        const level = (value || 'UNKNOWN').toLowerCase();
+        counts[level] = (counts[level] || 0) + count;
       });
 
-      setLevelStats(stats);
+      setLevelStats(counts);
+      setStats(data);
     } catch (err) {
-      setError(`Error loading logs: ${err.message}`);
+      setError(`Error loading statistics: ${err.message}`);
     } finally {
       setLoading(false);
     }
@@ -125,6 +127,60 @@ function PieChartView({ refreshTrigger }) {
     );
   };
 
+  const renderCounts = (title, items) => (
+    <div style={styles.table}>
+      <h3 style={styles.legendTitle}>{title}</h3>
+      {items.length === 0 && <div style={styles.empty}>None</div>}
+      {items.slice(0, TOP_VALUES).map((item) => (
+        <div key={item.value ?? ''} style={styles.row}>
+          <span style={styles.rowLabel} title={item.value || ''}>{item.value || '—'}</span>
+          <span>{item.count}</span>
+        </div>
+      ))}
+    </div>
+  );
+
+  const renderTables = () => (
+    <div style={styles.tables}>
+      <div style={{ ...styles.table, ...styles.wideTable }}>
+        <h3 style={styles.legendTitle}>Request duration by RPC, ms</h3>
+        {stats.rpc_durations.length === 0 && <div style={styles.empty}>No tf_req_duration_ms values</div>}
+        {stats.rpc_durations.length > 0 && (
+          <table style={styles.durations}>
+            <thead>
+              <tr>
+                <th style={styles.cell}>RPC</th>
+                <th style={styles.cell}>Count</th>
+                <th style={styles.cell}>p50</th>
+                <th style={styles.cell}>p90</th>
+                <th style={styles.cell}>p99</th>
+                <th style={styles.cell}>Max</th>
+              </tr>
+            </thead>
+            <tbody>
+              {stats.rpc_durations.map((item) => (
+                <tr key={item.rpc ?? ''}>
+                  <td style={styles.cell}>{item.rpc || '—'}</td>
+                  <td style={styles.cell}>{item.count}</td>
+                  <td style={styles.cell}>{item.p50}</td>
+                  <td style={styles.cell}>{item.p90}</td>
+                  <td style={styles.cell}>{item.p99}</td>
+                  <td style={styles.cell}>{item.max}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        )}
+      </div>
+      {renderCounts('RPCs', stats.rpcs)}
+      {renderCounts('Resource types', stats.resource_types)}
+      {renderCounts('Providers', stats.providers)}
+      {renderCounts('Sections', stats.sections.map(({ value, count, log_count }) => (
+        { value, count: `${count} (${log_count} logs)` }
+      )))}
+    </div>
+  );
+
   return (
     <div style={styles.container}>
       <h2>Log Level Statistics</h2>
@@ -136,10 +192,14 @@ function PieChartView({ refreshTrigger }) {
       {error && <div style={styles.error}>{error}</div>}
 
       {!loading && !error && renderPieChart()}
+      {!loading && !error && stats && stats.total_logs > 0 && renderTables()}
     </div>
   );
 }
 
+// Values listed per dimension, most frequent first
+const TOP_VALUES = 10;
+
 const styles = {
   container: {
     padding: '20px',
@@ -211,6 +271,50 @@ const styles = {
     fontSize: '16px',
     color: '#333',
   },
+  tables: {
+    display: 'flex',
+    flexWrap: 'wrap',
+    gap: '20px',
+    marginTop: '30px',
+  },
+  table: {
+    backgroundColor: 'white',
+    padding: '20px',
+    borderRadius: '8px',
+    boxShadow: '0 2px 4px rgba(0,0,0,0.1)',
+    minWidth: '250px',
+    flex: '1 1 250px',
+  },
+  wideTable: {
+    flexBasis: '100%',
+  },
+  row: {
+    display: 'flex',
+    justifyContent: 'space-between',
+    gap: '10px',
+    fontSize: '14px',
+    color: '#333',
+    marginBottom: '6px',
+  },
+  rowLabel: {
+    overflow: 'hidden',
+    textOverflow: 'ellipsis',
+    whiteSpace: 'nowrap',
+  },
+  durations: {
+    width: '100%',
+    borderCollapse: 'collapse',
+    fontSize: '14px',
+  },
+  cell: {
+    textAlign: 'left',
+    padding: '4px 8px',
+    borderBottom: '1px solid #e0e0e0',
+  },
+  empty: {
+    color: '#666',
+    fontSize: '14px',
+  },
 };
 
 export default PieChartView;
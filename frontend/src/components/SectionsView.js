@@ -1,11 +1,15 @@
 import React, { useState, useEffect } from 'react';
-import { getSectionsData } from '../services/api';
+import { getSectionsData, getSectionLogsPage } from '../services/api';
+
+const SECTION_PAGE_SIZE = 200;
 
 function SectionsView({ refreshTrigger }) {
   const [loading, setLoading] = useState(false);
   const [message, setMessage] = useState('');
   const [sectionsData, setSectionsData] = useState(null);
   const [expandedSections, setExpandedSections] = useState({});
+  // Loaded logs per section id: { logs, nextCursor, loading }
+  const [sectionLogs, setSectionLogs] = useState({});
 
   useEffect(() => {
     fetchSectionsData();
@@ -27,12 +31,9 @@ function SectionsView({ refreshTrigger }) {
           msg += ` ⚠️ Warning: ${result.fixed_logs_count} log entries had missing fields that were automatically restored.`;
         }
         setMessage(msg);
-        // Expand all sections by default
-        const expanded = {};
-        result.sections.forEach((_, idx) => {
-          expanded[idx] = true;
-        });
-        setExpandedSections(expanded);
+        // Section logs are loaded when a section is expanded
+        setExpandedSections({});
+        setSectionLogs({});
       }
     } catch (error) {
       setMessage(`Error: ${error.response?.data?.detail || error.message}`);
@@ -42,7 +43,29 @@ function SectionsView({ refreshTrigger }) {
     }
   };
 
-  const toggleSection = (index) => {
+  const loadSectionLogs = async (sectionId) => {
+    const current = sectionLogs[sectionId];
+    if (current?.loading) return;
+    setSectionLogs(prev => ({
+      ...prev,
+      [sectionId]: { logs: current?.logs || [], nextCursor: current?.nextCursor || null, loading: true }
+    }));
+    try {
+      const page = await getSectionLogsPage(sectionId, SECTION_PAGE_SIZE, current?.nextCursor);
+      setSectionLogs(prev => ({
+        ...prev,
+        [sectionId]: { logs: [...(current?.logs || []), ...page.logs], nextCursor: page.nextCursor, loading: false }
+      }));
+    } catch (error) {
+      setMessage(`Error: ${error.response?.data?.detail || error.message}`);
+      setSectionLogs(prev => ({ ...prev, [sectionId]: { ...prev[sectionId], loading: false } }));
+    }
+  };
+
+  const toggleSection = (index, sectionId) => {
+    if (!expandedSections[index] && !sectionLogs[sectionId]) {
+      loadSectionLogs(sectionId);
+    }
     setExpandedSections(prev => ({
       ...prev,
       [index]: !prev[index]
@@ -124,10 +147,10 @@ function SectionsView({ refreshTrigger }) {
           <div style={styles.sectionsList}>
             <h3>Sections</h3>
             {sectionsData.sections.map((section, idx) => (
-              <div key={idx} style={styles.sectionCard}>
+              <div key={section.id ?? idx} style={styles.sectionCard}>
                 <div 
                   style={{...styles.sectionHeader, backgroundColor: getSectionColor(section.type)}}
-                  onClick={() => toggleSection(idx)}
+                  onClick={() => toggleSection(idx, section.id)}
                 >
                   <span style={styles.sectionTitle}>
                     {expandedSections[idx] ? '▼' : '▶'} {section.type.toUpperCase()}
@@ -140,6 +163,8 @@ function SectionsView({ refreshTrigger }) {
                 {expandedSections[idx] && (
                   <div style={styles.sectionContent}>
                     <div style={styles.sectionMeta}>
+                      <div><strong>File:</strong> {section.filename || 'N/A'}</div>
+                      <div><strong>Log Count:</strong> {section.log_count}</div>
                       <div><strong>Start Index:</strong> {section.start_index}</div>
                       <div><strong>End Index:</strong> {section.end_index}</div>
                       <div><strong>Start Time:</strong> {section.start_timestamp || 'N/A'}</div>
@@ -147,26 +172,31 @@ function SectionsView({ refreshTrigger }) {
                     </div>
 
                     <div style={styles.logsContainer}>
-                      {sectionsData.logs
-                        .slice(section.start_index, section.end_index + 1)
+                      {(sectionLogs[section.id]?.logs || [])
                         .map((log, logIdx) => (
                           <div key={logIdx} style={styles.logEntry}>
                             <div style={styles.logHeader}>
                               <span style={{
                                 ...styles.logLevel,
-                                backgroundColor: getLevelColor(log['@level'] || log.level)
+                                backgroundColor: getLevelColor(log.log_level)
                               }}>
-                                {log['@level'] || log.level || 'UNKNOWN'}
+                                {log.log_level || 'UNKNOWN'}
                               </span>
                               <span style={styles.timestamp}>
-                                {log['@timestamp'] || log.timestamp || 'N/A'}
+                                {log.timestamp || 'N/A'}
                               </span>
                             </div>
                             <div style={styles.logMessage}>
-                              {log['@message'] || log.message || 'No message'}
+                              {log.message || 'No message'}
                             </div>
                           </div>
                         ))}
+                      {sectionLogs[section.id]?.loading && <div>Loading...</div>}
+                      {sectionLogs[section.id]?.nextCursor && !sectionLogs[section.id]?.loading && (
+                        <button onClick={() => loadSectionLogs(section.id)} style={styles.refreshButton}>
+                          Load more
+                        </button>
+                      )}
                     </div>
                   </div>
                 )}
@@ -15,6 +15,22 @@ export const uploadLogFile = async (file) => {
   return response.data;
 };
 
+export const getJob = async (jobId) => {
+  const response = await axios.get(`${API_BASE_URL}/jobs/${jobId}`);
+  return response.data;
+};
+
+export const waitForJob = async (jobId, onProgress, intervalMs = 1000) => {
+  for (;;) {
+    const job = await getJob(jobId);
+    if (onProgress) onProgress(job);
+    if (job.status === 'completed' || job.status === 'duplicate' || job.status === 'failed') {
+      return job;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
 export const getLogs = async (skip = 0, limit = 100, options = {}) => {
   const params = { skip, limit, ...options };
 
@@ -29,6 +45,19 @@ export const getLogs = async (skip = 0, limit = 100, options = {}) => {
   return response.data;
 };
 
+export const getLogsPage = async (limit = 100, cursor = null, options = {}) => {
+  const params = { limit, cursor, ...options };
+
+  Object.keys(params).forEach(key => {
+    if (params[key] === null || params[key] === undefined || params[key] === '') {
+      delete params[key];
+    }
+  });
+
+  const response = await axios.get(`${API_BASE_URL}/logs`, { params });
+  return { logs: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+};
+
 export const clearSession = async () => {
   const response = await axios.delete(`${API_BASE_URL}/sessions`);
   return response.data;
@@ -47,8 +76,15 @@ export const parseLogWithSections = async (file) => {
   return response.data;
 };
 
-export const getGanttData = async () => {
-  const response = await axios.get(`${API_BASE_URL}/gantt`);
+// Requests of a time window ({ start_us, end_us, max_bars }); dense parts come back as buckets
+export const getGanttData = async (params = {}) => {
+  const response = await axios.get(`${API_BASE_URL}/gantt`, { params });
+  return response.data;
+};
+
+// Counts by level, rpc, resource type, provider and section, and duration percentiles by rpc
+export const getStats = async () => {
+  const response = await axios.get(`${API_BASE_URL}/stats`);
   return response.data;
 };
 
@@ -57,6 +93,12 @@ export const getSectionsData = async () => {
   return response.data;
 };
 
+export const getSectionLogsPage = async (sectionId, limit = 100, cursor = null) => {
+  const params = cursor ? { limit, cursor } : { limit };
+  const response = await axios.get(`${API_BASE_URL}/sections/${sectionId}/logs`, { params });
+  return { logs: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+};
+
 export const getRequestIds = async () => {
   const response = await axios.get(`${API_BASE_URL}/request-ids`);
   return response.data;
@@ -67,7 +109,51 @@ export const getLogsByRequestId = async (requestId) => {
   return response.data;
 };
 
-export const sendErrorsToSentry = async () => {
+// Complete entry of a log, including the large values lists leave out (see payload_size)
+export const getLogPayload = async (logId) => {
+  const response = await axios.get(`${API_BASE_URL}/logs/${logId}/payload`);
+  return response.data;
+};
+
+export const getSentryJob = async (jobId) => {
+  const response = await axios.get(`${API_BASE_URL}/sentry/jobs/${jobId}`);
+  return response.data;
+};
+
+export const sendErrorsToSentry = async (intervalMs = 1000) => {
   const response = await axios.post(`${API_BASE_URL}/sentry/send-errors`);
+  let job = response.data;
+  while (job.status !== 'completed' && job.status !== 'failed') {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    job = await getSentryJob(job.id);
+  }
+  return job;
+};
+
+export const startTail = async (path = null) => {
+  const params = path ? { path } : {};
+  const response = await axios.post(`${API_BASE_URL}/tail`, null, { params });
+  return response.data;
+};
+
+export const stopTail = async (tailId) => {
+  const response = await axios.delete(`${API_BASE_URL}/tail/${tailId}`);
   return response.data;
 };
+
+// Subscribes to live events of a followed log file; returns a function that closes the stream.
+// handlers: { logs, sections, requests, reset, stopped, failed }, each called with the parsed data.
+export const followTail = (tailId, handlers = {}, afterId = 0) => {
+  const source = new EventSource(`${API_BASE_URL}/tail/${tailId}/events?after_id=${afterId}`);
+  ['logs', 'sections', 'requests', 'reset', 'stopped', 'failed'].forEach((name) => {
+    source.addEventListener(name, (event) => {
+      if (handlers[name]) {
+        handlers[name](JSON.parse(event.data));
+      }
+      if (name === 'stopped' || name === 'failed') {
+        source.close();
+      }
+    });
+  });
+  return () => source.close();
+};